@@ -1,3 +1,31 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Holiday, Schedule, ShiftAssignment
+
+
+@admin.register(Holiday)
+class HolidayAdmin(admin.ModelAdmin):
+    list_display = ["date", "name", "kind"]
+    list_filter = ["kind"]
+    date_hierarchy = "date"
+    search_fields = ["name"]
+
+
+class ShiftAssignmentInline(admin.TabularInline):
+    model = ShiftAssignment
+    raw_id_fields = ["employee"]
+    extra = 0
+
+
+@admin.register(Schedule)
+class ScheduleAdmin(admin.ModelAdmin):
+    list_display = ["name", "start", "end", "grace_minutes", "is_active"]
+    list_filter = ["is_active"]
+    inlines = [ShiftAssignmentInline]
+
+
+@admin.register(ShiftAssignment)
+class ShiftAssignmentAdmin(admin.ModelAdmin):
+    list_display = ["schedule", "employee", "department", "starts_on", "ends_on"]
+    list_filter = ["schedule", "department"]
+    raw_id_fields = ["employee"]
@@ -0,0 +1,216 @@
+"""
+Attendance punch ingestion.
+
+All time-in / time-out punches, from the QR kiosk and the admin toggle,
+go through record_punch(), which locks (or creates) the employee's
+record for the shift inside a single transaction. Concurrent scans for
+the same employee are serialized on that row, and the unique (employee,
+date) constraint guarantees that two first punches racing each other can
+never produce two records.
+
+Lateness and hours follow the employee's shift (accounts.schedules):
+a time-in past the shift start plus its grace period is LATE, and
+hours_worked only counts time inside the shift.
+
+Records nobody timed out are closed at their shift's end by
+close_open_attendance(), run on a schedule.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import time, timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, DecimalField, FloatField, Sum, Value, When
+from django.db.models.functions import Cast, ExtractHour, ExtractMinute, ExtractSecond, Greatest, Round
+from django.utils import timezone
+
+from .daily_stats import add_daily_stats
+from .models import AttendanceRecord
+from .refdata import shift_assignments
+from .schedules import punch_shift, resolve_shift
+
+
+# Minimum time between time-in and time-out
+MIN_SHIFT = timedelta(minutes=5)
+
+DAY_SECONDS = 24 * 3600
+
+
+class PunchAction:
+    TIME_IN = "time_in"
+    TIME_OUT = "time_out"
+    TOO_SOON = "too_soon"
+    COMPLETED = "completed"
+
+
+@dataclass(frozen=True)
+class PunchResult:
+    action: str
+    record: AttendanceRecord
+
+    @property
+    def accepted(self):
+        return self.action in (PunchAction.TIME_IN, PunchAction.TIME_OUT)
+
+
+def _status_for_time_in(shift, day, time_in):
+    if shift.is_late(day, time_in):
+        return AttendanceRecord.Status.LATE
+    return AttendanceRecord.Status.PRESENT
+
+
+def record_punch(employee, now=None):
+    """
+    Apply one punch for `employee` at `now` (aware, defaults to the
+    current time) and return a PunchResult.
+
+    The first punch of the shift records time-in, the second records
+    time-out (at least MIN_SHIFT later); anything after that is a no-op.
+    The number of queries is bounded regardless of contention.
+    """
+    now_dt = timezone.localtime(now)
+    day, shift = punch_shift(employee, now_dt)
+    now_time = now_dt.time()
+
+    with transaction.atomic():
+        record = (
+            AttendanceRecord.objects.select_for_update()
+            .filter(employee=employee, date=day)
+            .first()
+        )
+        if record is not None:
+            # Already have it; saves the rollup receiver a lookup
+            record.employee = employee
+
+        if record is None:
+            try:
+                # Savepoint so a lost race doesn't poison the outer transaction
+                with transaction.atomic():
+                    record = AttendanceRecord.objects.create(
+                        employee=employee,
+                        date=day,
+                        time_in=now_time,
+                        status=_status_for_time_in(shift, day, now_dt),
+                    )
+                return PunchResult(PunchAction.TIME_IN, record)
+            except IntegrityError:
+                record = AttendanceRecord.objects.select_for_update().get(
+                    employee=employee,
+                    date=day,
+                )
+
+        # TIME IN (record pre-created, e.g. by an admin)
+        if record.time_in is None:
+            record.time_in = now_time
+            record.status = _status_for_time_in(shift, day, now_dt)
+            record.save(update_fields=["time_in", "status"])
+            return PunchResult(PunchAction.TIME_IN, record)
+
+        # TIME OUT
+        if record.time_out is None:
+            in_dt = shift.at(day, record.time_in)
+            if now_dt - in_dt < MIN_SHIFT:
+                return PunchResult(PunchAction.TOO_SOON, record)
+
+            record.time_out = now_time
+            record.hours_worked = shift.hours(day, in_dt, now_dt)
+            record.save(update_fields=["time_out", "hours_worked"])
+            return PunchResult(PunchAction.TIME_OUT, record)
+
+    return PunchResult(PunchAction.COMPLETED, record)
+
+
+def _seconds(clock):
+    return clock.hour * 3600 + clock.minute * 60 + clock.second
+
+
+def _hours_until_shift_end(shift):
+    """
+    SQL for the hours from time_in to the end of `shift`, counting only
+    time inside the shift, rounded to 2 places, never negative. On a
+    night shift a time_in before the middle of the off-duty hours is the
+    next morning's, as in Shift.at().
+    """
+    start, end = _seconds(shift.start), _seconds(shift.end)
+    seconds_in = (
+        ExtractHour("time_in") * 3600
+        + ExtractMinute("time_in") * 60
+        + ExtractSecond("time_in")
+    )
+    if shift.overnight:
+        next_morning = (start + end) // 2
+        seconds_in = Case(
+            When(time_in__lt=time(next_morning // 3600, next_morning // 60 % 60, next_morning % 60),
+                 then=seconds_in + DAY_SECONDS),
+            default=seconds_in,
+        )
+        end += DAY_SECONDS
+    hours = Cast(
+        Cast(Value(end) - Greatest(seconds_in, Value(start)), FloatField()) / Value(3600.0),
+        DecimalField(max_digits=9, decimal_places=4),
+    )
+    return Greatest(
+        Round(hours, 2, output_field=DecimalField(max_digits=5, decimal_places=2)),
+        Value(Decimal("0.00")),
+    )
+
+
+def close_open_attendance(now=None):
+    """
+    Time out every record that has a time-in but no time-out once its
+    shift has ended, at the shift's end. The open records are read
+    without locks and their shifts resolved in Python; only the ones due
+    are then locked and closed, with one UPDATE per distinct shift and
+    hours computed in SQL. Running it again changes nothing.
+
+    Status is untouched, so the attendance tallies need no adjustment;
+    the daily rollups (which carry hours) get the added hours as deltas.
+    Returns the number of records closed.
+    """
+    now_dt = timezone.localtime(now)
+    assignments = shift_assignments()
+
+    open_records = AttendanceRecord.objects.filter(time_in__isnull=False, time_out__isnull=True)
+    candidates = open_records.filter(date__lte=now_dt.date()).order_by().values_list(
+        "pk", "employee_id", "employee__department_id", "date",
+    )
+    due = defaultdict(list)
+    for pk, employee_id, department_id, day in candidates.iterator():
+        shift = resolve_shift(employee_id, department_id, day, assignments)
+        if shift.bounds(day)[1] <= now_dt:
+            due[shift].append(pk)
+    if not due:
+        return 0
+
+    with transaction.atomic():
+        # Records timed out by a punch since the read above drop out here
+        locked = set(
+            open_records.select_for_update()
+            .filter(pk__in=[pk for pks in due.values() for pk in pks])
+            .values_list("pk", flat=True)
+        )
+        if not locked:
+            return 0
+        for shift, pks in due.items():
+            pks = [pk for pk in pks if pk in locked]
+            if pks:
+                AttendanceRecord.objects.filter(pk__in=pks).update(
+                    time_out=shift.end,
+                    hours_worked=_hours_until_shift_end(shift),
+                )
+
+        closed = (
+            AttendanceRecord.objects.filter(pk__in=locked)
+            .order_by()
+            .values("date", "employee__department_id")
+            .annotate(hours_total=Sum("hours_worked"), hours_count=Count("id"))
+        )
+        add_daily_stats({
+            (row["date"], row["employee__department_id"] or 0): {
+                "hours_total": row["hours_total"],
+                "hours_count": row["hours_count"],
+            }
+            for row in closed
+        })
+    return len(locked)
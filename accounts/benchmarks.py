@@ -0,0 +1,306 @@
+"""
+Benchmark suite for the key views and services.
+
+Each benchmark is a setup function registered with @benchmark(name). It
+receives the shared BenchContext and returns run(i), which is called
+`warmup` times untimed and then `repeat` times under hris.perf.measure().
+Every run is timed on its own, so a run can use its own data (a fresh
+employee to punch in, a fresh workbook to import).
+
+run_suite() executes inside a transaction that is rolled back, so
+benchmarks that write leave the database as they found it. Run it
+against a database filled by `manage.py generate_fixtures`:
+
+    manage.py run_benchmarks --output bench.json --compare baseline.json
+"""
+import io
+import json
+import statistics
+import subprocess
+from dataclasses import dataclass
+from datetime import datetime
+
+import django
+import openpyxl
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import Client, RequestFactory, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from hris.perf import measure, percentile
+
+from . import views
+from .imports import REQUIRED_COLUMNS, generate_next_emp_id, import_employees
+from .models import AttendanceRecord, Employee, LeaveRequest, Position
+from .qr_tokens import current_token
+
+
+BENCHMARKS = {}
+
+IMPORT_ROWS = 100
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+# A median slower than the baseline's by more than this percentage, and
+# by more than NOISE_MS, is a regression; so is any extra query
+REGRESSION_THRESHOLD = 20.0
+NOISE_MS = 2.0
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+@dataclass
+class BenchContext:
+    admin: Client
+    employee_client: Client
+    employee: Employee
+    runs: int
+
+
+def _get(client, url):
+    def run(i):
+        response = client.get(url)
+        if response.status_code != 200:
+            raise BenchmarkError(f"GET {url} returned {response.status_code}")
+    return run
+
+
+@benchmark("employeedash")
+def employeedash(ctx):
+    return _get(ctx.employee_client, reverse("employeedash"))
+
+
+@benchmark("payslip")
+def payslip(ctx):
+    return _get(ctx.employee_client, reverse("payslip"))
+
+
+@benchmark("admindash")
+def admindash(ctx):
+    return _get(ctx.admin, reverse("admindash"))
+
+
+@benchmark("time_tracking")
+def time_tracking(ctx):
+    # Generated attendance ends yesterday
+    latest = AttendanceRecord.objects.order_by("-date").values_list("date", flat=True).first()
+    day = latest or timezone.localdate()
+    return _get(ctx.admin, f"{reverse('time')}?date={day.isoformat()}")
+
+
+@benchmark("adminemployee")
+def adminemployee(ctx):
+    return _get(ctx.admin, reverse("adminemployee"))
+
+
+@benchmark("qr_submit")
+def qr_submit(ctx):
+    """A first punch of the day (time-in) per run, each by a different employee."""
+    today = timezone.localdate()
+    employees = list(
+        Employee.objects.filter(is_archived=False, user__isnull=False)
+        .exclude(attendance_records__date=today)
+        .select_related("user")[:ctx.runs]
+    )
+    if len(employees) < ctx.runs:
+        raise BenchmarkError(f"qr_submit needs {ctx.runs} employees without attendance today")
+
+    factory = RequestFactory()
+    # Punch from the office itself when a GPS fence is configured
+    lat, lng = settings.QR_OFFICE_LOCATION or (None, None)
+
+    def run(i):
+        token, _ = current_token()
+        request = factory.post(
+            reverse("employee_qr_submit"),
+            data=json.dumps({"token": token, "lat": lat, "lng": lng}),
+            content_type="application/json",
+        )
+        request.user = employees[i].user
+        response = views.employee_qr_submit(request)
+        if response.status_code != 200:
+            raise BenchmarkError(f"QR submit returned {response.status_code}: {response.content!r}")
+    return run
+
+
+def _import_workbook(rows, tag):
+    wb = openpyxl.Workbook()
+    sheet = wb.active
+    sheet.append(REQUIRED_COLUMNS)
+    positions = list(Position.objects.select_related("department")[:20])
+    for n in range(rows):
+        if positions and n % 5:
+            position = positions[n % len(positions)]
+            status, dept, title, rate = "Regular", position.department.name, position.title, None
+        else:
+            status, dept, title, rate = "Job Order", None, None, 500
+        sheet.append([
+            f"Bench{tag}", f"Import{n}", f"bench{tag}.{n}@example.com", datetime(1990, 1, 1),
+            status, dept, title, None, rate,
+        ])
+    output = io.BytesIO()
+    wb.save(output)
+    return output
+
+
+@benchmark("bulk_import")
+def bulk_import(ctx):
+    """
+    import_employees() of an IMPORT_ROWS-row workbook, new employees each
+    run. Passwords are hashed with MD5 here: PBKDF2 is slow on purpose
+    (about half a second per row per core) and would drown out the rest.
+    """
+    workbooks = [_import_workbook(IMPORT_ROWS, i) for i in range(ctx.runs)]
+
+    def run(i):
+        workbook = workbooks[i]
+        workbook.seek(0)
+        with override_settings(PASSWORD_HASHERS=FAST_HASHERS):
+            report = import_employees(workbook, generate_next_emp_id())
+        if report.created != IMPORT_ROWS:
+            raise BenchmarkError(f"bulk import created {report.created} of {IMPORT_ROWS}: {report.summary()}")
+    return run
+
+
+def _context(runs):
+    employee = (
+        Employee.objects.filter(
+            is_archived=False,
+            user__isnull=False,
+            emp_status=Employee.EmpStatus.REGULAR,
+        )
+        .order_by("emp_id")
+        .select_related("user")
+        .first()
+    )
+    if employee is None:
+        raise BenchmarkError("No regular employee with a login; run generate_fixtures first.")
+
+    staff, _ = User.objects.get_or_create(username="bench-admin", defaults={"is_staff": True})
+    # Host the settings allow outside the test runner
+    admin = Client(HTTP_HOST="localhost")
+    admin.force_login(staff)
+    employee_client = Client(HTTP_HOST="localhost")
+    employee_client.force_login(employee.user)
+    return BenchContext(admin=admin, employee_client=employee_client, employee=employee, runs=runs)
+
+
+def _summarize(samples, queries):
+    return {
+        "runs": len(samples),
+        "median_ms": round(statistics.median(samples), 3),
+        "min_ms": round(min(samples), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "queries": max(queries),
+    }
+
+
+def _commit():
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def _dataset():
+    return {
+        "employees": Employee.objects.count(),
+        "attendance": AttendanceRecord.objects.count(),
+        "leaves": LeaveRequest.objects.count(),
+    }
+
+
+def run_suite(names=None, repeat=10, warmup=2, progress=None):
+    """
+    Run the named benchmarks (default: all) and return the results
+    document that save_results() writes. progress(name, summary) is
+    called after each benchmark.
+    """
+    names = list(names or BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise BenchmarkError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = {}
+    with transaction.atomic():
+        dataset = _dataset()
+        ctx = _context(warmup + repeat)
+        for name in names:
+            run = BENCHMARKS[name](ctx)
+            for i in range(warmup):
+                run(i)
+            samples, queries = [], []
+            for i in range(warmup, warmup + repeat):
+                with measure() as measurement:
+                    run(i)
+                samples.append(measurement.total_ms)
+                queries.append(measurement.queries)
+            results[name] = _summarize(samples, queries)
+            if progress:
+                progress(name, results[name])
+        transaction.set_rollback(True)
+
+    return {
+        "created_at": timezone.now().isoformat(),
+        "commit": _commit(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "dataset": dataset,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def save_results(document, path):
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(current, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    One row per benchmark present in both documents: name, baseline and
+    current median ms, change in percent (None against a 0 ms baseline,
+    which is then judged on NOISE_MS alone), baseline and current
+    queries, and whether it regressed.
+    """
+    rows = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        delta = result["median_ms"] - before["median_ms"]
+        change = delta / before["median_ms"] * 100 if before["median_ms"] else None
+        slower = delta > NOISE_MS and (change is None or change > threshold)
+        regressed = slower or result["queries"] > before["queries"]
+        rows.append((
+            name,
+            before["median_ms"],
+            result["median_ms"],
+            change,
+            before["queries"],
+            result["queries"],
+            regressed,
+        ))
+    return rows
@@ -0,0 +1,229 @@
+"""
+Daily attendance rollups for the admin dashboard.
+
+Every AttendanceRecord counts towards the DailyAttendanceStats row for
+its date and its employee's department (by id, 0 for none): one status
+counter, plus its hours_worked in a running sum/count. The tally
+receivers in accounts.tallies adjust the row with F() updates on every
+save/delete, so the dashboard reads a few precomputed rows instead of
+counting records per status and averaging hours per day.
+
+Writes that bypass signals (queryset.update(), bulk_create()) must pass
+the counter changes they made to add_daily_stats(). Both paths create a
+missing row race-safely and then apply an F() delta, so concurrent
+punches never overwrite each other's counts.
+
+rebuild_daily_stats() recounts whole days from the records. It replaces
+the rows outright, so increments committed while it runs are lost: it is
+for the rebuild_daily_stats command and offline bulk loads only.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import AttendanceRecord, DailyAttendanceStats
+
+
+STATUS_FIELDS = {
+    AttendanceRecord.Status.PRESENT: "present",
+    AttendanceRecord.Status.LATE: "late",
+    AttendanceRecord.Status.ABSENT: "absent",
+    AttendanceRecord.Status.FIELDWORK: "fieldwork",
+    AttendanceRecord.Status.HEALTH: "health",
+    AttendanceRecord.Status.ON_LEAVE: "on_leave",
+}
+
+COUNTER_FIELDS = list(STATUS_FIELDS.values()) + ["hours_total", "hours_count"]
+
+
+def _counts_query():
+    """Conditional aggregates over records, named like the rollup columns."""
+    counts = {
+        field: Count("id", filter=Q(status=status))
+        for status, field in STATUS_FIELDS.items()
+    }
+    counts["hours_total"] = Sum("hours_worked")
+    counts["hours_count"] = Count("hours_worked")
+    return counts
+
+
+def rebuild_daily_stats(dates=None):
+    """
+    Recount the given dates (default: every date) from the records. Not
+    safe while punches are coming in; see the module docstring.
+    """
+    records = AttendanceRecord.objects.all()
+    existing = DailyAttendanceStats.objects.all()
+    if dates is not None:
+        dates = list(dates)
+        records = records.filter(date__in=dates)
+        existing = existing.filter(date__in=dates)
+
+    rows = (
+        records.order_by()
+        .values("date", "employee__department_id")
+        .annotate(**_counts_query())
+    )
+    stats = [
+        DailyAttendanceStats(
+            date=row.pop("date"),
+            department_id=row.pop("employee__department_id") or 0,
+            **{**row, "hours_total": row["hours_total"] or Decimal("0")},
+        )
+        for row in rows
+    ]
+
+    with transaction.atomic():
+        # Departments whose records all disappeared end up with a zeroed row
+        existing.update(**{field: 0 for field in COUNTER_FIELDS})
+
+        DailyAttendanceStats.objects.bulk_create(
+            stats,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=["date", "department_id"],
+            update_fields=COUNTER_FIELDS,
+        )
+    return len(stats)
+
+
+def _contribution(status, hours):
+    delta = {}
+    field = STATUS_FIELDS.get(status)
+    if field:
+        delta[field] = 1
+    if hours is not None:
+        delta["hours_total"] = Decimal(str(hours))
+        delta["hours_count"] = 1
+    return delta
+
+
+def _changes(delta):
+    return {field: F(field) + amount for field, amount in delta.items() if amount}
+
+
+def _ensure_rows(keys):
+    """Create the missing (date, department_id) rows; a concurrent insert simply wins."""
+    DailyAttendanceStats.objects.bulk_create(
+        [DailyAttendanceStats(date=day, department_id=department_id) for day, department_id in keys],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+
+def record_changed(department_id, old, new):
+    """
+    Move one record's contribution from `old` to `new`, each a
+    (date, status, hours_worked) snapshot or None (created / deleted).
+    Both sides on the same day net out into a single UPDATE; the day's
+    first record creates the row first.
+    """
+    deltas = {}
+    for snapshot, sign in ((old, -1), (new, +1)):
+        if snapshot is None or snapshot[0] is None:
+            continue
+        day, status, hours = snapshot
+        delta = deltas.setdefault(day, {})
+        for field, amount in _contribution(status, hours).items():
+            delta[field] = delta.get(field, 0) + sign * amount
+
+    for day, delta in deltas.items():
+        changes = _changes(delta)
+        if not changes:
+            continue
+
+        rows = DailyAttendanceStats.objects.filter(date=day, department_id=department_id or 0)
+        if not rows.update(**changes):
+            _ensure_rows([(day, department_id or 0)])
+            rows.update(**changes)
+
+
+def add_daily_stats(deltas):
+    """
+    Apply counter changes made without signals: {(date, department id):
+    {field: amount}}. Missing rows are created first; then one UPDATE per
+    department and distinct delta, so the statement count does not grow
+    with the number of days.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if _changes(delta)}
+    if not deltas:
+        return
+    _ensure_rows(deltas)
+
+    groups = defaultdict(list)
+    for (day, department_id), delta in deltas.items():
+        groups[department_id, tuple(sorted(delta.items()))].append(day)
+    for (department_id, delta), days in groups.items():
+        DailyAttendanceStats.objects.filter(department_id=department_id, date__in=days).update(
+            **_changes(dict(delta))
+        )
+
+
+def move_daily_stats(employee_id, old_department_id, new_department_id):
+    """
+    Move every record of a transferred employee from the old department's
+    rows to the new one's: one insert of the missing rows and one UPDATE
+    per side, the per-day amounts computed in SQL.
+    """
+    records = AttendanceRecord.objects.filter(employee_id=employee_id)
+    days = list(records.dates("date", "day"))
+    if not days:
+        return
+    old_department_id, new_department_id = old_department_id or 0, new_department_id or 0
+    _ensure_rows([(day, new_department_id) for day in days])
+
+    per_day = records.filter(date=OuterRef("date")).order_by().values("employee_id")
+    moved = {}
+    for field, aggregate in _counts_query().items():
+        output = DecimalField(max_digits=10, decimal_places=2) if field == "hours_total" else IntegerField()
+        moved[field] = Coalesce(
+            Subquery(per_day.annotate(amount=aggregate).values("amount"), output_field=output),
+            Value(0, output_field=output),
+        )
+
+    for department_id, sign in ((old_department_id, -1), (new_department_id, +1)):
+        DailyAttendanceStats.objects.filter(department_id=department_id, date__in=days).update(
+            **{field: F(field) + sign * amount for field, amount in moved.items()}
+        )
+
+
+def daily_summaries(dates):
+    """
+    {date: {"present", "late", ..., "avg_hours"}} summed over departments,
+    in one query. Dates with no rollup rows (records written before the
+    rollup existed, or none at all) are counted live from the records
+    with a single conditional aggregation.
+    """
+    dates = list(dates)
+    totals = {field: Sum(field) for field in COUNTER_FIELDS}
+    summaries = {
+        row.pop("date"): row
+        for row in DailyAttendanceStats.objects.filter(date__in=dates)
+        .order_by()
+        .values("date")
+        .annotate(**totals)
+    }
+
+    missing = [day for day in dates if day not in summaries]
+    if missing:
+        summaries.update(
+            (row.pop("date"), row)
+            for row in AttendanceRecord.objects.filter(date__in=missing)
+            .order_by()
+            .values("date")
+            .annotate(**_counts_query())
+        )
+
+    empty = dict.fromkeys(COUNTER_FIELDS, 0)
+    result = {}
+    for day in dates:
+        row = {**empty, **summaries.get(day, {})}
+        row["avg_hours"] = (
+            (row["hours_total"] or Decimal("0")) / row["hours_count"]
+            if row["hours_count"] else Decimal("0")
+        )
+        result[day] = row
+    return result
@@ -0,0 +1,83 @@
+"""
+Employee directory listing.
+
+Employees are listed in (lname, fname, emp_id) order one keyset page at
+a time, projected to just the columns the directory shows. A search
+query switches to the ranked matches from accounts.search instead, as a
+single page of the best SEARCH_LIMIT hits.
+"""
+from .models import AttendanceRecord, Employee
+from .pagination import PAGE_SIZE, keyset_page
+from .search import search_employee_ids
+
+
+DIRECTORY_ORDER = ["lname", "fname", "emp_id"]
+
+DIRECTORY_FIELDS = [
+    "emp_id",
+    "fname",
+    "lname",
+    "position",
+    "dept",
+    "emp_status",
+    "email",
+    "phone",
+    "date_hired",
+]
+
+
+def department_param(value):
+    """Department id from a GET parameter, or None when absent or malformed."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def directory_queryset(department_id=None, status="", archived=False):
+    employees = Employee.objects.filter(is_archived=archived)
+    if department_id:
+        employees = employees.filter(department_id=department_id)
+    if status:
+        employees = employees.filter(emp_status=status)
+    return employees
+
+
+def directory_page(params, today, size=PAGE_SIZE):
+    """
+    One page of the directory for the GET `params` (q, dept as a
+    department id, status, archived, after). Returns (rows, next_cursor); each row is a dict of
+    DIRECTORY_FIELDS plus "today_att", the employee's attendance for
+    `today` (time_in, time_out, hours_worked) or None.
+    """
+    filters = {
+        "department_id": department_param(params.get("dept")),
+        "status": params.get("status", "").strip(),
+        "archived": params.get("archived") == "1",
+    }
+    q = params.get("q", "").strip()
+    if q:
+        ranked = search_employee_ids(q, **filters)
+        by_id = {
+            row["emp_id"]: row
+            for row in Employee.objects.filter(emp_id__in=ranked).values(*DIRECTORY_FIELDS)
+        }
+        rows, next_cursor = [by_id[emp_id] for emp_id in ranked if emp_id in by_id], None
+    else:
+        rows, next_cursor = keyset_page(
+            directory_queryset(**filters).values(*DIRECTORY_FIELDS),
+            DIRECTORY_ORDER,
+            cursor=params.get("after"),
+            size=size,
+        )
+
+    attendance = {
+        record["employee_id"]: record
+        for record in AttendanceRecord.objects.filter(
+            date=today,
+            employee_id__in=[row["emp_id"] for row in rows],
+        ).values("employee_id", "time_in", "time_out", "hours_worked")
+    }
+    for row in rows:
+        row["today_att"] = attendance.get(row["emp_id"])
+    return rows, next_cursor
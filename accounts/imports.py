@@ -0,0 +1,228 @@
+"""
+Bulk employee import from an Excel workbook.
+
+The workbook is read in read-only mode and every row is validated in
+memory against sets of existing employees and usernames loaded up front.
+Valid rows are then inserted with two bulk_create() calls (users, then
+employees) in a single transaction, so an import costs a fixed handful
+of queries instead of several per row. Password hashing, the other
+per-row cost, is spread over a thread pool; PBKDF2 releases the GIL.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+import os
+
+import openpyxl
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.functions import Length
+
+from .models import Employee
+from .org_structure import resolve_position
+from .refdata import org_structure
+
+
+REQUIRED_COLUMNS = [
+    "fname", "lname", "email", "birthday",
+    "employment_status", "department", "position",
+    "salary_grade", "jo_daily_rate",
+]
+
+BATCH_SIZE = 500
+PROGRESS_EVERY = 200
+HASH_WORKERS = os.cpu_count() or 4
+
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    duplicates: list = field(default_factory=list)  # spreadsheet row numbers
+    errors: list = field(default_factory=list)      # [(row number, message)]
+
+    def summary(self):
+        return (
+            f"Uploaded: {self.created} successful, {len(self.duplicates)} duplicates, "
+            f"{len(self.errors)} failed."
+        )
+
+
+def _text(value):
+    return "" if value is None else str(value).strip()
+
+
+def generate_next_emp_id():
+    # Longest first, so EMP1000 sorts after EMP999
+    last = (
+        Employee.objects.filter(emp_id__startswith="EMP")
+        .order_by(Length("emp_id").desc(), "-emp_id")
+        .first()
+    )
+    if not last:
+        return "EMP001"
+    suffix = last.emp_id[3:]
+    try:
+        num = int(suffix)
+    except ValueError:
+        return "EMP001"
+    return f"EMP{num + 1:03d}"
+
+
+def _next_emp_id(emp_id):
+    return f"EMP{int(emp_id[3:]) + 1:03d}"
+
+
+def _build_employee(row, emp_id, structure):
+    """Employee for one spreadsheet row; raises ValidationError when invalid."""
+    fname = _text(row[0]).title()
+    lname = _text(row[1]).title()
+    email = _text(row[2]).lower()
+    dob = row[3].date() if isinstance(row[3], datetime) else row[3]
+
+    if not fname or not lname:
+        raise ValidationError("First and last name are required.")
+
+    status = _text(row[4]).lower()
+    if status == "regular":
+        dept = _text(row[5])
+        position = _text(row[6])
+        if not dept or not position:
+            raise ValidationError("Department and position are required for regular employees.")
+
+        resolved = resolve_position(dept, position, structure)
+        if resolved is None:
+            raise ValidationError(f'Unknown position "{position}" in "{dept}".')
+
+        # The salary grade comes from the plantilla, not the spreadsheet
+        position, salary_grade = resolved.title, resolved.salary_grade
+        emp_status = Employee.EmpStatus.REGULAR
+        jo_rate = None
+    elif status == "job order":
+        try:
+            jo_rate = Decimal(_text(row[8]))
+        except InvalidOperation:
+            raise ValidationError("Job order employees need a numeric daily rate.")
+
+        emp_status = Employee.EmpStatus.JOB_ORDER
+        dept = position = salary_grade = resolved = None
+    else:
+        raise ValidationError(f'Unknown employment status "{_text(row[4])}".')
+
+    emp = Employee(
+        emp_id=emp_id,
+        fname=fname,
+        lname=lname,
+        email=email,
+        dob=dob,
+        emp_status=emp_status,
+        dept=dept,
+        position=position,
+        salary_grade=salary_grade,
+        jo_daily_rate=jo_rate,
+        # bulk_create() skips the pre_save hook that links these
+        department_id=resolved.department_id if resolved else None,
+        job_position_id=resolved.id if resolved else None,
+    )
+    # emp_id is freshly generated and the keys come from the cached org
+    # structure, so skip the per-row uniqueness and foreign-key queries
+    emp.full_clean(
+        exclude=["department", "job_position"],
+        validate_unique=False,
+        validate_constraints=False,
+    )
+    return emp
+
+
+def import_employees(excel_file, first_emp_id, progress=None):
+    """
+    Create employees (and their login users) from an uploaded workbook.
+    Raises ValidationError when the file itself is unreadable or not in
+    the template format; problems with single rows end up in the report.
+
+    progress(rows_read, total_rows) is called every PROGRESS_EVERY rows.
+    """
+    try:
+        wb = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
+    except Exception:
+        raise ValidationError("Invalid Excel file.")
+
+    try:
+        sheet = wb.active
+        total = max((sheet.max_row or 1) - 1, 0)
+        rows = sheet.iter_rows(values_only=True)
+        headers = list(next(rows, ()))
+        if headers[:len(REQUIRED_COLUMNS)] != REQUIRED_COLUMNS or any(headers[len(REQUIRED_COLUMNS):]):
+            raise ValidationError("Invalid Excel format. Please use the correct template.")
+
+        report = ImportReport()
+        existing = set(Employee.objects.values_list("fname", "lname", "dob", "email"))
+        employees = []
+        emp_id = first_emp_id
+        structure = org_structure()
+
+        for row_number, row in enumerate(rows, start=2):
+            if progress and row_number % PROGRESS_EVERY == 0:
+                progress(row_number - 1, total)
+
+            row = tuple(row) + (None,) * (len(REQUIRED_COLUMNS) - len(row))
+            if not any(row):
+                continue
+
+            try:
+                emp = _build_employee(row, emp_id, structure)
+            except ValidationError as e:
+                report.errors.append((row_number, " ".join(e.messages)))
+                continue
+
+            # All four must match; rows repeated within the file count too
+            key = (emp.fname, emp.lname, emp.dob, emp.email)
+            if key in existing:
+                report.duplicates.append(row_number)
+                continue
+            existing.add(key)
+
+            employees.append(emp)
+            emp_id = _next_emp_id(emp_id)
+    finally:
+        wb.close()
+
+    if employees:
+        _create_with_users(employees)
+    report.created = len(employees)
+
+    if progress:
+        progress(total, total)
+    return report
+
+
+def _create_with_users(employees):
+    taken = set(
+        User.objects.filter(
+            username__in=[e.emp_id for e in employees]
+        ).values_list("username", flat=True)
+    )
+    new_accounts = [e for e in employees if e.emp_id not in taken]
+
+    # Initial password is the employee ID, as for single adds
+    with ThreadPoolExecutor(max_workers=HASH_WORKERS) as pool:
+        hashes = list(pool.map(make_password, [e.emp_id for e in new_accounts]))
+
+    users = [
+        User(
+            username=e.emp_id,
+            password=hashed,
+            first_name=e.fname,
+            last_name=e.lname,
+            email=User.objects.normalize_email(e.email),
+        )
+        for e, hashed in zip(new_accounts, hashes)
+    ]
+
+    with transaction.atomic():
+        User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+        for emp, user in zip(new_accounts, users):
+            emp.user = user
+        Employee.objects.bulk_create(employees, batch_size=BATCH_SIZE)
@@ -0,0 +1,305 @@
+"""
+A small database-backed job queue.
+
+Views enqueue() a Job row and return straight away; `manage.py run_worker`
+claims queued jobs one at a time and runs the handler registered for the
+job's kind. Handlers report progress with report_progress(), which the
+admin pages poll through the job_status view. No broker is needed: the
+jobs table is the queue.
+
+A handler that raises is retried with exponential backoff until the
+job's max_attempts is reached. A ValidationError means the input itself
+is bad, so the job fails immediately instead. A handler may register a
+cleanup, run once the job has succeeded or failed for good (not between
+retries), e.g. to delete its upload.
+
+The worker also runs the periodic maintenance tasks registered with
+@periodic, each at most once per interval; when each last ran is kept
+in TaskRun so every worker (and cron) agrees. A worker claims a due task
+by moving its last_run_at forward with a conditional UPDATE, so of
+several workers that find it due only one runs it.
+"""
+import logging
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+
+from .attendance import close_open_attendance
+from .imports import generate_next_emp_id, import_employees
+from .models import Job, TaskRun
+from .payroll import run_payroll
+from .qr_tokens import prune_claims
+from .tallies import rebuild_tallies
+
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+# kind -> function run once a job of that kind has finished for good
+CLEANUPS = {}
+
+# name -> (interval, function)
+PERIODIC_TASKS = {}
+
+
+def handler(kind, cleanup=None):
+    """
+    Register the function that runs jobs of `kind`, and optionally a
+    `cleanup(job)` for when the job has succeeded or failed for good.
+    """
+    def register(func):
+        HANDLERS[kind] = func
+        if cleanup is not None:
+            CLEANUPS[kind] = cleanup
+        return func
+    return register
+
+
+def enqueue(kind, payload=None, user=None, max_attempts=3):
+    return Job.objects.create(
+        kind=kind,
+        payload=payload or {},
+        created_by=user,
+        max_attempts=max_attempts,
+    )
+
+
+def report_progress(job, done, total=None, message=None):
+    changes = {"progress_done": done}
+    if total is not None:
+        changes["progress_total"] = total
+    if message is not None:
+        changes["message"] = message
+
+    Job.objects.filter(pk=job.pk).update(**changes)
+    for field, value in changes.items():
+        setattr(job, field, value)
+
+
+def claim_next(now=None):
+    """Mark the oldest due job as running and return it (None if idle)."""
+    now = now or timezone.now()
+
+    with transaction.atomic():
+        # skip_locked lets several workers share the queue on Postgres;
+        # SQLite's IMMEDIATE transactions already serialize this block
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.Status.QUEUED, run_after__lte=now)
+            .order_by("run_after", "pk")
+            .first()
+        )
+        if job is None:
+            return None
+
+        job.status = Job.Status.RUNNING
+        job.attempts += 1
+        job.started_at = now
+        job.save(update_fields=["status", "attempts", "started_at"])
+    return job
+
+
+def _retry_delay(attempts):
+    return timedelta(seconds=settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+def _fail(job, message, retry=True, now=None):
+    now = now or timezone.now()
+    job.message = message
+
+    if retry and job.attempts < job.max_attempts:
+        job.status = Job.Status.QUEUED
+        job.run_after = now + _retry_delay(job.attempts)
+    else:
+        job.status = Job.Status.FAILED
+        job.finished_at = now
+    job.save(update_fields=["status", "message", "run_after", "finished_at"])
+
+
+def run_job(job, now=None):
+    """Run a claimed job and record how it went (`now` is when it ended)."""
+    func = HANDLERS.get(job.kind)
+    if func is None:
+        _fail(job, f"No handler for job kind {job.kind!r}.", retry=False, now=now)
+        return job
+
+    try:
+        result = func(job)
+    except ValidationError as e:
+        _fail(job, " ".join(e.messages), retry=False, now=now)
+    except Exception as e:
+        logger.exception("Job %s (%s) failed", job.pk, job.kind)
+        _fail(job, f"{type(e).__name__}: {e}", now=now)
+    else:
+        job.status = Job.Status.SUCCEEDED
+        job.result = result
+        job.finished_at = now or timezone.now()
+        job.save(update_fields=["status", "result", "finished_at"])
+    finally:
+        if job.status in (Job.Status.SUCCEEDED, Job.Status.FAILED) and job.kind in CLEANUPS:
+            CLEANUPS[job.kind](job)
+    return job
+
+
+def requeue_stale(now=None):
+    """Give jobs whose worker died mid-run back to the queue (or fail them)."""
+    now = now or timezone.now()
+    stale = Job.objects.filter(
+        status=Job.Status.RUNNING,
+        started_at__lt=now - timedelta(seconds=settings.JOB_STALE_SECONDS),
+    )
+    message = "Worker stopped before the job finished."
+
+    exhausted = stale.filter(attempts__gte=F("max_attempts"))
+    to_clean = list(exhausted.filter(kind__in=list(CLEANUPS)))
+    failed = exhausted.update(
+        status=Job.Status.FAILED,
+        message=message,
+        finished_at=now,
+    )
+    for job in to_clean:
+        CLEANUPS[job.kind](job)
+    requeued = stale.update(
+        status=Job.Status.QUEUED,
+        message=message,
+        run_after=now,
+    )
+    return requeued + failed
+
+
+def run_pending(now=None):
+    """Run every job that is due right now; returns how many ran."""
+    count = 0
+    while (job := claim_next(now)) is not None:
+        run_job(job, now)
+        count += 1
+    return count
+
+
+def periodic(name, every):
+    """Register a task for the worker to run once every `every` (a timedelta)."""
+    def register(func):
+        PERIODIC_TASKS[name] = (every, func)
+        return func
+    return register
+
+
+def run_task(name, now=None):
+    """Run a periodic task now, whether or not it is due, and record the run."""
+    now = now or timezone.now()
+    _, func = PERIODIC_TASKS[name]
+    result = func(now)
+    TaskRun.objects.update_or_create(
+        name=name,
+        defaults={"last_run_at": now, "last_result": result},
+    )
+    return result
+
+
+def _claim_task(name, last, now):
+    """
+    Move `name`'s last run to `now`, provided it is still `last` (None:
+    never run). Of several workers that found the task due, only the
+    first gets True.
+    """
+    if last is None:
+        try:
+            with transaction.atomic():
+                TaskRun.objects.create(name=name, last_run_at=now)
+        except IntegrityError:
+            return False
+        return True
+    return TaskRun.objects.filter(name=name, last_run_at=last).update(last_run_at=now) == 1
+
+
+def run_periodic_tasks(now=None):
+    """
+    Run every periodic task whose interval has elapsed since its last
+    run. A task that raises is logged and its error stored as the run's
+    last_result; the others still run.
+    """
+    now = now or timezone.now()
+    last_runs = dict(TaskRun.objects.values_list("name", "last_run_at"))
+
+    ran = []
+    for name, (every, func) in PERIODIC_TASKS.items():
+        last = last_runs.get(name)
+        if last is not None and now - last < every:
+            continue
+        if not _claim_task(name, last, now):
+            continue  # another worker got there first
+        try:
+            result = func(now)
+        except Exception as e:
+            # Keep the worker (and the other tasks) going; retried next interval
+            logger.exception("Periodic task %s failed", name)
+            result = {"error": f"{type(e).__name__}: {e}"}
+        TaskRun.objects.filter(name=name).update(last_result=result)
+        ran.append(name)
+    return ran
+
+
+# ---------------------------------------------------------------------------
+# Handlers
+# ---------------------------------------------------------------------------
+
+def _delete_upload(job):
+    default_storage.delete(job.payload["path"])
+
+
+# The upload stays until the job is done with it: a retry reads it again
+@handler("import_employees", cleanup=_delete_upload)
+def _import_employees(job):
+    path = job.payload["path"]
+
+    with default_storage.open(path, "rb") as excel_file:
+        report = import_employees(
+            excel_file,
+            generate_next_emp_id(),
+            progress=lambda done, total: report_progress(job, done, total),
+        )
+
+    return {
+        "summary": report.summary(),
+        "created": report.created,
+        "duplicates": report.duplicates,
+        "errors": report.errors,
+    }
+
+
+@handler("run_payroll")
+def _run_payroll(job):
+    run = run_payroll(
+        date.fromisoformat(job.payload["period_start"]),
+        date.fromisoformat(job.payload["period_end"]),
+        user=job.created_by,
+    )
+    return {
+        "summary": f"{run}: {run.employee_count} payslips computed.",
+        "url": reverse("payroll") + f"?run={run.pk}",
+    }
+
+
+@handler("rebuild_tallies")
+def _rebuild_tallies(job):
+    years = job.payload["years"]
+    for year in years:
+        rebuild_tallies(year)
+    return {"summary": f"Attendance tallies recounted for {', '.join(map(str, years))}."}
+
+
+@periodic("close_open_attendance", every=timedelta(minutes=15))
+def _close_open_attendance(now):
+    return {"closed": close_open_attendance(now)}
+
+
+@periodic("prune_qr_claims", every=timedelta(hours=1))
+def _prune_qr_claims(now):
+    return {"deleted": prune_claims(now)}
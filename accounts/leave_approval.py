@@ -0,0 +1,141 @@
+"""
+Leave approval.
+
+Approving a leave marks every workday it covers ON LEAVE in attendance:
+days without a record get one, and days recorded as present, late or
+absent are overwritten (fieldwork and health days are kept). Any number
+of leaves is approved with a fixed handful of set-based statements in one
+transaction: a locking SELECT and one UPDATE of the existing records, one
+bulk INSERT of the missing ones (skipping days a punch created meanwhile,
+which are then put on leave by a second SELECT and UPDATE) and one UPDATE
+of the requests. Those bypass the attendance signals, so the affected
+tallies are rebuilt after and the daily rollups get the status changes
+as deltas.
+"""
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .daily_stats import STATUS_FIELDS, add_daily_stats
+from .models import AttendanceRecord, Employee, LeaveRequest
+from .tallies import rebuild_tallies
+from .workdays import workday_q, workdays
+
+
+# Statuses an approved leave overwrites. Fieldwork and health days are
+# kept, as the per-day approval in the admin view always did
+REPLACED_STATUSES = [
+    AttendanceRecord.Status.PRESENT,
+    AttendanceRecord.Status.LATE,
+    AttendanceRecord.Status.ABSENT,
+]
+
+# Leaves per UPDATE, keeping the OR of date ranges well inside SQLite's limits
+BATCH_SIZE = 100
+
+
+def _put_on_leave(leaves, count, statuses=None):
+    """
+    Lock the workday records the leaves cover (only those in `statuses`,
+    if given) and set the ones in REPLACED_STATUSES ON LEAVE, passing
+    each change to `count`. Returns the (employee_id, date) of every
+    record locked.
+    """
+    locked = set()
+    for offset in range(0, len(leaves), BATCH_SIZE):
+        ranges = reduce(or_, [
+            Q(employee_id=employee_id, date__range=(start, end))
+            for _, employee_id, start, end in leaves[offset:offset + BATCH_SIZE]
+        ])
+        existing = AttendanceRecord.objects.select_for_update().filter(ranges, workday_q())
+        if statuses is not None:
+            existing = existing.filter(status__in=statuses)
+        for employee_id, day, status in existing.values_list("employee_id", "date", "status"):
+            locked.add((employee_id, day))
+            if status in REPLACED_STATUSES:
+                count(employee_id, day, status, -1)
+                count(employee_id, day, AttendanceRecord.Status.ON_LEAVE, +1)
+
+        AttendanceRecord.objects.filter(
+            ranges,
+            workday_q(),
+            status__in=REPLACED_STATUSES,
+        ).update(status=AttendanceRecord.Status.ON_LEAVE)
+    return locked
+
+
+def approve_leaves(leave_ids, now=None):
+    """
+    Approve the pending leaves among `leave_ids` and put their workdays
+    on leave. Returns the number of leaves approved.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        leaves = list(
+            LeaveRequest.objects.select_for_update()
+            .filter(pk__in=leave_ids, status=LeaveRequest.Status.PENDING)
+            .values_list("pk", "employee_id", "start_date", "end_date")
+        )
+        if not leaves:
+            return 0
+
+        departments = dict(
+            Employee.objects.filter(pk__in={employee_id for _, employee_id, *_ in leaves})
+            .values_list("pk", "department_id")
+        )
+        stats = {}
+
+        def count(employee_id, day, status, amount):
+            delta = stats.setdefault((day, departments[employee_id] or 0), {})
+            field = STATUS_FIELDS[status]
+            delta[field] = delta.get(field, 0) + amount
+
+        recorded = _put_on_leave(leaves, count)
+
+        days = {
+            (employee_id, day)
+            for _, employee_id, start, end in leaves
+            for day in workdays(start, end)
+        }
+        missing = days - recorded
+        if missing:
+            AttendanceRecord.objects.bulk_create(
+                [
+                    AttendanceRecord(employee_id=employee_id, date=day, status=AttendanceRecord.Status.ON_LEAVE)
+                    for employee_id, day in missing
+                ],
+                batch_size=500,
+                ignore_conflicts=True,
+            )
+            # A day punched in since the read above kept the punch's record
+            # instead of ours; put those on leave like the others
+            punched = _put_on_leave(leaves, count, statuses=REPLACED_STATUSES)
+            for employee_id, day in missing - punched:
+                count(employee_id, day, AttendanceRecord.Status.ON_LEAVE, +1)
+
+        LeaveRequest.objects.filter(pk__in=[pk for pk, *_ in leaves]).update(
+            status=LeaveRequest.Status.APPROVED,
+            responded_at=now,
+        )
+
+        years = {}
+        for employee_id, day in days:
+            years.setdefault(day.year, set()).add(employee_id)
+        for year, employee_ids in years.items():
+            rebuild_tallies(year, employee_ids)
+        add_daily_stats(stats)
+    return len(leaves)
+
+
+def reject_leaves(leave_ids, now=None):
+    """Reject the pending leaves among `leave_ids`; returns how many."""
+    return LeaveRequest.objects.filter(
+        pk__in=leave_ids,
+        status=LeaveRequest.Status.PENDING,
+    ).update(
+        status=LeaveRequest.Status.REJECTED,
+        responded_at=now or timezone.now(),
+    )
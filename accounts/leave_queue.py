@@ -0,0 +1,63 @@
+"""
+Admin leave-request queue.
+
+Requests are listed newest filed first, one keyset page at a time. A
+status filter walks the (status, date_filed, id) index in order. With no
+filter the queue is what still needs attention: every pending request
+plus those decided within RECENT_DECISIONS, found through the
+(status, date_filed, id) and (status, responded_at) indexes.
+"""
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import LeaveRequest
+from .pagination import PAGE_SIZE, keyset_page
+
+
+LEAVE_QUEUE_ORDER = ["-date_filed", "-id"]
+
+RECENT_DECISIONS = timedelta(days=2)
+
+
+def leave_queue(status="", now=None):
+    requests = LeaveRequest.objects.select_related("employee")
+    if status in LeaveRequest.Status.values:
+        return requests.filter(status=status)
+
+    now = now or timezone.now()
+    return requests.filter(
+        Q(status=LeaveRequest.Status.PENDING)
+        | Q(
+            status__in=[LeaveRequest.Status.APPROVED, LeaveRequest.Status.REJECTED],
+            responded_at__gte=now - RECENT_DECISIONS,
+        )
+    )
+
+
+def leave_queue_page(params, now=None, size=PAGE_SIZE):
+    """
+    One page of the queue for the GET `params` (status, after).
+    Returns (leave requests, next_cursor).
+    """
+    return keyset_page(
+        leave_queue(params.get("status", "").strip(), now),
+        LEAVE_QUEUE_ORDER,
+        cursor=params.get("after"),
+        size=size,
+    )
+
+
+def serialize_leave(leave):
+    """The fields the queue shows, for the JSON API."""
+    return {
+        "id": leave.pk,
+        "employee": f"{leave.employee.fname} {leave.employee.lname}",
+        "leave_type": leave.get_leave_type_display(),
+        "start_date": leave.start_date,
+        "end_date": leave.end_date,
+        "reason": leave.reason,
+        "attachment": leave.attachment.url if leave.attachment else None,
+        "status": leave.status,
+    }
@@ -0,0 +1,121 @@
+"""
+Leave balances and filing rules.
+
+Approved leaves for an employee are fetched in a single query and their
+workdays counted from the work calendar's prefix sums, so the cost does
+not grow with the length of each leave (a 105-day maternity leave costs
+the same as a one-day vacation leave). Holidays inside a leave are not
+charged against the balance.
+
+validate_leave_request() checks a new request with two queries: an
+overlap query served by the (employee, end_date, start_date) index, so
+history that ended before the requested range is never read however
+long it is, and one for the balance of the requested type.
+"""
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.timezone import localdate
+
+from .models import LeaveRequest
+from .workdays import count_workdays
+
+
+LEAVE_LIMITS = {
+    "VL": 15,     # Vacation Leave (cumulative)
+    "SL": 15,     # Sick Leave (cumulative)
+    "SPL": 3,     # Special Privilege (non-cumulative)
+    "WL": 5,      # Wellness Leave (non-cumulative)
+    "PL": 7,      # Paternity Leave
+    "ML": 105,    # Maternity Leave
+    "SP": 7,      # Solo Parent Leave
+    "EL": 5,      # Emergency Leave
+}
+
+
+def used_leave_days(employee):
+    """Map of leave type code -> workdays used by approved leaves."""
+    used = dict.fromkeys(LEAVE_LIMITS, 0)
+    approved = LeaveRequest.objects.filter(
+        employee=employee,
+        status=LeaveRequest.Status.APPROVED,
+    ).values_list("leave_type", "start_date", "end_date")
+
+    for code, start, end in approved:
+        used[code] = used.get(code, 0) + count_workdays(start, end)
+    return used
+
+
+def leave_balances(employee):
+    """
+    Remaining days for every leave type, in LEAVE_LIMITS order:
+    [{"code", "name", "limit", "used", "remaining"}, ...]
+    """
+    names = dict(LeaveRequest.LeaveType.choices)
+    used = used_leave_days(employee)
+
+    return [
+        {
+            "code": code,
+            "name": names.get(code, code),
+            "limit": limit,
+            "used": used[code],
+            "remaining": max(limit - used[code], 0),
+        }
+        for code, limit in LEAVE_LIMITS.items()
+    ]
+
+
+# Requests that hold their dates and count against the balance
+ACTIVE_STATUSES = [LeaveRequest.Status.PENDING, LeaveRequest.Status.APPROVED]
+
+
+def validate_leave_request(employee, leave_type, start, end, today=None):
+    """
+    Check a new leave request and return the workdays it takes.
+
+    Raises ValidationError when the type or range is invalid, when the
+    employee is on approved leave today, when the range overlaps one of
+    their pending or approved requests, or when it needs more days than
+    are left of the type once pending requests are counted as used.
+    """
+    today = today or localdate()
+    if leave_type not in LEAVE_LIMITS:
+        raise ValidationError("Please choose a valid leave type.")
+    if end < start:
+        raise ValidationError("The end date must not be before the start date.")
+
+    requested = count_workdays(start, end)
+    if requested == 0:
+        raise ValidationError("The selected dates contain no working days.")
+
+    overlapping = Q(start_date__lte=end, end_date__gte=start)
+    on_leave_today = Q(status=LeaveRequest.Status.APPROVED, start_date__lte=today, end_date__gte=today)
+    conflicts = list(
+        LeaveRequest.objects.filter(
+            overlapping | on_leave_today,
+            employee=employee,
+            status__in=ACTIVE_STATUSES,
+            end_date__gte=min(start, today),
+        ).values_list("status", "start_date", "end_date")
+    )
+    for status, other_start, other_end in conflicts:
+        if status == LeaveRequest.Status.APPROVED and other_start <= today <= other_end:
+            raise ValidationError("You already have an active leave.")
+    if conflicts:
+        _, other_start, other_end = min(conflicts, key=lambda row: row[1])
+        raise ValidationError(
+            f"These dates overlap your leave request for {other_start:%b %d} - {other_end:%b %d, %Y}."
+        )
+
+    used = sum(
+        count_workdays(other_start, other_end)
+        for other_start, other_end in LeaveRequest.objects.filter(
+            employee=employee,
+            leave_type=leave_type,
+            status__in=ACTIVE_STATUSES,
+        ).values_list("start_date", "end_date")
+    )
+    remaining = max(LEAVE_LIMITS[leave_type] - used, 0)
+    if requested > remaining:
+        raise ValidationError(f"You only have {remaining} day(s) left for this leave type.")
+    return requested
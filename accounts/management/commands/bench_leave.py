@@ -0,0 +1,62 @@
+import timeit
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.leaves import LEAVE_LIMITS
+from accounts.workdays import count_workdays, is_workday
+
+
+def legacy_used_days(leaves, code):
+    # The original per-type, day-by-day walk from employeedash
+    used = 0
+    for leave_type, start, end in leaves:
+        if leave_type != code:
+            continue
+        current = start
+        while current <= end:
+            if is_workday(current):
+                used += 1
+            current += timedelta(days=1)
+    return used
+
+
+def closed_form_used_days(leaves):
+    used = dict.fromkeys(LEAVE_LIMITS, 0)
+    for leave_type, start, end in leaves:
+        used[leave_type] += count_workdays(start, end)
+    return used
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark leave balance computation: day-by-day walk vs work-calendar prefix sums."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--leaves", type=int, default=5, help="Maternity leaves per employee.")
+        parser.add_argument("--number", type=int, default=2000, help="Timed repetitions.")
+
+    def handle(self, *args, **options):
+        number = options["number"]
+
+        # 105 weekdays of maternity leave spans 147 calendar days
+        leaves = []
+        start = date(2020, 1, 6)
+        for _ in range(options["leaves"]):
+            leaves.append(("ML", start, start + timedelta(days=146)))
+            start += timedelta(days=365)
+        leaves.append(("VL", date(2026, 3, 2), date(2026, 3, 6)))
+
+        legacy = {code: legacy_used_days(leaves, code) for code in LEAVE_LIMITS}
+        if legacy != closed_form_used_days(leaves):
+            raise CommandError("Prefix-sum counts disagree with the day-by-day walk.")
+
+        walk = timeit.timeit(
+            lambda: [legacy_used_days(leaves, code) for code in LEAVE_LIMITS],
+            number=number,
+        )
+        closed = timeit.timeit(lambda: closed_form_used_days(leaves), number=number)
+
+        self.stdout.write(f"{len(leaves)} approved leaves, {legacy['ML']} maternity workdays")
+        self.stdout.write(f"day-by-day walk: {walk / number * 1e6:10.1f} us/employee")
+        self.stdout.write(f"prefix sums:     {closed / number * 1e6:10.1f} us/employee")
+        self.stdout.write(f"speedup:         {walk / closed:10.1f}x")
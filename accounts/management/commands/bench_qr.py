@@ -0,0 +1,30 @@
+import base64
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from accounts.qr_tokens import current_token, render_qr_png, render_qr_svg, token_svg
+
+
+class Command(BaseCommand):
+    help = "Compare the cost of rendering the kiosk QR code as PNG vs SVG (and cached SVG)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--number", type=int, default=200, help="Renders per variant.")
+
+    def handle(self, *args, **options):
+        number = options["number"]
+        token, _ = current_token()
+
+        variants = [
+            ("png", lambda: render_qr_png(token)),
+            ("png+base64", lambda: base64.b64encode(render_qr_png(token))),
+            ("svg", lambda: render_qr_svg(token)),
+            ("svg (cached)", lambda: token_svg(token)),
+        ]
+
+        self.stdout.write(f"{'variant':<14} {'ms/render':>10} {'bytes':>8}")
+        for name, fn in variants:
+            seconds = timeit.timeit(fn, number=number)
+            size = len(fn())
+            self.stdout.write(f"{name:<14} {seconds / number * 1000:>10.3f} {size:>8}")
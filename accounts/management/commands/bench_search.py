@@ -0,0 +1,88 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from accounts.models import Employee
+from accounts.search import SEARCH_LIMIT, search_employee_ids
+
+
+FIRST_NAMES = ["Juan", "Maria", "Jose", "Ana", "Pedro", "Rosa", "Mario", "Liza", "Ramon", "Carmela"]
+LAST_NAMES = [
+    "Dela Cruz", "Santos", "Reyes", "Bautista", "Garcia", "Mendoza", "Torres",
+    "Villanueva", "Ramos", "Aquino", "Castillo", "Navarro", "Santiago", "Domingo",
+]
+POSITIONS = ["Clerk", "Engineer", "Nurse", "Accountant", "Driver", "Teacher", "Assessor"]
+DEPARTMENTS = ["Accounting", "Engineering", "Health Office", "Treasury", "Agriculture"]
+
+QUERIES = ["sant", "reyes", "maria santos", "engineer", "health", "BENCH0123", "zzz"]
+
+
+def legacy_search(q):
+    # The icontains filter adminemployee used before the search index
+    return list(
+        Employee.objects.filter(
+            Q(emp_id__icontains=q)
+            | Q(fname__icontains=q)
+            | Q(lname__icontains=q)
+            | Q(position__icontains=q)
+            | Q(dept__icontains=q)
+        )
+        .order_by("lname", "fname")
+        .values_list("emp_id", flat=True)[:SEARCH_LIMIT]
+    )
+
+
+def timed(fn, q, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(q)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark employee search latency against synthetic employees. "
+        "Runs inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+        parser.add_argument("--repeat", type=int, default=20, help="Timed runs per query.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        with transaction.atomic():
+            created = 0
+            for size in sorted(options["sizes"]):
+                batch = [
+                    Employee(
+                        emp_id=f"BENCH{i:06d}",
+                        fname=rng.choice(FIRST_NAMES),
+                        lname=rng.choice(LAST_NAMES),
+                        email=f"bench{i}@example.com",
+                        position=rng.choice(POSITIONS),
+                        dept=rng.choice(DEPARTMENTS),
+                        emp_status=Employee.EmpStatus.REGULAR,
+                    )
+                    for i in range(created, size)
+                ]
+                Employee.objects.bulk_create(batch, batch_size=2000)
+                created = size
+
+                self.stdout.write(f"\n{Employee.objects.count()} employees (median / max ms)")
+                self.stdout.write(f"{'query':<16}{'search index':>22}{'icontains':>22}")
+                for q in QUERIES:
+                    indexed = timed(search_employee_ids, q, options["repeat"])
+                    legacy = timed(legacy_search, q, options["repeat"])
+                    self.stdout.write(
+                        f"{q:<16}{indexed[0]:>12.2f} / {indexed[1]:>7.2f}"
+                        f"{legacy[0]:>12.2f} / {legacy[1]:>7.2f}"
+                    )
+
+            transaction.set_rollback(True)
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from accounts.jobs import run_task
+
+
+class Command(BaseCommand):
+    help = (
+        "Time out attendance records left open once the employee's shift "
+        "has ended, at the shift's end (night shifts the next morning). "
+        "Safe to run repeatedly, e.g. from cron; run_worker also runs it "
+        "every 15 minutes."
+    )
+
+    def handle(self, *args, **options):
+        result = run_task("close_open_attendance")
+        self.stdout.write(f"Closed {result['closed']} open attendance records.")
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from accounts.synthetic import generate
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with synthetic employees, attendance, leaves, "
+        "messages and performance rows for benchmarking."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employees", type=int, default=500)
+        parser.add_argument("--years", type=int, default=2, help="Years of attendance history.")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        def progress(done, total):
+            self.stdout.write(f"{done}/{total} employees")
+
+        counts = generate(
+            employees=options["employees"],
+            years=options["years"],
+            seed=options["seed"],
+            progress=progress,
+        )
+        self.stdout.write(
+            f"Created {counts.employees} employees, {counts.attendance} attendance records, "
+            f"{counts.leaves} leave requests, {counts.messages} messages, "
+            f"{counts.performance} objectives and {counts.weekly_summaries} weekly summaries."
+        )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.utils.timezone import localdate
+
+from accounts.models import AttendanceRecord
+from accounts.tallies import rebuild_tallies
+
+
+class Command(BaseCommand):
+    help = "Recompute the yearly AttendanceTally rows from attendance records."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--year",
+            type=int,
+            action="append",
+            help="Year to rebuild (repeatable). Defaults to every year with records.",
+        )
+
+    def handle(self, *args, **options):
+        years = options["year"]
+        if not years:
+            years = sorted(
+                d.year for d in AttendanceRecord.objects.dates("date", "year")
+            ) or [localdate().year]
+
+        for year in years:
+            count = rebuild_tallies(year)
+            self.stdout.write(f"{year}: rebuilt {count} employee tallies")
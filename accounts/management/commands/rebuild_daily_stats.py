@@ -0,0 +1,39 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.daily_stats import rebuild_daily_stats
+from accounts.models import AttendanceRecord, DailyAttendanceStats
+
+
+class Command(BaseCommand):
+    help = "Recompute the DailyAttendanceStats rollups from attendance records."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="First date to rebuild (YYYY-MM-DD).")
+        parser.add_argument("--end", help="Last date to rebuild (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options["start"]) if options["start"] else None
+            end = date.fromisoformat(options["end"]) if options["end"] else None
+        except ValueError:
+            raise CommandError("--start and --end must look like YYYY-MM-DD")
+
+        if start is None and end is None:
+            count = rebuild_daily_stats()
+        else:
+            # Dates with records, plus stale rollups whose records are gone
+            in_range = {}
+            if start:
+                in_range["date__gte"] = start
+            if end:
+                in_range["date__lte"] = end
+            days = set(
+                AttendanceRecord.objects.filter(**in_range).dates("date", "day")
+            ) | set(
+                DailyAttendanceStats.objects.filter(**in_range).dates("date", "day")
+            )
+            count = rebuild_daily_stats(days)
+
+        self.stdout.write(f"Rebuilt {count} daily department rollups")
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from accounts.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Repopulate the SQLite employee search index (needed after VACUUM)."
+
+    def handle(self, *args, **options):
+        if rebuild_search_index():
+            self.stdout.write("Rebuilt the employee search index")
+        else:
+            self.stdout.write("Nothing to rebuild: this database maintains its search index itself")
@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.benchmarks import (
+    BENCHMARKS,
+    REGRESSION_THRESHOLD,
+    BenchmarkError,
+    compare,
+    load_results,
+    run_suite,
+    save_results,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the key views and services against the current database and "
+        "optionally compare with an earlier results file. Runs inside a "
+        "transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("names", nargs="*", metavar="benchmark", help=f"Any of: {', '.join(BENCHMARKS)}.")
+        parser.add_argument("--repeat", type=int, default=10, help="Timed runs per benchmark.")
+        parser.add_argument("--warmup", type=int, default=2, help="Untimed runs first.")
+        parser.add_argument("--output", help="Write the results as JSON to this file.")
+        parser.add_argument("--compare", metavar="FILE", help="Results JSON to compare against.")
+        parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="Regression threshold in percent.")
+        parser.add_argument("--fail-on-regression", action="store_true")
+
+    def handle(self, *args, **options):
+        baseline = load_results(options["compare"]) if options["compare"] else None
+
+        self.stdout.write(f"{'benchmark':<16}{'median ms':>11}{'p95 ms':>10}{'queries':>9}")
+
+        def progress(name, result):
+            self.stdout.write(
+                f"{name:<16}{result['median_ms']:>11.2f}{result['p95_ms']:>10.2f}{result['queries']:>9}"
+            )
+
+        try:
+            document = run_suite(options["names"], options["repeat"], options["warmup"], progress)
+        except BenchmarkError as e:
+            raise CommandError(str(e))
+
+        if options["output"]:
+            save_results(document, options["output"])
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if baseline is None:
+            return
+
+        self.stdout.write(f"\nAgainst {baseline.get('commit') or options['compare']} (median ms, queries)")
+        regressions = []
+        for name, before, after, change, q_before, q_after, regressed in compare(
+            document, baseline, options["threshold"]
+        ):
+            change = "n/a" if change is None else f"{change:+.1f}%"
+            line = f"{name:<16}{before:>10.2f} -> {after:>8.2f} {change:>8}   {q_before:>4} -> {q_after:<4}"
+            if regressed:
+                regressions.append(name)
+                line += "  REGRESSION"
+            self.stdout.write(line)
+
+        if regressions and options["fail_on_regression"]:
+            raise CommandError(f"Regressed: {', '.join(regressions)}")
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.timezone import localdate
+
+from accounts.payroll import month_period, run_payroll
+
+
+class Command(BaseCommand):
+    help = "Compute and store payslips for all active employees for one month."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--month",
+            help="Payroll month as YYYY-MM. Defaults to the current month.",
+        )
+
+    def handle(self, *args, **options):
+        today = localdate()
+        month = options["month"] or today.strftime("%Y-%m")
+        try:
+            year, month_num = (int(part) for part in month.split("-"))
+            period_start, period_end = month_period(year, month_num)
+        except ValueError:
+            raise CommandError("--month must look like YYYY-MM")
+
+        started = time.perf_counter()
+        run = run_payroll(period_start, period_end, today=today)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{run}: {run.employee_count} payslips, net pay {run.total_net_pay} "
+            f"({elapsed:.2f}s)"
+        )
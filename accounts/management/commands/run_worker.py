@@ -0,0 +1,54 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from accounts.jobs import claim_next, requeue_stale, run_job, run_periodic_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued background jobs (imports, payroll runs) and the periodic "
+        "maintenance tasks until stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=2.0,
+            help="Seconds to wait between polls when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit as soon as the queue is empty.",
+        )
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        while not self.stopping:
+            close_old_connections()
+            requeue_stale()
+            for name in run_periodic_tasks():
+                self.stdout.write(f"Ran periodic task {name}")
+
+            job = claim_next()
+            if job is not None:
+                started = time.perf_counter()
+                run_job(job)
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f"{job} ({elapsed:.2f}s)")
+                continue
+
+            if options["once"]:
+                break
+            time.sleep(options["sleep"])
+
+    def stop(self, signum, frame):
+        # Finish the current job, then exit
+        self.stopping = True
@@ -0,0 +1,112 @@
+# Generated by Django 5.2.8 on 2026-10-17 06:25
+
+from datetime import date, datetime, time
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+CHUNK_SIZE = 500
+
+# Statuses set by an admin or a leave approval win over punch statuses
+EXPLICIT_STATUSES = ("ON LEAVE", "fieldwork", "health")
+
+# Office hours at this migration; hours worked only count time inside them
+OFFICE_START = time(8, 0)
+OFFICE_END = time(17, 0)
+
+
+def _hours_between(time_in, time_out):
+    """Hours from time_in to time_out within office hours, to 2 places, never negative."""
+    start = datetime.combine(date.min, max(time_in, OFFICE_START))
+    end = datetime.combine(date.min, min(time_out, OFFICE_END))
+    hours = Decimal(max((end - start).total_seconds(), 0)) / Decimal("3600")
+    return hours.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def _merge_rows(rows):
+    """
+    Fold duplicate rows of one (employee, date) into the oldest one.
+    Keeps the earliest time-in and the latest time-out, and recomputes
+    hours_worked from them; with either time missing, it keeps the
+    largest hours_worked seen on any of the duplicates.
+    """
+    survivor = rows[0]
+
+    time_ins = [r.time_in for r in rows if r.time_in is not None]
+    time_outs = [r.time_out for r in rows if r.time_out is not None]
+    hours = [r.hours_worked for r in rows if r.hours_worked is not None]
+
+    statuses = {r.status for r in rows}
+    status = next((s for s in EXPLICIT_STATUSES if s in statuses), None)
+    if status is None:
+        punched = [r for r in rows if r.time_in is not None]
+        status = min(punched, key=lambda r: r.time_in).status if punched else survivor.status
+
+    survivor.time_in = min(time_ins) if time_ins else None
+    survivor.time_out = max(time_outs) if time_outs else None
+    if survivor.time_in is not None and survivor.time_out is not None:
+        survivor.hours_worked = _hours_between(survivor.time_in, survivor.time_out)
+    else:
+        survivor.hours_worked = max(hours) if hours else None
+    survivor.status = status
+    return survivor, [r.pk for r in rows[1:]]
+
+
+def merge_duplicate_attendance(apps, schema_editor):
+    AttendanceRecord = apps.get_model("accounts", "AttendanceRecord")
+
+    keys = [
+        (row["employee_id"], row["date"])
+        for row in AttendanceRecord.objects.values("employee_id", "date")
+        .annotate(n=Count("id"))
+        .filter(n__gt=1)
+        .order_by()
+    ]
+
+    for i in range(0, len(keys), CHUNK_SIZE):
+        chunk = set(keys[i:i + CHUNK_SIZE])
+
+        groups = {}
+        rows = AttendanceRecord.objects.filter(
+            employee_id__in={emp_id for emp_id, _ in chunk},
+            date__in={day for _, day in chunk},
+        ).order_by("id")
+        for rec in rows:
+            key = (rec.employee_id, rec.date)
+            if key in chunk:
+                groups.setdefault(key, []).append(rec)
+
+        survivors = []
+        doomed = []
+        for group in groups.values():
+            survivor, duplicates = _merge_rows(group)
+            survivors.append(survivor)
+            doomed.extend(duplicates)
+
+        AttendanceRecord.objects.bulk_update(
+            survivors,
+            ["time_in", "time_out", "hours_worked", "status"],
+            batch_size=CHUNK_SIZE,
+        )
+        AttendanceRecord.objects.filter(pk__in=doomed).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0016_leaverequest_responded_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_attendance, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='attendancerecord',
+            index=models.Index(fields=['date', 'status'], name='attendance_date_status_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='attendancerecord',
+            constraint=models.UniqueConstraint(fields=('employee', 'date'), name='attendance_employee_date_uniq'),
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 5.2.8 on 2026-10-17 06:27
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0017_attendancerecord_unique_employee_date'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='QRSession',
+        ),
+    ]
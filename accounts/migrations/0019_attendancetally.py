@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-17 06:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0018_delete_qrsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceTally',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('lates', models.PositiveIntegerField(default=0)),
+                ('absents', models.PositiveIntegerField(default=0)),
+                ('attended', models.PositiveIntegerField(default=0)),
+                ('last_date', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_tallies', to='accounts.employee')),
+            ],
+            options={
+                'db_table': 'attendance_tally',
+                'constraints': [models.UniqueConstraint(fields=('employee', 'year'), name='attendance_tally_employee_year_uniq')],
+            },
+        ),
+    ]
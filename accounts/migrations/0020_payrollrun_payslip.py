@@ -0,0 +1,66 @@
+# Generated by Django 5.2.8 on 2026-10-17 06:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0019_attendancetally'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayrollRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateField()),
+                ('period_end', models.DateField()),
+                ('employee_count', models.PositiveIntegerField(default=0)),
+                ('total_net_pay', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='payroll_runs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'payroll_run',
+                'ordering': ['-period_start', '-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Payslip',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateField()),
+                ('period_end', models.DateField()),
+                ('monthly', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('daily_rate', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('basic_salary', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('rata', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('absent_days', models.PositiveIntegerField(default=0)),
+                ('deductible_absents', models.DecimalField(decimal_places=2, default=0, max_digits=6)),
+                ('absence_deduction', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('philhealth', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_earnings', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('total_deductions', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('net_pay', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payslips', to='accounts.employee')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payslips', to='accounts.payrollrun')),
+            ],
+            options={
+                'db_table': 'payslip',
+                'ordering': ['employee_id'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='payrollrun',
+            constraint=models.UniqueConstraint(fields=('period_start', 'period_end'), name='payroll_run_period_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='payslip',
+            constraint=models.UniqueConstraint(fields=('employee', 'period_start', 'period_end'), name='payslip_employee_period_uniq'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-17 06:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0021_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_run_at', models.DateTimeField()),
+                ('last_result', models.JSONField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'task_run',
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-17 06:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0022_taskrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAttendanceStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('dept', models.CharField(blank=True, default='', max_length=80)),
+                ('present', models.IntegerField(default=0)),
+                ('late', models.IntegerField(default=0)),
+                ('absent', models.IntegerField(default=0)),
+                ('fieldwork', models.IntegerField(default=0)),
+                ('health', models.IntegerField(default=0)),
+                ('on_leave', models.IntegerField(default=0)),
+                ('hours_total', models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ('hours_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'daily_attendance_stats',
+                'constraints': [models.UniqueConstraint(fields=('date', 'dept'), name='daily_attendance_stats_date_dept_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-17 06:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0023_dailyattendancestats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendancerecord',
+            index=models.Index(fields=['date', 'created_at', 'id'], name='attendance_date_created_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.8 on 2026-10-17 06:52
+
+from django.db import migrations
+
+
+# Must match accounts.search.TRGM_DOCUMENT (without the table alias)
+TRGM_DOCUMENT = (
+    "lower(emp_id || ' ' || fname || ' ' || lname || ' ' "
+    "|| coalesce(position, '') || ' ' || coalesce(dept, ''))"
+)
+
+
+def create_trigram_index(apps, schema_editor):
+    # SQLite's FTS5 table and triggers are installed by the post_migrate
+    # hook in accounts.search instead, since any later migration that
+    # remakes the employee table drops its triggers.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        f"CREATE INDEX IF NOT EXISTS employee_search_trgm_idx ON employee "
+        f"USING gin (({TRGM_DOCUMENT}) gin_trgm_ops)"
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS employee_search_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0025_employee_directory_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='employee',
+            name='employee_lname_lower_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='employee',
+            name='employee_fname_lower_idx',
+        ),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,215 @@
+# Generated by Django 5.2.8 on 2026-10-17 06:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Frozen copy of accounts.org_structure.VALID_STRUCTURE at this migration
+VALID_STRUCTURE = {
+    "Office of the Municipal Mayor": {
+        "Administrative Aide I (Utility Worker I)": "SG-1",
+        "Senior Administrative Assistant II / Private Secretary II": "SG-18",
+        "Administrative Aide IV (Driver II)": "SG-4",
+        "Security Officer III": "SG-18",
+        "Barangay Health Aide": "SG-4",
+    },
+    "Office of the Municipal Administrator": {
+        "MGDH I (Municipal Administrator)": "SG-24",
+        "Waterworks Supervisor": "SG-14",
+        "Population Program Worker II": "SG-7",
+    },
+    "Office of the Municipal Vice Mayor": {
+        "Municipal Vice Mayor": "SG-25",
+    },
+    "Office of the Municipal HRMO": {
+        "MGDH I (Human Resource Management Officer)": "SG-24",
+    },
+    "Public Employment Service Office": {
+        "Senior Labor and Employment Officer": "SG-19",
+    },
+    "Office on Public Affairs & Information Assistance": {
+        "Barangay Health Aide": "SG-4",
+    },
+    "Business Permit and Licensing Office": {
+        "Senior Administrative Assistant II (Data Controller III)": "SG-15",
+    },
+    "Sangguniang Bayan Members": {
+        "Sangguniang Bayan Member": "SG-24",
+    },
+    "Office of the Secretary to the Sangguniang Bayan": {
+        "Secretary to the Sangguniang Bayan": "SG-24",
+        "Local Legislative Staff Officer III": "SG-18",
+        "Local Legislative Staff Officer II": "SG-11",
+        "Local Legislative Staff Assistant I": "SG-8",
+        "Local Legislative Staff Employee II": "SG-4",
+        "Administrative Aide II (Bookbinder II)": "SG-2",
+    },
+    "Office of the Municipal Budget": {
+        "Municipal Budget Officer": "SG-24",
+        "Administrative Aide IV (Budgeting Aide)": "SG-4",
+        "Administrative Aide I (Utility Worker I)": "SG-1",
+    },
+    "Office of the Municipal Planning & Development Coordinator": {
+        "MGDH II (Municipal Planning & Development Coordinator)": "SG-24",
+        "Administrative Officer I (Planning Officer I)": "SG-11",
+        "Administrative Aide IV (Clerk II)": "SG-4",
+        "Administrative Aide I (Utility Worker I)": "SG-1",
+    },
+    "Office of the Municipal Accountant": {
+        "Administrative Officer V (Municipal Accountant)": "SG-18",
+        "Administrative Aide IV (Clerk II)": "SG-4",
+        "Administrative Assistant III (Bookkeeper II)": "SG-9",
+        "Administrative Aide I (Utility Worker I)": "SG-1",
+    },
+    "Office of the Municipal General Services": {
+        "Administrative Aide I (Utility Worker I)": "SG-1",
+        "Administrative Aide IV (Driver II)": "SG-4",
+        "Water Pump Operator": "SG-4",
+    },
+    "Local Youth Development Office": {
+        "Youth Development Officer I": "SG-10",
+    },
+    "Office of the Municipal Treasurer": {
+        "Municipal Treasurer II": "SG-24",
+        "Cemetery Caretaker": "SG-3",
+        "Administrative Aide IV (Clerk II)": "SG-4",
+        "Administrative Officer III (Cashier II)": "SG-14",
+        "Revenue Collection Clerk II": "SG-7",
+        "Revenue Collection Clerk I": "SG-5",
+        "Administrative Aide VI (Cash Clerk III)": "SG-6",
+    },
+    "Market / Fishport": {
+        "Administrative Aide I (Utility Worker I)": "SG-1",
+    },
+    "Office of the Municipal Assessor": {
+        "Municipal Assessor II": "SG-24",
+        "Assessment Clerk I": "SG-6",
+        "Administrative Aide I (Utility Worker I)": "SG-1",
+        "Administrative Aide VI (Equipment Operator II)": "SG-8",
+    },
+    "Office of the Municipal Health Officer": {
+        "Rural Health Physician": "SG-24",
+        "Nurse I": "SG-15",
+        "Midwife II": "SG-11",
+        "Medical Technologist I": "SG-11",
+        "Ambulance Driver": "SG-4",
+        "Administrative Aide I (Utility Worker I)": "SG-1",
+        "Sanitation Inspector I": "SG-9",
+    },
+    "Nutrition Office": {
+        "Nutrition Officer II": "SG-15",
+        "Barangay Health Aide": "SG-4",
+    },
+    "Office of the Municipal Civil Registrar": {
+        "Municipal Civil Registrar II": "SG-24",
+        "Administrative Aide IV (Bookbinder II)": "SG-4",
+        "Water Pump Operator": "SG-4",
+    },
+    "Office of the Municipal Social Welfare and Development Officer": {
+        "Municipal Social Welfare and Development Officer": "SG-24",
+        "Municipal Social Welfare Assistant": "SG-8",
+        "Day Care Worker I": "SG-6",
+    },
+    "Office of the Municipal Agriculture": {
+        "Municipal Agricultural Officer": "SG-20",
+        "Agricultural Technologist": "SG-10",
+        "Administrative Aide I (Utility Worker I)": "SG-1",
+    },
+    "Office of the MENRO": {
+        "Administrative Aide IV (Records Officer II)": "SG-10",
+        "Administrative Aide I (Utility Worker I)": "SG-1",
+    },
+    "Office of the Municipal Disaster Risk Reduction & Management Officer": {
+        "Municipal Disaster Risk Reduction and Management Officer": "SG-24",
+        "Administrative Aide IV (Computer Operator II)": "SG-6",
+        "Local Disaster Risk Reduction & Management Assistant": "SG-8",
+    },
+    "Office of the Municipal Engineer": {
+        "Administrative Aide I (Utility Worker I)": "SG-1",
+    },
+}
+
+
+def seed_org_structure(apps, schema_editor):
+    """
+    Load VALID_STRUCTURE, add a department for every other label already
+    in use, then link employees to both by label (positions ignoring case).
+    """
+    Department = apps.get_model("accounts", "Department")
+    Position = apps.get_model("accounts", "Position")
+    Employee = apps.get_model("accounts", "Employee")
+
+    in_use = (
+        Employee.objects.exclude(dept__isnull=True)
+        .exclude(dept__exact="")
+        .values_list("dept", flat=True)
+        .distinct()
+    )
+    names = sorted(set(VALID_STRUCTURE) | set(in_use))
+    Department.objects.bulk_create([Department(name=name) for name in names], ignore_conflicts=True)
+    ids = dict(Department.objects.values_list("name", "id"))
+
+    Position.objects.bulk_create(
+        [
+            Position(department_id=ids[dept], title=title, salary_grade=grade)
+            for dept, positions in VALID_STRUCTURE.items()
+            for title, grade in positions.items()
+        ],
+        ignore_conflicts=True,
+    )
+
+    for name, dept_id in ids.items():
+        Employee.objects.filter(dept=name).update(department_id=dept_id)
+    for position_id, dept_id, title in Position.objects.values_list("id", "department_id", "title"):
+        Employee.objects.filter(department_id=dept_id, position__iexact=title).update(
+            job_position_id=position_id
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0026_employee_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Department',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=80, unique=True)),
+            ],
+            options={
+                'db_table': 'department',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='department',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='employees', to='accounts.department'),
+        ),
+        migrations.CreateModel(
+            name='Position',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=80)),
+                ('salary_grade', models.CharField(blank=True, max_length=20)),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='positions', to='accounts.department')),
+            ],
+            options={
+                'db_table': 'position',
+                'ordering': ['department', 'title'],
+            },
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='job_position',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='employees', to='accounts.position'),
+        ),
+        migrations.AddConstraint(
+            model_name='position',
+            constraint=models.UniqueConstraint(fields=('department', 'title'), name='position_department_title_uniq'),
+        ),
+        migrations.RunPython(seed_org_structure, migrations.RunPython.noop),
+    ]
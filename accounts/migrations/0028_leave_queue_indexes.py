@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-17 07:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0027_department_position'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['status', 'date_filed', 'id'], name='leave_status_filed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['status', 'responded_at'], name='leave_status_responded_idx'),
+        ),
+    ]
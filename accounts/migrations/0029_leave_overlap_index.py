@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-17 07:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0028_leave_queue_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='leaverequest',
+            index=models.Index(fields=['employee', 'end_date', 'start_date'], name='leave_employee_dates_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-17 07:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0029_leave_overlap_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Holiday',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('name', models.CharField(max_length=100)),
+                ('kind', models.CharField(choices=[('regular', 'Regular holiday'), ('special', 'Special non-working day')], default='regular', max_length=10)),
+            ],
+            options={
+                'db_table': 'holiday',
+                'ordering': ['date'],
+            },
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.8 on 2026-10-17 07:54
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+# Frozen copy of accounts.daily_stats.STATUS_FIELDS at this migration
+STATUS_FIELDS = {
+    "present": "present",
+    "late": "late",
+    "absent": "absent",
+    "fieldwork": "fieldwork",
+    "health": "health",
+    "ON LEAVE": "on_leave",
+}
+
+
+def clear_rollups(apps, schema_editor):
+    """The rows are keyed by label; they are recounted by department below."""
+    apps.get_model("accounts", "DailyAttendanceStats").objects.all().delete()
+
+
+def recount_rollups(apps, schema_editor):
+    AttendanceRecord = apps.get_model("accounts", "AttendanceRecord")
+    DailyAttendanceStats = apps.get_model("accounts", "DailyAttendanceStats")
+
+    counts = {field: Count("id", filter=Q(status=status)) for status, field in STATUS_FIELDS.items()}
+    rows = (
+        AttendanceRecord.objects.order_by()
+        .values("date", "employee__department_id")
+        .annotate(**counts, hours_total=Sum("hours_worked"), hours_count=Count("hours_worked"))
+    )
+    DailyAttendanceStats.objects.bulk_create(
+        [
+            DailyAttendanceStats(
+                date=row.pop("date"),
+                department_id=row.pop("employee__department_id") or 0,
+                **{**row, "hours_total": row["hours_total"] or 0},
+            )
+            for row in rows.iterator()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0031_shift_schedules'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='dailyattendancestats',
+            name='daily_attendance_stats_date_dept_uniq',
+        ),
+        migrations.RunPython(clear_rollups, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='dailyattendancestats',
+            name='dept',
+        ),
+        migrations.AddField(
+            model_name='dailyattendancestats',
+            name='department_id',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyattendancestats',
+            constraint=models.UniqueConstraint(fields=('date', 'department_id'), name='daily_attendance_stats_date_department_uniq'),
+        ),
+        migrations.RunPython(recount_rollups, clear_rollups),
+    ]
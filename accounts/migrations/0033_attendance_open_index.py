@@ -0,0 +1,17 @@
+# Generated by Django 5.2.8 on 2026-10-17 07:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0032_daily_stats_by_department'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendancerecord',
+            index=models.Index(condition=models.Q(('time_in__isnull', False), ('time_out__isnull', True)), fields=['date'], name='attendance_open_idx'),
+        ),
+    ]
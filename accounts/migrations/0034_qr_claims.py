@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-17 08:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0033_attendance_open_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QRClaim',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window', models.BigIntegerField()),
+                ('claimed_at', models.DateTimeField(auto_now_add=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.employee')),
+            ],
+            options={
+                'db_table': 'qr_claim',
+                'indexes': [models.Index(fields=['window'], name='qr_claim_window_idx')],
+                'constraints': [models.UniqueConstraint(fields=('employee', 'window'), name='qr_claim_employee_window_uniq')],
+            },
+        ),
+    ]
@@ -2,10 +2,44 @@ from decimal import Decimal
 from django.core.exceptions import ValidationError
 from datetime import date
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.conf import settings
+from django.utils import timezone
+
+
+class Department(models.Model):
+    name = models.CharField(max_length=80, unique=True)
+
+    class Meta:
+        db_table = "department"
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
+class Position(models.Model):
+    """A plantilla position within one department, with its salary grade."""
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, related_name="positions")
+    title = models.CharField(max_length=80)
+    salary_grade = models.CharField(max_length=20, blank=True)
+
+    class Meta:
+        db_table = "position"
+        ordering = ["department", "title"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["department", "title"],
+                name="position_department_title_uniq",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.department})"
 
 
 class Employee(models.Model):
@@ -39,6 +73,22 @@ class Employee(models.Model):
 
     position = models.CharField(max_length=80, null=True, blank=True)
     dept = models.CharField(max_length=80, verbose_name="Department", null=True, blank=True)
+    # Set from the dept/position labels on save (accounts.org_structure);
+    # the labels stay for display, exports and the search index
+    department = models.ForeignKey(
+        Department,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="employees",
+    )
+    job_position = models.ForeignKey(
+        Position,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="employees",
+    )
     salary_grade = models.CharField(max_length=20, verbose_name="Salary Grade", null=True, blank=True)
 
     dob = models.DateField(verbose_name="Date of Birth", null=True, blank=True)
@@ -135,6 +185,13 @@ class Employee(models.Model):
     class Meta:
         db_table = "employee"
         ordering = ["lname", "fname"]
+        indexes = [
+            # Directory listing: keyset pages in name order per archive state
+            models.Index(
+                fields=["is_archived", "lname", "fname", "emp_id"],
+                name="employee_directory_idx",
+            ),
+        ]
 
 
 class AttendanceRecord(models.Model):
@@ -176,6 +233,120 @@ class AttendanceRecord(models.Model):
     class Meta:
         db_table = "attendance_record"
         ordering = ["-date", "-created_at"]
+        constraints = [
+            # One record per employee per day; also serves (employee, date) lookups
+            models.UniqueConstraint(
+                fields=["employee", "date"],
+                name="attendance_employee_date_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["date", "status"], name="attendance_date_status_idx"),
+            # Keyset pagination of the time logs
+            models.Index(fields=["date", "created_at", "id"], name="attendance_date_created_idx"),
+            # Records left open, for close_open_attendance()
+            models.Index(
+                fields=["date"],
+                condition=models.Q(time_in__isnull=False, time_out__isnull=True),
+                name="attendance_open_idx",
+            ),
+        ]
+
+
+class QRClaim(models.Model):
+    """
+    One employee's use of one kiosk QR window (accounts.qr_tokens). The
+    unique key rejects a replayed code whichever process serves it; rows
+    are pruned once their window no longer validates.
+    """
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="+")
+    window = models.BigIntegerField()
+    claimed_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.employee_id} window {self.window}"
+
+    class Meta:
+        db_table = "qr_claim"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["employee", "window"],
+                name="qr_claim_employee_window_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["window"], name="qr_claim_window_idx"),
+        ]
+
+
+class AttendanceTally(models.Model):
+    """
+    Yearly per-employee counters over weekday attendance records.
+    Kept current by accounts.tallies on every record save/delete.
+    """
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name="attendance_tallies",
+    )
+    year = models.PositiveSmallIntegerField()
+    lates = models.PositiveIntegerField(default=0)
+    # Explicit ABSENT records; days with no record are derived at read time
+    absents = models.PositiveIntegerField(default=0)
+    # Records with any status other than ABSENT
+    attended = models.PositiveIntegerField(default=0)
+    last_date = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.employee_id} {self.year}: {self.lates} late, {self.attended} attended"
+
+    class Meta:
+        db_table = "attendance_tally"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["employee", "year"],
+                name="attendance_tally_employee_year_uniq",
+            ),
+        ]
+
+
+class DailyAttendanceStats(models.Model):
+    """
+    Per-day, per-department status counts and hours over attendance
+    records. Kept current by accounts.daily_stats on every record
+    save/delete; read by the admin dashboard.
+    """
+    date = models.DateField()
+    # The employee's Department id, 0 for none. A plain integer rather
+    # than a ForeignKey so "no department" is one row per day under the
+    # unique (date, department_id) key; a transfer moves the employee's
+    # counts to the new department (accounts.daily_stats)
+    department_id = models.PositiveIntegerField(default=0)
+
+    present = models.IntegerField(default=0)
+    late = models.IntegerField(default=0)
+    absent = models.IntegerField(default=0)
+    fieldwork = models.IntegerField(default=0)
+    health = models.IntegerField(default=0)
+    on_leave = models.IntegerField(default=0)
+
+    # Sum and count of non-null hours_worked, so the average stays exact
+    hours_total = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    hours_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.date} department {self.department_id or '(none)'}"
+
+    class Meta:
+        db_table = "daily_attendance_stats"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "department_id"],
+                name="daily_attendance_stats_date_department_uniq",
+            ),
+        ]
 
 
 class Message(models.Model):
@@ -324,11 +495,240 @@ class SalaryGrade(models.Model):
         return f"SG-{self.grade}"
 
 
+class Holiday(models.Model):
+    """A public holiday or special non-working day (see accounts.workdays)."""
+
+    class Kind(models.TextChoices):
+        REGULAR = "regular", "Regular holiday"
+        SPECIAL = "special", "Special non-working day"
+
+    date = models.DateField(unique=True)
+    name = models.CharField(max_length=100)
+    kind = models.CharField(max_length=10, choices=Kind.choices, default=Kind.REGULAR)
+
+    class Meta:
+        db_table = "holiday"
+        ordering = ["date"]
+
+    def __str__(self):
+        return f"{self.name} ({self.date:%b %d, %Y})"
+
+
+class Schedule(models.Model):
+    """
+    A shift pattern. A shift whose end is not after its start ends the
+    next day (a night shift). Time-ins later than `grace_minutes` past
+    the start are late.
+    """
+
+    name = models.CharField(max_length=80, unique=True)
+    start = models.TimeField()
+    end = models.TimeField()
+    grace_minutes = models.PositiveSmallIntegerField(default=0)
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        db_table = "schedule"
+        ordering = ["start", "name"]
+
+    def __str__(self):
+        return f"{self.name} ({self.start:%H:%M}-{self.end:%H:%M})"
+
+
+class ShiftAssignment(models.Model):
+    """
+    Puts an employee, or everyone in a department, on a schedule from
+    `starts_on` through `ends_on` (either open-ended). An employee's own
+    assignment wins over their department's (see accounts.schedules).
+    """
+
+    schedule = models.ForeignKey(Schedule, on_delete=models.CASCADE, related_name="assignments")
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="shift_assignments",
+    )
+    department = models.ForeignKey(
+        Department,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="shift_assignments",
+    )
+    starts_on = models.DateField(null=True, blank=True)
+    ends_on = models.DateField(null=True, blank=True)
+
+    class Meta:
+        db_table = "shift_assignment"
+        ordering = ["-starts_on", "id"]
+        constraints = [
+            models.CheckConstraint(
+                condition=(
+                    models.Q(employee__isnull=False, department__isnull=True)
+                    | models.Q(employee__isnull=True, department__isnull=False)
+                ),
+                name="shift_assignment_one_target",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.employee or self.department}: {self.schedule}"
+
+    def clean(self):
+        if (self.employee_id is None) == (self.department_id is None):
+            raise ValidationError("Assign the schedule to either an employee or a department.")
+        if self.starts_on and self.ends_on and self.ends_on < self.starts_on:
+            raise ValidationError("The assignment cannot end before it starts.")
+
+
+class PayrollRun(models.Model):
+    period_start = models.DateField()
+    period_end = models.DateField()
+    employee_count = models.PositiveIntegerField(default=0)
+    total_net_pay = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="payroll_runs",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Payroll {self.period_start:%b %Y}"
+
+    class Meta:
+        db_table = "payroll_run"
+        ordering = ["-period_start", "-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["period_start", "period_end"],
+                name="payroll_run_period_uniq",
+            ),
+        ]
+
+
+class Payslip(models.Model):
+    run = models.ForeignKey(
+        PayrollRun,
+        on_delete=models.CASCADE,
+        related_name="payslips",
+    )
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name="payslips",
+    )
+    # Copied from the run so an employee's payslip is one indexed lookup
+    period_start = models.DateField()
+    period_end = models.DateField()
+
+    monthly = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    daily_rate = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    basic_salary = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    rata = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    absent_days = models.PositiveIntegerField(default=0)
+    deductible_absents = models.DecimalField(max_digits=6, decimal_places=2, default=0)
+    absence_deduction = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    philhealth = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_earnings = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_deductions = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    net_pay = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.employee_id} {self.period_start:%b %Y}"
+
+    class Meta:
+        db_table = "payslip"
+        ordering = ["employee_id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["employee", "period_start", "period_end"],
+                name="payslip_employee_period_uniq",
+            ),
+        ]
+
+
+class Job(models.Model):
+    """A unit of background work, picked up by `manage.py run_worker`."""
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        SUCCEEDED = "succeeded", "Succeeded"
+        FAILED = "failed", "Failed"
+
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.QUEUED,
+    )
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+
+    progress_done = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(default=0)
+    message = models.TextField(blank=True)
+    result = models.JSONField(null=True, blank=True)
+
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="jobs",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+    @property
+    def percent(self):
+        if self.status == self.Status.SUCCEEDED:
+            return 100
+        if not self.progress_total:
+            return 0
+        return min(100, self.progress_done * 100 // self.progress_total)
+
+    class Meta:
+        db_table = "job"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="job_status_run_after_idx"),
+        ]
+
+
+class TaskRun(models.Model):
+    """When a scheduled maintenance task last ran, and what it did."""
+
+    name = models.CharField(max_length=50, unique=True)
+    last_run_at = models.DateTimeField()
+    last_result = models.JSONField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_run_at:%Y-%m-%d %H:%M}"
+
+    class Meta:
+        db_table = "task_run"
+
+
 @receiver(post_save, sender=AttendanceRecord)
 def adjust_sick_leave_for_late_and_absent(sender, instance, created, **kwargs):
     """
     On creation of a new AttendanceRecord with status LATE or ABSENT,
     deduct 0.25 day from the employee's sick_leave_balance.
+    Done as one conditional UPDATE so concurrent punches can't lose a deduction.
     """
     if not created:
         return
@@ -339,30 +739,16 @@ def adjust_sick_leave_for_late_and_absent(sender, instance, created, **kwargs):
     ]:
         return
 
-    employee = instance.employee
-    if not employee:
+    if not instance.employee_id:
         return
 
-    balance = employee.sick_leave_balance or Decimal("0")
-    new_balance = balance - Decimal("0.25")
-    if new_balance < Decimal("0"):
-        new_balance = Decimal("0")
-
-    employee.sick_leave_balance = new_balance
-    employee.save()
-
-
-import uuid
-from django.db import models
-
-class QRSession(models.Model):
-    token = models.UUIDField(default=uuid.uuid4, unique=True)
-    expires_at = models.DateTimeField()
-    is_active = models.BooleanField(default=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    Employee.objects.filter(pk=instance.employee_id).update(
+        sick_leave_balance=Greatest(
+            F("sick_leave_balance") - Decimal("0.25"),
+            Decimal("0"),
+        )
+    )
 
-    def __str__(self):
-        return f"QR {self.token} (active={self.is_active})"
 
 class LeaveRequest(models.Model):
     class LeaveType(models.TextChoices):
@@ -402,4 +788,13 @@ class LeaveRequest(models.Model):
     date_filed = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.employee} - {self.leave_type} ({self.status})"
\ No newline at end of file
+        return f"{self.employee} - {self.leave_type} ({self.status})"
+
+    class Meta:
+        indexes = [
+            # The admin leave queue (accounts.leave_queue)
+            models.Index(fields=["status", "date_filed", "id"], name="leave_status_filed_idx"),
+            models.Index(fields=["status", "responded_at"], name="leave_status_responded_idx"),
+            # Overlap checks when filing (accounts.leaves)
+            models.Index(fields=["employee", "end_date", "start_date"], name="leave_employee_dates_idx"),
+        ]
\ No newline at end of file
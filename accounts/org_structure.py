@@ -0,0 +1,207 @@
+"""
+Departments and the plantilla positions (with their salary grade) each
+one may hold.
+
+The live table is the Department/Position models; VALID_STRUCTURE is
+the seed migration 0027 loaded them from. Lookups go through the cached
+refdata.org_structure(), so validating a row or saving an employee costs
+no queries in steady state.
+
+Employee.dept and Employee.position remain free-text labels, set by the
+admin form and the importer, which only offer departments and positions
+from the table. Saving an Employee links its department and job_position
+foreign keys from them; renaming a Department or a Position rewrites the
+labels of the employees that hold it.
+"""
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+
+from . import refdata
+from .models import Department, Employee, Position
+
+
+VALID_STRUCTURE = {
+    "Office of the Municipal Mayor": {
+        "Administrative Aide I (Utility Worker I)": "SG-1",
+        "Senior Administrative Assistant II / Private Secretary II": "SG-18",
+        "Administrative Aide IV (Driver II)": "SG-4",
+        "Security Officer III": "SG-18",
+        "Barangay Health Aide": "SG-4",
+    },
+    "Office of the Municipal Administrator": {
+        "MGDH I (Municipal Administrator)": "SG-24",
+        "Waterworks Supervisor": "SG-14",
+        "Population Program Worker II": "SG-7",
+    },
+    "Office of the Municipal Vice Mayor": {
+        "Municipal Vice Mayor": "SG-25",
+    },
+    "Office of the Municipal HRMO": {
+        "MGDH I (Human Resource Management Officer)": "SG-24",
+    },
+    "Public Employment Service Office": {
+        "Senior Labor and Employment Officer": "SG-19",
+    },
+    "Office on Public Affairs & Information Assistance": {
+        "Barangay Health Aide": "SG-4",
+    },
+    "Business Permit and Licensing Office": {
+        "Senior Administrative Assistant II (Data Controller III)": "SG-15",
+    },
+    "Sangguniang Bayan Members": {
+        "Sangguniang Bayan Member": "SG-24",
+    },
+    "Office of the Secretary to the Sangguniang Bayan": {
+        "Secretary to the Sangguniang Bayan": "SG-24",
+        "Local Legislative Staff Officer III": "SG-18",
+        "Local Legislative Staff Officer II": "SG-11",
+        "Local Legislative Staff Assistant I": "SG-8",
+        "Local Legislative Staff Employee II": "SG-4",
+        "Administrative Aide II (Bookbinder II)": "SG-2",
+    },
+    "Office of the Municipal Budget": {
+        "Municipal Budget Officer": "SG-24",
+        "Administrative Aide IV (Budgeting Aide)": "SG-4",
+        "Administrative Aide I (Utility Worker I)": "SG-1",
+    },
+    "Office of the Municipal Planning & Development Coordinator": {
+        "MGDH II (Municipal Planning & Development Coordinator)": "SG-24",
+        "Administrative Officer I (Planning Officer I)": "SG-11",
+        "Administrative Aide IV (Clerk II)": "SG-4",
+        "Administrative Aide I (Utility Worker I)": "SG-1",
+    },
+    "Office of the Municipal Accountant": {
+        "Administrative Officer V (Municipal Accountant)": "SG-18",
+        "Administrative Aide IV (Clerk II)": "SG-4",
+        "Administrative Assistant III (Bookkeeper II)": "SG-9",
+        "Administrative Aide I (Utility Worker I)": "SG-1",
+    },
+    "Office of the Municipal General Services": {
+        "Administrative Aide I (Utility Worker I)": "SG-1",
+        "Administrative Aide IV (Driver II)": "SG-4",
+        "Water Pump Operator": "SG-4",
+    },
+    "Local Youth Development Office": {
+        "Youth Development Officer I": "SG-10",
+    },
+    "Office of the Municipal Treasurer": {
+        "Municipal Treasurer II": "SG-24",
+        "Cemetery Caretaker": "SG-3",
+        "Administrative Aide IV (Clerk II)": "SG-4",
+        "Administrative Officer III (Cashier II)": "SG-14",
+        "Revenue Collection Clerk II": "SG-7",
+        "Revenue Collection Clerk I": "SG-5",
+        "Administrative Aide VI (Cash Clerk III)": "SG-6",
+    },
+    "Market / Fishport": {
+        "Administrative Aide I (Utility Worker I)": "SG-1",
+    },
+    "Office of the Municipal Assessor": {
+        "Municipal Assessor II": "SG-24",
+        "Assessment Clerk I": "SG-6",
+        "Administrative Aide I (Utility Worker I)": "SG-1",
+        "Administrative Aide VI (Equipment Operator II)": "SG-8",
+    },
+    "Office of the Municipal Health Officer": {
+        "Rural Health Physician": "SG-24",
+        "Nurse I": "SG-15",
+        "Midwife II": "SG-11",
+        "Medical Technologist I": "SG-11",
+        "Ambulance Driver": "SG-4",
+        "Administrative Aide I (Utility Worker I)": "SG-1",
+        "Sanitation Inspector I": "SG-9",
+    },
+    "Nutrition Office": {
+        "Nutrition Officer II": "SG-15",
+        "Barangay Health Aide": "SG-4",
+    },
+    "Office of the Municipal Civil Registrar": {
+        "Municipal Civil Registrar II": "SG-24",
+        "Administrative Aide IV (Bookbinder II)": "SG-4",
+        "Water Pump Operator": "SG-4",
+    },
+    "Office of the Municipal Social Welfare and Development Officer": {
+        "Municipal Social Welfare and Development Officer": "SG-24",
+        "Municipal Social Welfare Assistant": "SG-8",
+        "Day Care Worker I": "SG-6",
+    },
+    "Office of the Municipal Agriculture": {
+        "Municipal Agricultural Officer": "SG-20",
+        "Agricultural Technologist": "SG-10",
+        "Administrative Aide I (Utility Worker I)": "SG-1",
+    },
+    "Office of the MENRO": {
+        "Administrative Aide IV (Records Officer II)": "SG-10",
+        "Administrative Aide I (Utility Worker I)": "SG-1",
+    },
+    "Office of the Municipal Disaster Risk Reduction & Management Officer": {
+        "Municipal Disaster Risk Reduction and Management Officer": "SG-24",
+        "Administrative Aide IV (Computer Operator II)": "SG-6",
+        "Local Disaster Risk Reduction & Management Assistant": "SG-8",
+    },
+    "Office of the Municipal Engineer": {
+        "Administrative Aide I (Utility Worker I)": "SG-1",
+    },
+}
+
+
+def department_id(name, structure=None):
+    """Primary key of the department called `name`, or None."""
+    structure = structure or refdata.org_structure()
+    return structure["departments"].get(name)
+
+
+def resolve_position(dept, position, structure=None):
+    """
+    The refdata.PlantillaPosition for a department/position pair, or None.
+    Matching ignores case so spreadsheet capitalisation ("Nurse i",
+    "MGDH I") does not reject a valid position.
+    """
+    structure = structure or refdata.org_structure()
+    return structure["positions"].get(dept, {}).get(position.lower())
+
+
+def position_map(structure=None):
+    """{department name: [{"value", "label", "sg"}]} for the employee form's position picker."""
+    structure = structure or refdata.org_structure()
+    return {
+        dept: [
+            {"value": found.title, "label": found.title, "sg": found.salary_grade}
+            for found in positions.values()
+        ]
+        for dept, positions in structure["positions"].items()
+    }
+
+
+def link_employee(employee, structure=None):
+    """
+    Point department/job_position at the rows named by the labels; a
+    label with no matching row leaves the key empty.
+    """
+    structure = structure or refdata.org_structure()
+    dept = (employee.dept or "").strip()
+    employee.department_id = department_id(dept, structure)
+
+    found = resolve_position(dept, employee.position or "", structure)
+    employee.job_position_id = found.id if found else None
+
+
+@receiver(pre_save, sender=Employee)
+def link_employee_on_save(sender, instance, update_fields=None, **kwargs):
+    # A save(update_fields=[...]) that changes a label must link it itself
+    if update_fields is None:
+        link_employee(instance)
+
+
+@receiver(post_save, sender=Department)
+def relabel_department(sender, instance, created, **kwargs):
+    if not created:
+        Employee.objects.filter(department=instance).exclude(dept=instance.name).update(dept=instance.name)
+
+
+@receiver(post_save, sender=Position)
+def relabel_position(sender, instance, created, **kwargs):
+    if not created:
+        Employee.objects.filter(job_position=instance).exclude(position=instance.title).update(
+            position=instance.title
+        )
@@ -0,0 +1,76 @@
+"""
+Keyset ("seek") pagination.
+
+Instead of OFFSET, each page asks for rows strictly after the last row
+of the previous page in the sort order, so page 200 costs the same as
+page 1 and rows inserted meanwhile never shift a page. The sort key must
+be unique (end it with the primary key) and made of the model's own
+concrete fields.
+
+The position is handed to the client as an opaque cursor string.
+"""
+import base64
+import json
+
+from django.db.models import Q
+
+
+PAGE_SIZE = 50
+
+
+def encode_cursor(values):
+    raw = json.dumps([None if v is None else str(v) for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(model, fields, cursor):
+    """Values for `fields` from a cursor, or None if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(raw, list) or len(raw) != len(fields):
+            return None
+        return [
+            model._meta.get_field(name.lstrip("-")).to_python(value)
+            for name, value in zip(fields, raw)
+        ]
+    except Exception:
+        return None
+
+
+def _after(fields, values):
+    """Q for rows after `values` in the order given by `fields` ("-x" = descending)."""
+    condition = Q()
+    equal = Q()
+    for name, value in zip(fields, values):
+        column = name.lstrip("-")
+        op = "lt" if name.startswith("-") else "gt"
+        condition |= equal & Q(**{f"{column}__{op}": value})
+        equal &= Q(**{column: value})
+    return condition
+
+
+def keyset_page(queryset, fields, cursor=None, size=PAGE_SIZE):
+    """
+    One page of `queryset` ordered by `fields`, starting after `cursor`.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    Works for model instances and .values() rows alike.
+    """
+    queryset = queryset.order_by(*fields)
+    if cursor:
+        values = decode_cursor(queryset.model, fields, cursor)
+        if values is not None:
+            queryset = queryset.filter(_after(fields, values))
+
+    rows = list(queryset[:size + 1])
+    if len(rows) <= size:
+        return rows, None
+
+    rows = rows[:size]
+    last = rows[-1]
+    names = [name.lstrip("-") for name in fields]
+    if isinstance(last, dict):
+        key = [last[name] for name in names]
+    else:
+        key = [getattr(last, queryset.model._meta.get_field(name).attname) for name in names]
+    return rows, encode_cursor(key)
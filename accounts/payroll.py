@@ -0,0 +1,302 @@
+"""
+Payroll calculation.
+
+compute_payslip() produces the figures shown on an employee's payslip
+for one period. Attendance for the period is aggregated in SQL and the
+yearly sick-leave usage comes from the materialized AttendanceTally, so
+the number of queries does not depend on how far into the year we are.
+
+run_payroll() does the same for every active employee in a handful of
+grouped queries and stores the results as a PayrollRun with Payslips.
+"""
+import calendar
+import re
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import AttendanceRecord, Employee, PayrollRun, Payslip
+from .refdata import salary_grades
+from .tallies import yearly_attendance, yearly_attendance_many
+from .workdays import count_workdays, workday_q
+
+
+PAYABLE_STATUSES = [
+    AttendanceRecord.Status.PRESENT,
+    AttendanceRecord.Status.LATE,
+    AttendanceRecord.Status.FIELDWORK,
+    AttendanceRecord.Status.HEALTH,
+]
+
+WORKING_DAYS_PER_MONTH = Decimal("21.75")
+ANNUAL_SICK_LEAVE = Decimal("15")
+LATE_WEIGHT = Decimal("0.25")
+PHILHEALTH_RATE = Decimal("0.025")
+RATA = Decimal("1000.00")
+CENTS = Decimal("0.01")
+
+
+PAYSLIP_FIELDS = [
+    "monthly",
+    "basic_salary",
+    "rata",
+    "total_earnings",
+    "total_deductions",
+    "net_pay",
+    "daily_rate",
+    "absent_days",
+    "deductible_absents",
+    "philhealth",
+    "absence_deduction",
+]
+
+
+def month_period(year, month):
+    last_day = calendar.monthrange(year, month)[1]
+    return date(year, month, 1), date(year, month, last_day)
+
+
+def monthly_periods(hire_date, today):
+    """Calendar months from the hire month through the current month."""
+    periods = []
+    current = date(hire_date.year, hire_date.month, 1)
+
+    while current <= today:
+        last_day = calendar.monthrange(current.year, current.month)[1]
+        periods.append((current, current.replace(day=last_day)))
+
+        if current.month == 12:
+            current = current.replace(year=current.year + 1, month=1, day=1)
+        else:
+            current = current.replace(month=current.month + 1, day=1)
+    return periods
+
+
+def salary_grade_number(salary_grade):
+    """'SG-18' -> 18; None when the employee has no usable grade."""
+    match = re.search(r"\d+", salary_grade or "")
+    return int(match.group()) if match else None
+
+
+def absence_window(employee, period_start, period_end, today):
+    """Days of the period that can count as absences: hired and not in the future."""
+    hire_date = employee.date_hired or today
+    return max(period_start, hire_date), min(period_end, today)
+
+
+def period_counts_query(window_start, window_end):
+    """Aggregates (payable, lates, attended) for records in one period."""
+    return {
+        "payable": Count(
+            "date",
+            distinct=True,
+            filter=Q(status__in=PAYABLE_STATUSES),
+        ),
+        "lates": Count("id", filter=Q(status=AttendanceRecord.Status.LATE)),
+        "attended": Count(
+            "id",
+            filter=Q(date__range=(window_start, window_end))
+            & workday_q()
+            & ~Q(status=AttendanceRecord.Status.ABSENT),
+        ),
+    }
+
+
+def settle(employee, monthly, payable_days, absent_days, period_lates, year_lates, year_absents):
+    """
+    Turn attendance counts into payslip amounts. Pure arithmetic, shared
+    by the per-employee payslip and the batch payroll run.
+    """
+    monthly = Decimal("0.00") if monthly is None else monthly
+    absence_deduction = Decimal("0.00")
+    deductible_absents = 0
+    rata = Decimal("0.00")
+
+    if employee.emp_status == Employee.EmpStatus.JOB_ORDER:
+        monthly = Decimal("0.00")
+        daily_rate = employee.jo_daily_rate or Decimal("0")
+        basic_salary = (daily_rate * Decimal(payable_days)).quantize(CENTS)
+        absent_days = 0
+    else:
+        daily_rate = (monthly / WORKING_DAYS_PER_MONTH).quantize(CENTS)
+        basic_salary = monthly
+
+        leave_used = Decimal(year_absents) + Decimal(year_lates) * LATE_WEIGHT
+        remaining_sick_leave = max(ANNUAL_SICK_LEAVE - leave_used, 0)
+
+        period_leave_used = Decimal(absent_days) + Decimal(period_lates) * LATE_WEIGHT
+
+        if remaining_sick_leave > 0:
+            deductible_absents = max(period_leave_used - remaining_sick_leave, 0)
+        else:
+            deductible_absents = period_leave_used
+
+        # Hard cap: the deduction cannot exceed the salary
+        absence_deduction = min(daily_rate * deductible_absents, monthly).quantize(CENTS)
+        rata = RATA
+
+    philhealth = (monthly * PHILHEALTH_RATE).quantize(CENTS)
+    total_earnings = basic_salary + rata
+    total_deductions = philhealth + absence_deduction
+
+    return {
+        "monthly": monthly,
+        "basic_salary": basic_salary,
+        "rata": rata,
+        "total_earnings": total_earnings,
+        "total_deductions": total_deductions,
+        "net_pay": total_earnings - total_deductions,
+        "daily_rate": daily_rate,
+        "absent_days": absent_days,
+        "deductible_absents": deductible_absents,
+        "philhealth": philhealth,
+        "absence_deduction": absence_deduction,
+    }
+
+
+def compute_payslip(employee, period_start, period_end, today):
+    """Payslip amounts for `employee` over [period_start, period_end]."""
+    window_start, window_end = absence_window(employee, period_start, period_end, today)
+
+    counts = AttendanceRecord.objects.filter(
+        employee=employee,
+        date__range=(period_start, period_end),
+    ).aggregate(**period_counts_query(window_start, window_end))
+
+    if employee.emp_status == Employee.EmpStatus.JOB_ORDER:
+        return settle(employee, None, counts["payable"], 0, 0, 0, 0)
+
+    grade = salary_grade_number(employee.salary_grade)
+    monthly = salary_grades().get(grade)
+
+    absent_days = max(count_workdays(window_start, window_end) - counts["attended"], 0)
+
+    year_start = date(today.year, 1, 1)
+    year_lates, year_absents = yearly_attendance(
+        employee,
+        today,
+        start=max(year_start, employee.date_hired or today),
+    )
+
+    return settle(
+        employee,
+        monthly or Decimal("0"),
+        counts["payable"],
+        absent_days,
+        counts["lates"],
+        year_lates,
+        year_absents,
+    )
+
+
+def stored_payslip(employee, period_start, period_end):
+    """
+    Amounts from the latest payroll run for this period, or None. A run
+    made before the period ended only counted attendance up to its run
+    date, so it is ignored and the caller computes the payslip live.
+    """
+    return (
+        Payslip.objects.filter(
+            employee=employee,
+            period_start=period_start,
+            period_end=period_end,
+            run__completed_at__date__gt=period_end,
+        )
+        .values(*PAYSLIP_FIELDS)
+        .first()
+    )
+
+
+def run_payroll(period_start, period_end, today=None, user=None):
+    """
+    Compute and store payslips for every non-archived employee.
+    Re-running a period replaces its previous payslips.
+    """
+    today = today or timezone.localdate()
+    window_end = min(period_end, today)
+
+    employees = list(
+        Employee.objects.filter(is_archived=False).only(
+            "emp_id", "emp_status", "salary_grade", "jo_daily_rate", "date_hired",
+        )
+    )
+    grades = salary_grades()
+
+    # Same aggregates as compute_payslip(), grouped by employee; the
+    # absence window starts at each employee's own hire date
+    in_window = Q(date__lte=window_end) & (
+        Q(date__gte=F("employee__date_hired"))
+        | Q(employee__date_hired__isnull=True, date__gte=today)
+    )
+    counts = {
+        row["employee_id"]: row
+        for row in AttendanceRecord.objects.filter(
+            date__range=(period_start, period_end),
+            employee__is_archived=False,
+        )
+        .order_by()
+        .values("employee_id")
+        .annotate(
+            payable=Count("date", distinct=True, filter=Q(status__in=PAYABLE_STATUSES)),
+            lates=Count("id", filter=Q(status=AttendanceRecord.Status.LATE)),
+            attended=Count(
+                "id",
+                filter=in_window
+                & workday_q()
+                & ~Q(status=AttendanceRecord.Status.ABSENT),
+            ),
+        )
+    }
+
+    regulars = [e for e in employees if e.emp_status != Employee.EmpStatus.JOB_ORDER]
+    yearly = yearly_attendance_many(regulars, today)
+
+    empty = {"payable": 0, "lates": 0, "attended": 0}
+    payslips = []
+    for employee in employees:
+        row = counts.get(employee.pk, empty)
+
+        if employee.emp_status == Employee.EmpStatus.JOB_ORDER:
+            amounts = settle(employee, None, row["payable"], 0, 0, 0, 0)
+        else:
+            start, end = absence_window(employee, period_start, period_end, today)
+            absent_days = max(count_workdays(start, end) - row["attended"], 0)
+            year_lates, year_absents = yearly[employee.pk]
+            monthly = grades.get(salary_grade_number(employee.salary_grade), Decimal("0"))
+            amounts = settle(
+                employee,
+                monthly,
+                row["payable"],
+                absent_days,
+                row["lates"],
+                year_lates,
+                year_absents,
+            )
+
+        payslips.append(Payslip(
+            employee=employee,
+            period_start=period_start,
+            period_end=period_end,
+            **amounts,
+        ))
+
+    with transaction.atomic():
+        run, _ = PayrollRun.objects.update_or_create(
+            period_start=period_start,
+            period_end=period_end,
+            defaults={
+                "created_by": user,
+                "employee_count": len(payslips),
+                "total_net_pay": sum((p.net_pay for p in payslips), Decimal("0")),
+                "completed_at": timezone.now(),
+            },
+        )
+        Payslip.objects.filter(run=run).delete()
+        for payslip in payslips:
+            payslip.run = run
+        Payslip.objects.bulk_create(payslips, batch_size=500)
+
+    return run
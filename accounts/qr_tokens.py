@@ -0,0 +1,116 @@
+"""
+Rotating kiosk QR tokens.
+
+The kiosk displays one token per time window and every employee can scan
+it until the window (plus one window of grace for slow GPS fixes) has
+passed. A token is "<window>:<hmac>", so validating it needs no database
+access. Replays by the same employee are rejected by a unique QRClaim
+row per (employee, window), so they are caught whichever process or
+server handles the second scan.
+The rendered QR image is cached per token so every kiosk and refresh in
+a window reuses the same SVG.
+"""
+import json
+from datetime import datetime
+from io import BytesIO
+
+import qrcode
+import qrcode.image.svg
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .models import QRClaim
+
+
+HMAC_SALT = "accounts.qr_tokens"
+
+
+def _window_seconds():
+    return getattr(settings, "QR_TOKEN_WINDOW_SECONDS", 30)
+
+
+def _window(now):
+    return int(now.timestamp()) // _window_seconds()
+
+
+def _sign(window):
+    return salted_hmac(HMAC_SALT, str(window)).hexdigest()[:20]
+
+
+def current_token(now=None):
+    """Return (token, expires_at) for the window containing `now`."""
+    now = now or timezone.now()
+    window = _window(now)
+    expires_at = datetime.fromtimestamp(
+        (window + 1) * _window_seconds(),
+        tz=timezone.get_current_timezone(),
+    )
+    return f"{window}:{_sign(window)}", expires_at
+
+
+def validate_token(token, now=None):
+    """
+    Return the token's window number if it is authentic and belongs to
+    the current or the previous window, otherwise None.
+    """
+    try:
+        window_str, signature = token.split(":", 1)
+        window = int(window_str)
+    except (AttributeError, ValueError):
+        return None
+
+    current = _window(now or timezone.now())
+    if window not in (current, current - 1):
+        return None
+    if not constant_time_compare(signature, _sign(window)):
+        return None
+    return window
+
+
+def claim_token(employee, window):
+    """
+    Mark `window` as used by `employee`.
+    Returns False if this employee already submitted this exact code.
+    """
+    try:
+        with transaction.atomic():
+            QRClaim.objects.create(employee=employee, window=window)
+    except IntegrityError:
+        return False
+    return True
+
+
+def prune_claims(now=None):
+    """Delete the claims of windows whose tokens no longer validate; returns how many."""
+    current = _window(now or timezone.now())
+    deleted, _ = QRClaim.objects.filter(window__lt=current - 1).delete()
+    return deleted
+
+
+def render_qr_png(token):
+    """Encode the kiosk payload for `token` as PNG bytes."""
+    buffer = BytesIO()
+    qrcode.make(json.dumps({"token": token})).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def render_qr_svg(token):
+    """Encode the kiosk payload for `token` as an inline SVG string."""
+    image = qrcode.make(
+        json.dumps({"token": token}),
+        image_factory=qrcode.image.svg.SvgPathImage,
+    )
+    return image.to_string(encoding="unicode")
+
+
+def token_svg(token):
+    """Cached render_qr_svg(): generated once per token, shared by all kiosks."""
+    key = f"qr-svg:{token}"
+    svg = cache.get(key)
+    if svg is None:
+        svg = render_qr_svg(token)
+        cache.set(key, svg, timeout=_window_seconds() * 2)
+    return svg
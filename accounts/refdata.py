@@ -0,0 +1,164 @@
+"""
+Cached reference data.
+
+Salary grades, the org structure (departments and their positions), the
+holiday table and shift schedules change a few times a year but are read
+by most admin pages, every payslip, every punch and every employee save.
+They live in the default cache under versioned keys: a reader looks up
+the current version of a name, then the data stored under that version.
+The receivers below store a new version whenever one of those rows
+(SalaryGrade, Department, Position, Holiday, Schedule, ShiftAssignment)
+is saved or deleted. The next read reloads from the database, and
+superseded entries simply expire.
+
+With the local-memory backend every process has its own copy, so a
+change made in another process shows up within REFDATA_TIMEOUT seconds;
+set CACHE_DIR to share one cache between processes.
+
+Writes that bypass signals (queryset.update(), bulk_create()) must call
+invalidate() for the names they touched.
+"""
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Department, Holiday, Position, SalaryGrade, Schedule, ShiftAssignment
+
+
+SALARY_GRADES = "salary_grades"
+ORG_STRUCTURE = "org_structure"
+HOLIDAYS = "holidays"
+SHIFT_ASSIGNMENTS = "shift_assignments"
+
+PlantillaPosition = namedtuple("PlantillaPosition", "id department_id title salary_grade")
+AssignedShift = namedtuple("AssignedShift", "starts_on ends_on start end grace_minutes")
+
+
+def _version_key(name):
+    return f"refdata:{name}:version"
+
+
+def _version(name):
+    version = cache.get(_version_key(name))
+    if version is None:
+        # Fresh per process start / eviction, so it never revives old data
+        version = time.time_ns()
+        cache.set(_version_key(name), version, timeout=None)
+    return version
+
+
+def version(name):
+    """
+    The current version of `name`, for keying data derived from it: a
+    value built from one version is stale as soon as this changes.
+    """
+    return _version(name)
+
+
+def invalidate(*names):
+    cache.set_many({_version_key(name): time.time_ns() for name in names}, timeout=None)
+
+
+def _cached(name, load):
+    key = f"refdata:{name}:{_version(name)}"
+    value = cache.get(key)
+    if value is None:
+        value = load()
+        cache.set(key, value, timeout=settings.REFDATA_TIMEOUT)
+    return value
+
+
+def salary_grades():
+    """{grade number: monthly salary}, in grade order."""
+    return _cached(
+        SALARY_GRADES,
+        lambda: dict(SalaryGrade.objects.order_by("grade").values_list("grade", "monthly_salary")),
+    )
+
+
+def _load_org_structure():
+    structure = {
+        "departments": dict(Department.objects.order_by("name").values_list("name", "id")),
+        "positions": {},
+    }
+    rows = Position.objects.order_by("department__name", "title").values_list(
+        "department__name", "id", "department_id", "title", "salary_grade",
+    )
+    for dept, *position in rows:
+        found = PlantillaPosition(*position)
+        structure["positions"].setdefault(dept, {})[found.title.lower()] = found
+    return structure
+
+
+def org_structure():
+    """
+    {"departments": {name: id}, "positions": {department name: {lowercased
+    title: PlantillaPosition}}}, all in name order.
+    """
+    return _cached(ORG_STRUCTURE, _load_org_structure)
+
+
+def departments():
+    """(id, name) of every department, sorted by name."""
+    return [(dept_id, name) for name, dept_id in org_structure()["departments"].items()]
+
+
+def holidays():
+    """{date: name} of every holiday, in date order."""
+    return _cached(
+        HOLIDAYS,
+        lambda: dict(Holiday.objects.order_by("date").values_list("date", "name")),
+    )
+
+
+def _load_shift_assignments():
+    lookup = {"employees": {}, "departments": {}}
+    rows = (
+        ShiftAssignment.objects.filter(schedule__is_active=True)
+        .order_by(F("starts_on").desc(nulls_last=True), "-id")
+        .values_list(
+            "employee_id", "department_id", "starts_on", "ends_on",
+            "schedule__start", "schedule__end", "schedule__grace_minutes",
+        )
+    )
+    for employee_id, department_id, *shift in rows:
+        if employee_id is not None:
+            lookup["employees"].setdefault(employee_id, []).append(AssignedShift(*shift))
+        else:
+            lookup["departments"].setdefault(department_id, []).append(AssignedShift(*shift))
+    return lookup
+
+
+def shift_assignments():
+    """
+    {"employees": {emp_id: [AssignedShift]}, "departments": {department
+    id: [AssignedShift]}} for active schedules, latest start first.
+    """
+    return _cached(SHIFT_ASSIGNMENTS, _load_shift_assignments)
+
+
+@receiver([post_save, post_delete], sender=SalaryGrade)
+def salary_grades_changed(sender, **kwargs):
+    invalidate(SALARY_GRADES)
+
+
+@receiver([post_save, post_delete], sender=Department)
+@receiver([post_save, post_delete], sender=Position)
+def org_structure_changed(sender, **kwargs):
+    invalidate(ORG_STRUCTURE)
+
+
+@receiver([post_save, post_delete], sender=Holiday)
+def holidays_changed(sender, **kwargs):
+    invalidate(HOLIDAYS)
+
+
+@receiver([post_save, post_delete], sender=Schedule)
+@receiver([post_save, post_delete], sender=ShiftAssignment)
+def shift_assignments_changed(sender, **kwargs):
+    invalidate(SHIFT_ASSIGNMENTS)
@@ -0,0 +1,112 @@
+"""
+Shift schedules.
+
+Every employee works a Shift on a given day: the schedule of their own
+ShiftAssignment covering that day, else their department's, else
+DEFAULT_SHIFT. Assignments are read from the reference-data cache
+(accounts.refdata), so resolving a shift costs no queries and punches
+keep their fixed query count.
+
+A shift whose end is not after its start crosses midnight. Its
+attendance record is dated the day the shift starts. A punch belongs to
+the previous day's night shift until halfway between that shift's end
+and the start of the day's own shift.
+"""
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.utils import timezone
+
+from .refdata import shift_assignments
+
+
+@dataclass(frozen=True)
+class Shift:
+    start: time
+    end: time
+    grace: timedelta = timedelta()
+
+    @property
+    def overnight(self):
+        return self.end <= self.start
+
+    def bounds(self, day):
+        """(start, end) of the shift that starts on `day`, as aware datetimes."""
+        end_day = day + timedelta(days=1) if self.overnight else day
+        return (
+            timezone.make_aware(datetime.combine(day, self.start)),
+            timezone.make_aware(datetime.combine(end_day, self.end)),
+        )
+
+    def at(self, day, clock):
+        """
+        The aware datetime of a time recorded on `day`'s record. On a night
+        shift, times before the middle of the off-duty hours are the next
+        morning's.
+        """
+        if self.overnight:
+            start, end = self.bounds(day)
+            off_duty_middle = end + (start + timedelta(days=1) - end) / 2
+            moment = timezone.make_aware(datetime.combine(day + timedelta(days=1), clock))
+            if moment < off_duty_middle:
+                return moment
+        return timezone.make_aware(datetime.combine(day, clock))
+
+    def is_late(self, day, time_in):
+        """Whether a time-in at `time_in` (aware) is late for `day`'s shift."""
+        return time_in > self.bounds(day)[0] + self.grace
+
+    def hours(self, day, time_in, time_out):
+        """Hours between two aware datetimes that fall within `day`'s shift."""
+        start, end = self.bounds(day)
+        worked = min(time_out, end) - max(time_in, start)
+        hours = Decimal(max(worked.total_seconds(), 0)) / Decimal("3600")
+        return hours.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+# Office hours for anyone without an assignment: time-ins after 8:15 are late
+DEFAULT_SHIFT = Shift(start=time(8, 0), end=time(17, 0), grace=timedelta(minutes=15))
+
+
+def resolve_shift(employee_id, department_id, day, assignments=None):
+    """
+    The Shift of one employee (by primary key and department id) on
+    `day`. Pass `assignments` (refdata.shift_assignments()) when
+    resolving many at once.
+    """
+    assignments = assignments or shift_assignments()
+    candidates = (
+        assignments["employees"].get(employee_id, ()),
+        assignments["departments"].get(department_id, ()),
+    )
+    for assigned in candidates:
+        for shift in assigned:
+            if (shift.starts_on is None or shift.starts_on <= day) and (
+                shift.ends_on is None or day <= shift.ends_on
+            ):
+                return Shift(shift.start, shift.end, timedelta(minutes=shift.grace_minutes))
+    return DEFAULT_SHIFT
+
+
+def shift_for(employee, day):
+    return resolve_shift(employee.pk, employee.department_id, day)
+
+
+def punch_shift(employee, moment):
+    """
+    (record date, Shift) a punch at `moment` (aware) belongs to: the
+    previous day's when it ends a night shift, otherwise the day's own.
+    """
+    day = timezone.localtime(moment).date()
+    assignments = shift_assignments()
+    today = resolve_shift(employee.pk, employee.department_id, day, assignments)
+
+    previous_day = day - timedelta(days=1)
+    previous = resolve_shift(employee.pk, employee.department_id, previous_day, assignments)
+    if previous.overnight:
+        previous_end = previous.bounds(previous_day)[1]
+        today_start = today.bounds(day)[0]
+        if moment < previous_end + max(today_start - previous_end, timedelta()) / 2:
+            return previous_day, previous
+    return day, today
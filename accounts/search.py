@@ -0,0 +1,172 @@
+"""
+Ranked employee search.
+
+Searches emp_id, first and last name, position and department, with
+every word of the query matching (as a prefix on SQLite, as a substring
+on Postgres). Each backend keeps its own index, which the database
+maintains itself, so bulk_create() and queryset.update() stay searchable:
+
+* SQLite: an FTS5 table "employee_search" with the employee table as its
+  external content, kept in sync by triggers. Both are (re)installed
+  after every migrate by ensure_search_index(), because Django remakes
+  SQLite tables for many schema changes and that drops triggers. Results
+  are ranked by bm25 with ID and name hits weighted above position and
+  department. The FTS rows are keyed by employee.rowid, which VACUUM may
+  renumber; run `manage.py rebuild_search_index` after one.
+* Postgres: a pg_trgm GIN index (migration 0026) on the lowered
+  concatenation of the same columns, which serves the LIKE '%word%'
+  filters; results are ranked by word_similarity() against the query.
+
+Any other backend falls back to icontains filters in name order.
+"""
+import re
+
+from django.db import connection, connections
+from django.db.models import Q
+
+from .models import Employee
+
+
+SEARCH_LIMIT = 100
+
+FTS_TABLE = "employee_search"
+
+# bm25 column weights, in the FTS table's column order
+FTS_WEIGHTS = {"emp_id": 10.0, "fname": 5.0, "lname": 5.0, "position": 1.0, "dept": 1.0}
+
+_FTS_COLUMNS = ", ".join(FTS_WEIGHTS)
+_FTS_OLD = ", ".join(f"old.{column}" for column in FTS_WEIGHTS)
+_FTS_NEW = ", ".join(f"new.{column}" for column in FTS_WEIGHTS)
+
+FTS_TRIGGERS = {
+    "employee_search_ai": f"""
+        AFTER INSERT ON employee BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, {_FTS_COLUMNS}) VALUES (new.rowid, {_FTS_NEW});
+        END""",
+    "employee_search_ad": f"""
+        AFTER DELETE ON employee BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_FTS_COLUMNS})
+            VALUES ('delete', old.rowid, {_FTS_OLD});
+        END""",
+    "employee_search_au": f"""
+        AFTER UPDATE OF {_FTS_COLUMNS} ON employee BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_FTS_COLUMNS})
+            VALUES ('delete', old.rowid, {_FTS_OLD});
+            INSERT INTO {FTS_TABLE}(rowid, {_FTS_COLUMNS}) VALUES (new.rowid, {_FTS_NEW});
+        END""",
+}
+
+# Must match the indexed expression in migration 0026 exactly
+TRGM_DOCUMENT = (
+    "lower(e.emp_id || ' ' || e.fname || ' ' || e.lname || ' ' "
+    "|| coalesce(e.position, '') || ' ' || coalesce(e.dept, ''))"
+)
+
+
+def _terms(q):
+    return re.findall(r"\w+", q.lower())
+
+
+def _filters(archived, department_id, status):
+    """Extra WHERE clauses on the employee table (alias e) and their params."""
+    clauses, params = ["e.is_archived = %s"], [archived]
+    if department_id:
+        clauses.append("e.department_id = %s")
+        params.append(department_id)
+    if status:
+        clauses.append("e.emp_status = %s")
+        params.append(status)
+    return clauses, params
+
+
+def _sqlite_search(terms, clauses, params, limit):
+    match = " ".join(f'"{term}"*' for term in terms)
+    weights = ", ".join(str(weight) for weight in FTS_WEIGHTS.values())
+    sql = (
+        f"SELECT e.emp_id FROM {FTS_TABLE} s "
+        f"JOIN {Employee._meta.db_table} e ON e.rowid = s.rowid "
+        f"WHERE {FTS_TABLE} MATCH %s AND {' AND '.join(clauses)} "
+        f"ORDER BY bm25({FTS_TABLE}, {weights}), e.lname, e.fname, e.emp_id "
+        f"LIMIT %s"
+    )
+    return sql, [match, *params, limit]
+
+
+def _postgres_search(terms, clauses, params, limit):
+    likes = [f"{TRGM_DOCUMENT} LIKE %s" for _ in terms]
+    sql = (
+        f"SELECT e.emp_id FROM {Employee._meta.db_table} e "
+        f"WHERE {' AND '.join(likes + clauses)} "
+        f"ORDER BY word_similarity(%s, {TRGM_DOCUMENT}) DESC, e.lname, e.fname, e.emp_id "
+        f"LIMIT %s"
+    )
+    patterns = [f"%{term}%" for term in terms]
+    return sql, [*patterns, *params, " ".join(terms), limit]
+
+
+def search_employee_ids(q, archived=False, department_id=None, status="", limit=SEARCH_LIMIT):
+    """emp_ids matching every word of `q`, best match first, at most `limit`."""
+    terms = _terms(q)
+    if not terms:
+        return []
+
+    builders = {"sqlite": _sqlite_search, "postgresql": _postgres_search}
+    build = builders.get(connection.vendor)
+    if build is None:
+        return _fallback_search(terms, archived, department_id, status, limit)
+
+    clauses, params = _filters(archived, department_id, status)
+    sql, params = build(terms, clauses, params, limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _fallback_search(terms, archived, department_id, status, limit):
+    employees = Employee.objects.filter(is_archived=archived)
+    for term in terms:
+        employees = employees.filter(
+            Q(emp_id__icontains=term)
+            | Q(fname__icontains=term)
+            | Q(lname__icontains=term)
+            | Q(position__icontains=term)
+            | Q(dept__icontains=term)
+        )
+    if department_id:
+        employees = employees.filter(department_id=department_id)
+    if status:
+        employees = employees.filter(emp_status=status)
+    return list(employees.order_by("lname", "fname", "emp_id").values_list("emp_id", flat=True)[:limit])
+
+
+def ensure_search_index(using="default", **kwargs):
+    """
+    post_migrate hook: create the SQLite FTS table and its triggers if
+    any are missing, and repopulate the index when something was.
+    """
+    conn = connections[using]
+    if conn.vendor != "sqlite":
+        return
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        present = {row[0] for row in cursor.fetchall()}
+        if present >= {FTS_TABLE, *FTS_TRIGGERS}:
+            return
+
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            f"{_FTS_COLUMNS}, content='employee', "
+            f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        for name, body in FTS_TRIGGERS.items():
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def rebuild_search_index():
+    """Repopulate the search index from the employee table (SQLite only)."""
+    if connection.vendor != "sqlite":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
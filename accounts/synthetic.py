@@ -0,0 +1,349 @@
+"""
+Synthetic municipality-scale data for benchmarks and load testing.
+
+generate() fills the database with employees spread over the plantilla
+(the Department/Position tables), years of workday attendance with
+realistic late/absent ratios, leave requests, messages and performance
+rows. Everything is drawn from a seeded random.Random, so the same
+arguments on the same day produce the same data.
+
+All rows go in with bulk_create(), which skips signals, so the derived
+tables (AttendanceTally, DailyAttendanceStats) are rebuilt at the end and
+sick leave balances are left untouched. Generated users get unusable
+passwords; sign in with force_login() or reset a password from the admin.
+"""
+import random
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from .daily_stats import rebuild_daily_stats
+from .imports import _next_emp_id, generate_next_emp_id
+from .models import (
+    AttendanceRecord,
+    Department,
+    Employee,
+    EmployeePerformance,
+    LeaveRequest,
+    Message,
+    Position,
+    WeeklyActivity,
+    WeeklyPerformanceSummary,
+)
+from .org_structure import VALID_STRUCTURE
+from .schedules import DEFAULT_SHIFT
+from .tallies import rebuild_tallies
+from .workdays import is_workday, workdays
+
+
+BATCH_SIZE = 2000
+
+# Employees whose attendance is built and inserted per round
+EMPLOYEE_CHUNK = 200
+
+JOB_ORDER_SHARE = 0.15
+
+# Share of working days per status; the rest are PRESENT
+DAY_STATUS_WEIGHTS = {
+    AttendanceRecord.Status.LATE: 0.08,
+    AttendanceRecord.Status.ABSENT: 0.03,
+    AttendanceRecord.Status.FIELDWORK: 0.02,
+    AttendanceRecord.Status.HEALTH: 0.01,
+}
+
+LEAVES_PER_YEAR = 3
+LEAVE_TYPE_WEIGHTS = {
+    LeaveRequest.LeaveType.VACATION: 0.45,
+    LeaveRequest.LeaveType.SICK: 0.35,
+    LeaveRequest.LeaveType.SPL: 0.1,
+    LeaveRequest.LeaveType.EMERGENCY: 0.05,
+    LeaveRequest.LeaveType.WELLNESS: 0.05,
+}
+LEAVE_REJECTED_SHARE = 0.15
+
+MESSAGES_PER_YEAR = 1
+WEEKLY_SUMMARY_WEEKS = 12
+OBJECTIVES_PER_EMPLOYEE = 3
+
+FIRST_NAMES = [
+    "Juan", "Maria", "Jose", "Ana", "Pedro", "Rosa", "Mario", "Liza", "Ramon", "Carmela",
+    "Antonio", "Teresita", "Eduardo", "Marites", "Rodel", "Jocelyn", "Ernesto", "Cristina",
+]
+LAST_NAMES = [
+    "Dela Cruz", "Santos", "Reyes", "Bautista", "Garcia", "Mendoza", "Torres", "Villanueva",
+    "Ramos", "Aquino", "Castillo", "Navarro", "Santiago", "Domingo", "Pascual", "Manalo",
+    "Gonzales", "Lopez", "Soriano", "Francisco",
+]
+BARANGAYS = ["Poblacion", "San Roque", "Malumot", "Santo Niño", "Kapitangan", "Sapang Dalaga"]
+MESSAGE_TYPES = ["Inquiry", "Concern", "Request"]
+
+
+@dataclass
+class GeneratedCounts:
+    employees: int = 0
+    attendance: int = 0
+    leaves: int = 0
+    messages: int = 0
+    performance: int = 0
+    weekly_summaries: int = 0
+
+
+def _plantilla():
+    """[(department, [positions])] from the tables, or VALID_STRUCTURE labels."""
+    positions = {}
+    for position in Position.objects.select_related("department"):
+        positions.setdefault(position.department, []).append(position)
+    if positions:
+        return list(positions.items())
+    return [
+        (Department(name=dept), [Position(title=title) for title in titles])
+        for dept, titles in VALID_STRUCTURE.items()
+    ]
+
+
+def _aware(day, at):
+    return timezone.make_aware(datetime.combine(day, at))
+
+
+def _build_employee(rng, emp_id, plantilla, first_day, today):
+    fname, lname = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    employee = Employee(
+        emp_id=emp_id,
+        fname=fname,
+        lname=lname,
+        email=f"{fname}.{lname}.{emp_id}".lower().replace(" ", "") + "@example.com",
+        phone=f"09{rng.randrange(10**9):09d}",
+        dob=today - timedelta(days=rng.randrange(22 * 365, 60 * 365)),
+        # A fifth were hired inside the generated period
+        date_hired=first_day + timedelta(days=rng.randrange(-10 * 365, (today - first_day).days // 5 + 1)),
+        civil_status=rng.choice(Employee.CivilStatus.values),
+        brgy=rng.choice(BARANGAYS),
+        city="Paombong",
+        province="Bulacan",
+    )
+    if rng.random() < JOB_ORDER_SHARE:
+        employee.emp_status = Employee.EmpStatus.JOB_ORDER
+        employee.jo_daily_rate = Decimal(rng.choice([450, 500, 550, 610]))
+        return employee
+
+    department, positions = rng.choice(plantilla)
+    position = rng.choice(positions)
+    employee.emp_status = Employee.EmpStatus.REGULAR
+    employee.dept = department.name
+    employee.position = position.title
+    employee.salary_grade = position.salary_grade or None
+    # bulk_create() skips the pre_save hook that links these
+    employee.department_id = department.pk
+    employee.job_position_id = position.pk
+    return employee
+
+
+def _leaves_for(rng, employee, first_day, today):
+    leaves = []
+    start_of_service = max(first_day, employee.date_hired)
+    span = (today - start_of_service).days
+    if span <= 0:
+        return leaves
+
+    count = round(LEAVES_PER_YEAR * span / 365)
+    for _ in range(count):
+        start = start_of_service + timedelta(days=rng.randrange(span + 30))
+        while not is_workday(start):
+            start += timedelta(days=1)
+        end = start + timedelta(days=rng.choice([0, 0, 1, 2, 4]))
+
+        if start > today:
+            status, responded_at = LeaveRequest.Status.PENDING, None
+        else:
+            status = (
+                LeaveRequest.Status.REJECTED
+                if rng.random() < LEAVE_REJECTED_SHARE
+                else LeaveRequest.Status.APPROVED
+            )
+            responded_at = _aware(start - timedelta(days=rng.randrange(1, 4)), time(10, 0))
+
+        leave = LeaveRequest(
+            employee=employee,
+            leave_type=rng.choices(list(LEAVE_TYPE_WEIGHTS), weights=LEAVE_TYPE_WEIGHTS.values())[0],
+            start_date=start,
+            end_date=end,
+            reason="Personal matters",
+            status=status,
+            responded_at=responded_at,
+        )
+        # Restored after insert; auto_now_add overrides it in bulk_create()
+        leave.filed_on = _aware(start - timedelta(days=rng.randrange(3, 15)), time(9, rng.randrange(60)))
+        leaves.append(leave)
+    return leaves
+
+
+def _attendance_for(rng, employee, first_day, last_day, leave_days):
+    statuses = list(DAY_STATUS_WEIGHTS)
+    thresholds = []
+    total = 0.0
+    for status in statuses:
+        total += DAY_STATUS_WEIGHTS[status]
+        thresholds.append(total)
+
+    records = []
+    for day in workdays(max(first_day, employee.date_hired), last_day):
+        if day in leave_days:
+            records.append(AttendanceRecord(employee=employee, date=day, status=AttendanceRecord.Status.ON_LEAVE))
+            continue
+
+        draw = rng.random()
+        status = next(
+            (s for s, limit in zip(statuses, thresholds) if draw < limit),
+            AttendanceRecord.Status.PRESENT,
+        )
+        if status == AttendanceRecord.Status.ABSENT:
+            records.append(AttendanceRecord(employee=employee, date=day, status=status))
+            continue
+
+        start, end = DEFAULT_SHIFT.bounds(day)
+        late_after = start + DEFAULT_SHIFT.grace
+        if status == AttendanceRecord.Status.LATE:
+            time_in = late_after + timedelta(minutes=rng.randrange(1, 75))
+        else:
+            time_in = late_after - timedelta(minutes=rng.randrange(0, 45))
+        time_out = end + timedelta(minutes=rng.randrange(-20, 60))
+        records.append(AttendanceRecord(
+            employee=employee,
+            date=day,
+            status=status,
+            time_in=time_in.time(),
+            time_out=time_out.time(),
+            hours_worked=DEFAULT_SHIFT.hours(day, time_in, time_out),
+        ))
+    return records
+
+
+def _messages_for(rng, employee, first_day, today):
+    count = round(MESSAGES_PER_YEAR * (today - first_day).days / 365)
+    return [
+        Message(
+            employee=employee,
+            name=employee.full_name,
+            email=employee.email,
+            message_type=rng.choice(MESSAGE_TYPES),
+            text="Good day, I would like to ask about my records.",
+            status=rng.choice(Message.Status.values),
+        )
+        for _ in range(count)
+    ]
+
+
+def _performance_for(rng, employee, today):
+    okrs = [
+        EmployeePerformance(
+            employee=employee,
+            period_label=f"{today.year} H{1 if today.month <= 6 else 2}",
+            objective_name=f"Objective {n}",
+            key_result_name=f"Key result {n}",
+            progress_percent=rng.randrange(0, 101, 5),
+        )
+        for n in range(1, OBJECTIVES_PER_EMPLOYEE + 1)
+    ]
+
+    monday = today - timedelta(days=today.weekday())
+    summaries = []
+    for week in range(WEEKLY_SUMMARY_WEEKS):
+        week_start = monday - timedelta(weeks=week)
+        done = [rng.random() < 0.8 for _ in range(rng.randint(2, 5))]
+        summary = WeeklyPerformanceSummary(
+            employee=employee,
+            week_start=week_start,
+            week_end=week_start + timedelta(days=4),
+            activities_done=sum(done),
+            total_activities=len(done),
+            progress_percent=round(100 * sum(done) / len(done)),
+        )
+        summary.planned = done
+        summaries.append(summary)
+    return okrs, summaries
+
+
+def generate(employees=500, years=2, seed=0, today=None, progress=None):
+    """
+    Create `employees` employees with `years` of history up to `today`
+    (default: the local date) and return GeneratedCounts.
+
+    progress(done, total) is called after each chunk of employees.
+    """
+    rng = random.Random(seed)
+    today = today or timezone.localdate()
+    first_day = today - timedelta(days=365 * years)
+    plantilla = _plantilla()
+    counts = GeneratedCounts()
+    # Synthetic users are never meant to log in with a password
+    unusable = make_password(None)
+
+    emp_id = generate_next_emp_id()
+    for offset in range(0, employees, EMPLOYEE_CHUNK):
+        chunk = []
+        for _ in range(min(EMPLOYEE_CHUNK, employees - offset)):
+            chunk.append(_build_employee(rng, emp_id, plantilla, first_day, today))
+            emp_id = _next_emp_id(emp_id)
+
+        leaves, attendance, messages, okrs, summaries = [], [], [], [], []
+        for employee in chunk:
+            own_leaves = _leaves_for(rng, employee, first_day, today)
+            leave_days = {
+                day
+                for leave in own_leaves
+                if leave.status == LeaveRequest.Status.APPROVED
+                for day in workdays(leave.start_date, leave.end_date)
+            }
+            leaves += own_leaves
+            attendance += _attendance_for(rng, employee, first_day, today - timedelta(days=1), leave_days)
+            messages += _messages_for(rng, employee, first_day, today)
+            own_okrs, own_summaries = _performance_for(rng, employee, today)
+            okrs += own_okrs
+            summaries += own_summaries
+
+        with transaction.atomic():
+            users = [
+                User(username=e.emp_id, password=unusable, first_name=e.fname, last_name=e.lname, email=e.email)
+                for e in chunk
+            ]
+            User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+            for employee, user in zip(chunk, users):
+                employee.user = user
+            Employee.objects.bulk_create(chunk, batch_size=BATCH_SIZE)
+
+            LeaveRequest.objects.bulk_create(leaves, batch_size=BATCH_SIZE)
+            for leave in leaves:
+                leave.date_filed = leave.filed_on
+            LeaveRequest.objects.bulk_update(leaves, ["date_filed"], batch_size=BATCH_SIZE)
+
+            AttendanceRecord.objects.bulk_create(attendance, batch_size=BATCH_SIZE)
+            Message.objects.bulk_create(messages, batch_size=BATCH_SIZE)
+            EmployeePerformance.objects.bulk_create(okrs, batch_size=BATCH_SIZE)
+            WeeklyPerformanceSummary.objects.bulk_create(summaries, batch_size=BATCH_SIZE)
+            WeeklyActivity.objects.bulk_create(
+                [
+                    WeeklyActivity(summary=summary, description=f"Activity {n}", is_done=done)
+                    for summary in summaries
+                    for n, done in enumerate(summary.planned, start=1)
+                ],
+                batch_size=BATCH_SIZE,
+            )
+
+        counts.employees += len(chunk)
+        counts.attendance += len(attendance)
+        counts.leaves += len(leaves)
+        counts.messages += len(messages)
+        counts.performance += len(okrs)
+        counts.weekly_summaries += len(summaries)
+        if progress:
+            progress(counts.employees, employees)
+
+    for year in range(first_day.year, today.year + 1):
+        rebuild_tallies(year)
+    rebuild_daily_stats(workdays(first_day, today))
+    return counts
@@ -0,0 +1,292 @@
+"""
+Materialized yearly attendance tallies.
+
+Each AttendanceRecord on a workday (accounts.workdays) contributes to its employee's
+AttendanceTally for that year: LATE adds to `lates`, ABSENT to `absents`,
+anything else to `attended`. The counters are adjusted with F() updates
+whenever a record is saved or deleted, so the dashboard and payslip read
+one row instead of walking every day of the year.
+
+The same receivers keep the per-day DailyAttendanceStats rollups
+(accounts.daily_stats) current.
+
+Writes that bypass signals (queryset.update(), bulk_create()) must call
+rebuild_tally() / rebuild_tallies() for the rows they touched. Adding,
+moving or removing a holiday queues a "rebuild_tallies" job
+(accounts.jobs) for the years it falls in.
+"""
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .daily_stats import move_daily_stats, record_changed
+from .models import AttendanceRecord, AttendanceTally, Employee, Holiday
+from .workdays import calendar_for, count_workdays, is_workday, workday_q
+
+
+def _contribution(day, status):
+    """Counter deltas one record adds to its tally (empty off workdays)."""
+    if day is None or not is_workday(day):
+        return {}
+    if status == AttendanceRecord.Status.LATE:
+        return {"lates": 1, "attended": 1}
+    if status == AttendanceRecord.Status.ABSENT:
+        return {"absents": 1}
+    return {"attended": 1}
+
+
+def _tally_counts(queryset):
+    return queryset.filter(workday_q()).aggregate(
+        lates=Count("id", filter=Q(status=AttendanceRecord.Status.LATE)),
+        absents=Count("id", filter=Q(status=AttendanceRecord.Status.ABSENT)),
+        attended=Count("id", filter=~Q(status=AttendanceRecord.Status.ABSENT)),
+        last_date=Max("date"),
+    )
+
+
+def rebuild_tally(employee_id, year):
+    """Recount one employee's year from scratch and store it."""
+    counts = _tally_counts(
+        AttendanceRecord.objects.filter(employee_id=employee_id, date__year=year)
+    )
+    tally, _ = AttendanceTally.objects.update_or_create(
+        employee_id=employee_id,
+        year=year,
+        defaults=counts,
+    )
+    return tally
+
+
+def rebuild_tallies(year, employee_ids=None):
+    """Recount `year` for all (or the given) employees in one grouped query."""
+    records = AttendanceRecord.objects.filter(workday_q(), date__year=year)
+    if employee_ids is not None:
+        records = records.filter(employee_id__in=employee_ids)
+
+    rows = (
+        records.order_by()
+        .values("employee_id")
+        .annotate(
+            lates=Count("id", filter=Q(status=AttendanceRecord.Status.LATE)),
+            absents=Count("id", filter=Q(status=AttendanceRecord.Status.ABSENT)),
+            attended=Count("id", filter=~Q(status=AttendanceRecord.Status.ABSENT)),
+            last_date=Max("date"),
+        )
+    )
+    tallies = [AttendanceTally(year=year, **row) for row in rows]
+
+    with transaction.atomic():
+        # Employees whose records all disappeared end up with a zeroed row
+        existing = AttendanceTally.objects.filter(year=year)
+        if employee_ids is not None:
+            existing = existing.filter(employee_id__in=employee_ids)
+        existing.update(lates=0, absents=0, attended=0, last_date=None)
+
+        AttendanceTally.objects.bulk_create(
+            tallies,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=["employee", "year"],
+            update_fields=["lates", "absents", "attended", "last_date"],
+        )
+    return len(tallies)
+
+
+def _apply(employee_id, day, status, sign):
+    """Adjust one tally; returns True if it had to be rebuilt instead."""
+    delta = _contribution(day, status)
+    if not delta:
+        return False
+
+    changes = {field: F(field) + sign * n for field, n in delta.items()}
+    if sign > 0:
+        changes["last_date"] = Greatest(Coalesce(F("last_date"), Value(day)), Value(day))
+
+    updated = AttendanceTally.objects.filter(
+        employee_id=employee_id,
+        year=day.year,
+    ).update(**changes)
+
+    if not updated:
+        rebuild_tally(employee_id, day.year)
+        return True
+    return False
+
+
+def _snapshot(instance):
+    # __dict__ so deferred fields are never fetched
+    fields = instance.__dict__
+    return fields.get("date"), fields.get("status"), fields.get("hours_worked")
+
+
+def _employee_department(instance):
+    if AttendanceRecord.employee.is_cached(instance):
+        return instance.employee.department_id
+    return (
+        Employee.objects.filter(pk=instance.employee_id)
+        .values_list("department_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_init, sender=AttendanceRecord)
+def remember_tally_state(sender, instance, **kwargs):
+    instance._tally_state = _snapshot(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=AttendanceRecord)
+def update_tally_on_save(sender, instance, created, **kwargs):
+    old = None if created else getattr(instance, "_tally_state", None)
+    new = _snapshot(instance)
+
+    # A rebuild already counts the new state, so skip the matching +1
+    if old is None or old[:2] != new[:2]:
+        rebuilt = old is not None and _apply(instance.employee_id, old[0], old[1], -1)
+        if not (rebuilt and old[0].year == new[0].year):
+            _apply(instance.employee_id, new[0], new[1], +1)
+
+    if old != new:
+        record_changed(_employee_department(instance), old, new)
+
+    instance._tally_state = new
+
+
+@receiver(post_init, sender=Employee)
+def remember_department(sender, instance, **kwargs):
+    instance._saved_department_id = instance.__dict__.get("department_id")
+
+
+@receiver(post_save, sender=Employee)
+def move_rollups_on_transfer(sender, instance, created, **kwargs):
+    old = instance._saved_department_id
+    if not created and old != instance.department_id:
+        move_daily_stats(instance.pk, old, instance.department_id)
+    instance._saved_department_id = instance.department_id
+
+
+@receiver(post_delete, sender=AttendanceRecord)
+def update_tally_on_delete(sender, instance, **kwargs):
+    old = getattr(instance, "_tally_state", None) or _snapshot(instance)
+    _apply(instance.employee_id, old[0], old[1], -1)
+    record_changed(_employee_department(instance), old, None)
+
+
+def yearly_attendance(employee, today, start=None):
+    """
+    (lates, absents) on workdays from `start` (default: the later of
+    Jan 1 and the hire date) through `today`. A workday with no record
+    counts as absent.
+
+    Reads the tally row; one extra range count is only needed when the
+    year has records outside [start, today] (approved future leave, or
+    a window that starts after Jan 1).
+    """
+    year_start = date(today.year, 1, 1)
+    if start is None:
+        start = max(employee.date_hired, year_start) if employee.date_hired else year_start
+
+    tally = AttendanceTally.objects.filter(employee=employee, year=today.year).first()
+    if tally is None:
+        tally = rebuild_tally(employee.pk, today.year)
+
+    lates = tally.lates
+    attended = tally.attended
+
+    has_future = tally.last_date is not None and tally.last_date > today
+    if has_future or start > year_start:
+        outside = _tally_counts(
+            AttendanceRecord.objects.filter(
+                Q(date__lt=start) | Q(date__gt=today),
+                employee=employee,
+                date__year=today.year,
+            )
+        )
+        lates -= outside["lates"]
+        attended -= outside["attended"]
+
+    absents = max(count_workdays(start, today) - attended, 0)
+    return lates, absents
+
+
+def yearly_attendance_many(employees, today):
+    """
+    yearly_attendance() for many employees at once, using the payslip
+    window (from the later of Jan 1 and the hire date, or just today
+    when there is no hire date). Returns {emp_id: (lates, absents)}.
+
+    A constant number of queries: the tally rows (rebuilt first for
+    employees that have none) and one grouped count of records that fall
+    outside each employee's window.
+    """
+    year = today.year
+    year_start = date(year, 1, 1)
+
+    tallies = {
+        t.employee_id: t
+        for t in AttendanceTally.objects.filter(year=year)
+    }
+
+    # Employees never tallied this year (e.g. records older than the tally table)
+    missing = [e.pk for e in employees if e.pk not in tallies]
+    if missing:
+        rebuild_tallies(year, missing)
+        tallies.update(
+            (t.employee_id, t)
+            for t in AttendanceTally.objects.filter(year=year, employee_id__in=missing)
+        )
+
+    outside = {
+        row["employee_id"]: row
+        for row in AttendanceRecord.objects.filter(
+            Q(date__gt=today)
+            | Q(date__lt=F("employee__date_hired"))
+            | Q(employee__date_hired__isnull=True, date__lt=today),
+            workday_q(),
+            date__year=year,
+        )
+        .order_by()
+        .values("employee_id")
+        .annotate(
+            lates=Count("id", filter=Q(status=AttendanceRecord.Status.LATE)),
+            attended=Count("id", filter=~Q(status=AttendanceRecord.Status.ABSENT)),
+        )
+    }
+
+    calendar = calendar_for(year)
+    results = {}
+    for employee in employees:
+        tally = tallies.get(employee.pk)
+        lates = tally.lates if tally else 0
+        attended = tally.attended if tally else 0
+
+        extra = outside.get(employee.pk)
+        if extra:
+            lates -= extra["lates"]
+            attended -= extra["attended"]
+
+        start = max(year_start, employee.date_hired or today)
+        absents = max(calendar.count(start, today) - attended, 0)
+        results[employee.pk] = (lates, absents)
+    return results
+
+
+@receiver(post_init, sender=Holiday)
+def remember_holiday_date(sender, instance, **kwargs):
+    instance._saved_date = instance.__dict__.get("date") if instance.pk else None
+
+
+@receiver([post_save, post_delete], sender=Holiday)
+def recount_holiday_years(sender, instance, **kwargs):
+    # Imported here: accounts.jobs imports payroll, which imports this module
+    from .jobs import enqueue
+
+    years = {instance.date.year}
+    if instance._saved_date is not None:
+        years.add(instance._saved_date.year)
+    # Queued with the holiday's own transaction, so it commits or rolls back with it
+    enqueue("rebuild_tallies", {"years": sorted(years)})
+    instance._saved_date = instance.date
@@ -1,3 +1,1833 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import tempfile
+import threading
+from functools import partial
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import openpyxl
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, connection
+from django.http import QueryDict
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from hris.perf import measure, query_budget, stats as perf_stats
+
+from .attendance import PunchAction, close_open_attendance, record_punch
+from .benchmarks import compare, run_suite
+from .daily_stats import COUNTER_FIELDS, daily_summaries, rebuild_daily_stats
+from .directory import directory_page
+from .imports import REQUIRED_COLUMNS, generate_next_emp_id, import_employees
+from . import leave_approval
+from .leave_approval import approve_leaves, reject_leaves
+from .leave_queue import leave_queue, leave_queue_page
+from .jobs import (
+    HANDLERS,
+    PERIODIC_TASKS,
+    claim_next,
+    enqueue,
+    requeue_stale,
+    run_pending,
+    run_periodic_tasks,
+)
+from .leaves import leave_balances, validate_leave_request
+from .models import (
+    AttendanceRecord,
+    AttendanceTally,
+    DailyAttendanceStats,
+    Department,
+    Employee,
+    Holiday,
+    Job,
+    LeaveRequest,
+    PayrollRun,
+    Payslip,
+    Position,
+    QRClaim,
+    SalaryGrade,
+    Schedule,
+    ShiftAssignment,
+    TaskRun,
+)
+from .pagination import keyset_page
+from .payroll import PAYSLIP_FIELDS, compute_payslip, run_payroll, stored_payslip
+from .qr_tokens import claim_token, current_token, prune_claims, validate_token
+from .refdata import departments, holidays, salary_grades, shift_assignments
+from .schedules import DEFAULT_SHIFT, punch_shift, shift_for
+from .search import search_employee_ids
+from .synthetic import generate
+from .tallies import rebuild_tallies, yearly_attendance
+from .workdays import WorkCalendar, calendar_for, count_workdays, is_workday, workdays
+
+
+def make_employee(emp_id="EMP001", **kwargs):
+    defaults = {
+        "fname": "Juan",
+        "lname": "Dela Cruz",
+        "email": f"{emp_id.lower()}@example.com",
+        "emp_status": Employee.EmpStatus.REGULAR,
+        "date_hired": date(2020, 1, 6),
+    }
+    defaults.update(kwargs)
+    return Employee.objects.create(emp_id=emp_id, **defaults)
+
+
+def make_departments(test, *names):
+    """{name: id} of new Department rows; the cache is cleared after `test`
+    so rolled-back ids never outlive it."""
+    test.addCleanup(cache.clear)
+    return {name: Department.objects.create(name=name).pk for name in names}
+
+
+def make_holidays(test, *days):
+    """Holiday rows on `days`; like make_departments(), the cache is
+    cleared after `test`."""
+    test.addCleanup(cache.clear)
+    return [Holiday.objects.create(date=day, name=f"Holiday {day}") for day in days]
+
+
+def manila(day, hour, minute=0):
+    return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+
+class RecordPunchTests(TestCase):
+    def setUp(self):
+        self.employee = make_employee(sick_leave_balance=Decimal("5"))
+        self.day = date(2026, 3, 2)
+
+    def test_first_punch_is_time_in(self):
+        result = record_punch(self.employee, manila(self.day, 8, 0))
+
+        self.assertEqual(result.action, PunchAction.TIME_IN)
+        self.assertEqual(result.record.status, AttendanceRecord.Status.PRESENT)
+
+    def test_late_time_in_deducts_sick_leave_once(self):
+        record_punch(self.employee, manila(self.day, 9, 0))
+
+        self.employee.refresh_from_db()
+        self.assertEqual(self.employee.sick_leave_balance, Decimal("4.75"))
+        record = AttendanceRecord.objects.get(employee=self.employee)
+        self.assertEqual(record.status, AttendanceRecord.Status.LATE)
+
+    def test_time_out_needs_minimum_shift(self):
+        record_punch(self.employee, manila(self.day, 8, 0))
+
+        result = record_punch(self.employee, manila(self.day, 8, 2))
+        self.assertEqual(result.action, PunchAction.TOO_SOON)
+
+        result = record_punch(self.employee, manila(self.day, 16, 30))
+        self.assertEqual(result.action, PunchAction.TIME_OUT)
+        self.assertEqual(result.record.hours_worked, Decimal("8.50"))
+
+        result = record_punch(self.employee, manila(self.day, 17, 0))
+        self.assertEqual(result.action, PunchAction.COMPLETED)
+
+    def test_punch_query_count_is_bounded(self):
+        AttendanceTally.objects.create(employee=self.employee, year=self.day.year)
+        DailyAttendanceStats.objects.create(date=self.day)
+        # Cached reference data, loaded once per process
+        holidays()
+        shift_assignments()
+
+        with self.assertNumQueries(8):
+            record_punch(self.employee, manila(self.day, 8, 0))
+        with self.assertNumQueries(5):
+            record_punch(self.employee, manila(self.day, 17, 0))
+
+
+class ShiftScheduleTests(TestCase):
+    def setUp(self):
+        self.addCleanup(cache.clear)
+        self.day = date(2026, 3, 2)  # Monday
+        self.employee = make_employee(dept="Engineering")
+
+    def schedule(self, name, start, end, grace=0):
+        return Schedule.objects.create(name=name, start=start, end=end, grace_minutes=grace)
+
+    def test_default_shift_marks_late_after_grace_and_clamps_hours(self):
+        self.assertEqual(shift_for(self.employee, self.day), DEFAULT_SHIFT)
+        on_time = record_punch(self.employee, manila(self.day, 8, 15))
+        self.assertEqual(on_time.record.status, AttendanceRecord.Status.PRESENT)
+
+        other = make_employee("EMP002")
+        self.assertEqual(record_punch(other, manila(self.day, 8, 16)).record.status, AttendanceRecord.Status.LATE)
+
+        early = make_employee("EMP003")
+        record_punch(early, manila(self.day, 7, 0))
+        result = record_punch(early, manila(self.day, 18, 30))
+        self.assertEqual(result.record.hours_worked, Decimal("9.00"))
+
+    def test_employee_assignment_wins_over_department_within_its_dates(self):
+        dept_id = make_departments(self, "Engineering")["Engineering"]
+        self.employee.save()  # links the department
+        early = self.schedule("Early", time(6, 0), time(15, 0))
+        late = self.schedule("Late", time(10, 0), time(19, 0), grace=10)
+        ShiftAssignment.objects.create(schedule=early, department_id=dept_id)
+        ShiftAssignment.objects.create(
+            schedule=late, employee=self.employee,
+            starts_on=date(2026, 3, 2), ends_on=date(2026, 3, 6),
+        )
+
+        shift_assignments()
+        with self.assertNumQueries(0):
+            self.assertEqual(shift_for(self.employee, date(2026, 3, 4)).start, time(10, 0))
+            self.assertEqual(shift_for(self.employee, date(2026, 3, 9)).start, time(6, 0))
+
+        self.assertEqual(
+            record_punch(self.employee, manila(self.day, 10, 5)).record.status,
+            AttendanceRecord.Status.PRESENT,
+        )
+
+        late.is_active = False
+        late.save()
+        self.assertEqual(shift_for(self.employee, date(2026, 3, 4)).start, time(6, 0))
+
+    def test_night_shift_crosses_midnight(self):
+        night = self.schedule("Night", time(22, 0), time(6, 0), grace=15)
+        ShiftAssignment.objects.create(schedule=night, employee=self.employee)
+        next_day = self.day + timedelta(days=1)
+
+        self.assertEqual(punch_shift(self.employee, manila(next_day, 5, 0))[0], self.day)
+        self.assertEqual(punch_shift(self.employee, manila(next_day, 21, 50))[0], next_day)
+
+        time_in = record_punch(self.employee, manila(self.day, 22, 10))
+        self.assertEqual(time_in.record.status, AttendanceRecord.Status.PRESENT)
+        time_out = record_punch(self.employee, manila(next_day, 6, 30))
+        self.assertEqual(time_out.action, PunchAction.TIME_OUT)
+        self.assertEqual(time_out.record.date, self.day)
+        self.assertEqual(time_out.record.hours_worked, Decimal("7.83"))
+
+        # Arriving after midnight is late for the shift that began the day before
+        late = record_punch(self.employee, manila(next_day + timedelta(days=1), 0, 30))
+        self.assertEqual((late.record.date, late.record.status), (next_day, AttendanceRecord.Status.LATE))
+
+    def test_open_night_shifts_close_at_their_end(self):
+        night = self.schedule("Night", time(22, 0), time(6, 0))
+        ShiftAssignment.objects.create(schedule=night, employee=self.employee)
+        record = AttendanceRecord.objects.create(employee=self.employee, date=self.day, time_in=time(22, 0))
+        next_day = self.day + timedelta(days=1)
+
+        self.assertEqual(close_open_attendance(manila(next_day, 5, 59)), 0)
+        self.assertEqual(close_open_attendance(manila(next_day, 6, 0)), 1)
+
+        record.refresh_from_db()
+        self.assertEqual((record.time_out, record.hours_worked), (time(6, 0), Decimal("8.00")))
+
+    def test_close_updates_once_per_shift_and_leaves_running_shifts_alone(self):
+        night = self.schedule("Night", time(22, 0), time(6, 0))
+        early = self.schedule("Early", time(6, 0), time(14, 0))
+        night_worker, early_worker = make_employee("EMP002"), make_employee("EMP003")
+        ShiftAssignment.objects.create(schedule=night, employee=night_worker)
+        ShiftAssignment.objects.create(schedule=early, employee=early_worker)
+        records = [
+            AttendanceRecord.objects.create(employee=employee, date=self.day, time_in=time_in)
+            for employee, time_in in (
+                (self.employee, time(8, 0)),
+                (early_worker, time(6, 30)),
+                (night_worker, time(0, 30)),
+            )
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(close_open_attendance(manila(self.day, 17, 0)), 2)
+        updates = [q for q in queries if q["sql"].startswith('UPDATE "attendance_record"')]
+        self.assertEqual(len(updates), 2)
+
+        for record in records:
+            record.refresh_from_db()
+        self.assertEqual([r.time_out for r in records], [time(17, 0), time(14, 0), None])
+        self.assertEqual(records[1].hours_worked, Decimal("7.50"))
+
+        # A time-in after midnight belongs to the night shift's second half
+        self.assertEqual(close_open_attendance(manila(self.day + timedelta(days=1), 6, 0)), 1)
+        records[2].refresh_from_db()
+        self.assertEqual(records[2].hours_worked, Decimal("5.50"))
+        self.assertEqual(daily_summaries([self.day])[self.day]["hours_count"], 3)
+
+    def test_admin_toggle_uses_the_same_punch(self):
+        admin = User.objects.create_user("admin", password="x", is_staff=True)
+        self.client.force_login(admin)
+        url = reverse("employee_toggle_attendance", args=[self.employee.pk])
+
+        with mock.patch("django.utils.timezone.now", return_value=manila(self.day, 8, 10)):
+            self.client.post(url)
+        with mock.patch("django.utils.timezone.now", return_value=manila(self.day, 8, 12)):
+            self.client.post(url)
+        with mock.patch("django.utils.timezone.now", return_value=manila(self.day, 17, 45)):
+            self.client.post(url)
+
+        record = AttendanceRecord.objects.get(employee=self.employee)
+        self.assertEqual(record.status, AttendanceRecord.Status.PRESENT)
+        self.assertEqual((record.time_out, record.hours_worked), (time(17, 45), Decimal("8.83")))
+
+
+class ConcurrentPunchTests(TransactionTestCase):
+    THREADS = 200
+
+    def test_simultaneous_submits_create_one_record(self):
+        employees = [make_employee(f"EMP{i:03d}") for i in range(1, 5)]
+        when = manila(date(2026, 3, 2), 7, 55)
+        barrier = threading.Barrier(self.THREADS)
+        results = []
+        errors = []
+
+        def punch(employee):
+            try:
+                barrier.wait()
+                results.append(record_punch(employee, when).action)
+            except Exception as exc:  # pragma: no cover - surfaced below
+                errors.append(exc)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threads = [
+            threading.Thread(target=punch, args=(employees[i % len(employees)],))
+            for i in range(self.THREADS)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(results.count(PunchAction.TIME_IN), len(employees))
+        self.assertEqual(
+            AttendanceRecord.objects.count(),
+            len(employees),
+        )
+
+    def test_simultaneous_first_punches_all_reach_the_rollup(self):
+        accounting = make_departments(self, "Accounting")["Accounting"]
+        employees = [make_employee(f"EMP{i:03d}", dept="Accounting") for i in range(1, 21)]
+        day = date(2026, 3, 2)
+        barrier = threading.Barrier(len(employees))
+        errors = []
+
+        def punch(employee, minute):
+            try:
+                barrier.wait()
+                record_punch(employee, manila(day, 8, minute))
+            except Exception as exc:  # pragma: no cover - surfaced below
+                errors.append(exc)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        # Half on time, half late, all racing to create the day's row
+        threads = [
+            threading.Thread(target=punch, args=(employee, 10 if i % 2 else 30))
+            for i, employee in enumerate(employees)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        stats = DailyAttendanceStats.objects.get(date=day, department_id=accounting)
+        self.assertEqual((stats.present, stats.late), (10, 10))
+
+
+@override_settings(QR_TOKEN_WINDOW_SECONDS=30, QR_OFFICE_LOCATION=(14.866707, 120.807094))
+class QRTokenTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = manila(date(2026, 3, 2), 8, 0)
+
+    def test_token_valid_for_current_and_previous_window(self):
+        token, expires_at = current_token(self.now)
+
+        self.assertIsNotNone(validate_token(token, self.now))
+        self.assertIsNotNone(validate_token(token, expires_at + timedelta(seconds=1)))
+        self.assertIsNone(validate_token(token, expires_at + timedelta(seconds=31)))
+
+    def test_tampered_or_malformed_token_rejected(self):
+        token, _ = current_token(self.now)
+        window, signature = token.split(":")
+
+        self.assertIsNone(validate_token(f"{int(window) + 1}:{signature}", self.now))
+        self.assertIsNone(validate_token("not-a-token", self.now))
+        self.assertIsNone(validate_token(None, self.now))
+
+    def submit(self, employee, **data):
+        self.client.force_login(employee.user)
+        return self.client.post(reverse("employee_qr_submit"), json.dumps(data), content_type="application/json")
+
+    def employee_with_login(self, emp_id="EMP001"):
+        employee = make_employee(emp_id)
+        employee.user = User.objects.create_user(username=emp_id, password="x")
+        employee.save()
+        return employee
+
+    def test_one_code_serves_many_employees_but_not_replays(self):
+        token, _ = current_token()
+        lat, lng = settings.QR_OFFICE_LOCATION
+        body = json.dumps({"token": token, "lat": lat, "lng": lng})
+
+        for i in range(1, 4):
+            employee = make_employee(f"EMP{i:03d}")
+            employee.user = User.objects.create_user(username=employee.emp_id, password="x")
+            employee.save()
+            self.client.force_login(employee.user)
+
+            response = self.client.post(
+                reverse("employee_qr_submit"), body, content_type="application/json"
+            )
+            self.assertEqual(response.json()["action"], "time_in")
+
+        response = self.client.post(
+            reverse("employee_qr_submit"), body, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(AttendanceRecord.objects.count(), 3)
+
+    def test_claims_are_shared_through_the_database_and_pruned(self):
+        employee = make_employee()
+        window = validate_token(current_token(self.now)[0], self.now)
+
+        self.assertTrue(claim_token(employee, window))
+        cache.clear()  # as seen from another process
+        self.assertFalse(claim_token(employee, window))
+        self.assertTrue(claim_token(employee, window + 1))
+
+        self.assertEqual(prune_claims(self.now + timedelta(seconds=30)), 0)
+        self.assertEqual(prune_claims(self.now + timedelta(seconds=90)), 2)
+
+    @override_settings(QR_OFFICE_LOCATION=None)
+    def test_no_location_check_unless_an_office_is_configured(self):
+        token, _ = current_token()
+        response = self.submit(self.employee_with_login(), token=token)
+        self.assertEqual(response.json()["action"], "time_in")
+
+    def test_a_punch_that_is_not_recorded_does_not_use_up_the_code(self):
+        employee = self.employee_with_login()
+        token, _ = current_token()
+        lat, lng = settings.QR_OFFICE_LOCATION
+
+        with mock.patch("accounts.views.record_punch", side_effect=RuntimeError("database went away")):
+            with self.assertRaises(RuntimeError):
+                self.submit(employee, token=token, lat=lat, lng=lng)
+        self.assertFalse(QRClaim.objects.exists())
+        self.assertEqual(self.submit(employee, token=token, lat=lat, lng=lng).json()["action"], "time_in")
+
+        # Too soon to time out: rejected, and the claim goes with it
+        QRClaim.objects.all().delete()
+        response = self.submit(employee, token=token, lat=lat, lng=lng)
+        self.assertEqual(response.json()["error"], "Please wait 5 minutes before checking out.")
+        self.assertFalse(QRClaim.objects.exists())
+
+    def test_submit_requires_a_location_inside_the_fence(self):
+        employee = self.employee_with_login()
+        token, _ = current_token()
+        lat, lng = settings.QR_OFFICE_LOCATION
+
+        self.assertEqual(self.submit(employee, token=token).status_code, 400)
+        self.assertEqual(self.submit(employee, token=token, lat="NaN", lng=lng).status_code, 403)
+        self.assertEqual(self.submit(employee, token=token, lat=lat + 1, lng=lng).status_code, 403)
+        self.assertFalse(AttendanceRecord.objects.exists())
+
+    @override_settings(QR_KIOSK_KEY="kiosk-secret")
+    def test_kiosk_pages_need_staff_or_the_kiosk_key(self):
+        for name in ("qr_attendance", "qr_attendance_current"):
+            url = reverse(name)
+            self.assertEqual(self.client.get(url).status_code, 302)
+            self.assertEqual(self.client.get(url, {"kiosk": "wrong"}).status_code, 302)
+            self.assertEqual(self.client.get(url, {"kiosk": "kiosk-secret"}).status_code, 200)
+            self.assertEqual(self.client.get(url, HTTP_X_KIOSK_KEY="kiosk-secret").status_code, 200)
+
+        self.client.force_login(self.employee_with_login().user)
+        self.assertEqual(self.client.get(reverse("qr_attendance_current")).status_code, 302)
+        self.client.force_login(User.objects.create_user("admin", password="x", is_staff=True))
+        self.assertEqual(self.client.get(reverse("qr_attendance_current")).status_code, 200)
+
+    def test_kiosk_access_is_off_without_a_key(self):
+        self.assertEqual(self.client.get(reverse("qr_attendance_current"), {"kiosk": ""}).status_code, 302)
+
+    def test_current_endpoint_renders_each_token_once(self):
+        self.client.force_login(User.objects.create_user("admin", password="x", is_staff=True))
+        with mock.patch("accounts.qr_tokens.render_qr_svg", return_value="<svg/>") as render:
+            first = self.client.get(reverse("qr_attendance_current")).json()
+            second = self.client.get(reverse("qr_attendance_current")).json()
+
+        self.assertEqual(first["svg"], "<svg/>")
+        self.assertIsNotNone(validate_token(second["token"]))
+        self.assertLessEqual(render.call_count, 2)  # 2 only if the window rolled over
+
+
+class LeaveBalanceTests(TestCase):
+    def test_balances_for_all_types_in_one_query(self):
+        employee = make_employee()
+        LeaveRequest.objects.create(
+            employee=employee, leave_type="ML", reason="x",
+            start_date=date(2026, 1, 5), end_date=date(2026, 5, 31),
+            status=LeaveRequest.Status.APPROVED,
+        )
+        LeaveRequest.objects.create(
+            employee=employee, leave_type="VL", reason="x",
+            start_date=date(2026, 6, 1), end_date=date(2026, 6, 3),
+            status=LeaveRequest.Status.APPROVED,
+        )
+        LeaveRequest.objects.create(
+            employee=employee, leave_type="VL", reason="x",
+            start_date=date(2026, 7, 1), end_date=date(2026, 7, 10),
+        )
+
+        holidays()  # cached reference data, loaded once per process
+        with self.assertNumQueries(1):
+            balances = {b["code"]: b for b in leave_balances(employee)}
+
+        self.assertEqual(balances["ML"]["remaining"], 0)
+        self.assertEqual(balances["VL"]["used"], 3)
+        self.assertEqual(balances["VL"]["remaining"], 12)
+        self.assertEqual(balances["SL"]["remaining"], 15)
+
+
+class WorkCalendarTests(TestCase):
+    def setUp(self):
+        # Tue 30 Dec 2025, Thu 1 Jan 2026, Mon 9 Feb 2026, Sat 14 Feb 2026
+        self.holidays = [date(2025, 12, 30), date(2026, 1, 1), date(2026, 2, 9), date(2026, 2, 14)]
+        make_holidays(self, *self.holidays)
+
+    def walk(self, start, end):
+        return [
+            start + timedelta(days=n)
+            for n in range((end - start).days + 1)
+            if (start + timedelta(days=n)).weekday() < 5 and start + timedelta(days=n) not in self.holidays
+        ]
+
+    def test_counts_match_day_by_day_walk(self):
+        base = date(2025, 12, 22)
+        for offset in range(10):
+            start = base + timedelta(days=offset)
+            for length in range(0, 70, 3):
+                end = start + timedelta(days=length)
+                expected = self.walk(start, end)
+                self.assertEqual(count_workdays(start, end), len(expected), (start, end))
+                self.assertEqual(workdays(start, end), expected, (start, end))
+
+    def test_empty_ranges_and_single_days(self):
+        self.assertEqual(count_workdays(date(2026, 1, 9), date(2026, 1, 8)), 0)
+        self.assertEqual(count_workdays(date(2026, 1, 10), date(2026, 1, 11)), 0)
+        self.assertEqual(workdays(date(2026, 1, 9), date(2026, 1, 8)), [])
+        self.assertFalse(is_workday(date(2026, 1, 1)))
+        self.assertTrue(is_workday(date(2026, 1, 2)))
+
+    def test_calendar_is_a_bitmap_with_prefix_sums(self):
+        calendar = WorkCalendar(2024, [date(2024, 12, 25), date(2023, 12, 25)])
+        self.assertEqual(len(calendar.bitmap), 366)
+        self.assertEqual(calendar.holidays, (date(2024, 12, 25),))
+        self.assertEqual(calendar.count(date(2000, 1, 1), date(2030, 1, 1)), 261)
+        self.assertEqual(calendar.count(date(2024, 12, 23), date(2024, 12, 27)), 4)
+
+    def test_calendar_is_kept_until_the_holidays_change(self):
+        first = calendar_for(2026)
+        with self.assertNumQueries(0):
+            self.assertIs(calendar_for(2026), first)
+
+        make_holidays(self, date(2026, 4, 9))
+        second = calendar_for(2026)
+        self.assertIsNot(second, first)
+        self.assertFalse(second.is_workday(date(2026, 4, 9)))
+        self.assertIs(calendar_for(2026), second)
+
+    def test_holiday_changes_show_up_immediately(self):
+        self.assertTrue(is_workday(date(2026, 4, 9)))
+        holiday = Holiday.objects.create(date=date(2026, 4, 9), name="Araw ng Kagitingan")
+        self.assertFalse(is_workday(date(2026, 4, 9)))
+        holiday.delete()
+        self.assertTrue(is_workday(date(2026, 4, 9)))
+
+    def test_holidays_are_not_absences_and_adding_one_recounts_tallies(self):
+        employee = make_employee()
+        AttendanceRecord.objects.create(
+            employee=employee, date=date(2026, 3, 3), status=AttendanceRecord.Status.ABSENT,
+        )
+        today = date(2026, 3, 6)
+        # Jan 2 - Mar 6: 46 weekdays, less the Jan 1 and Feb 9 holidays
+        self.assertEqual(yearly_attendance(employee, today), (0, 45))
+
+        Holiday.objects.create(date=date(2026, 3, 3), name="Town fiesta")
+        self.assertEqual(yearly_attendance(employee, today), (0, 44))
+
+        # The tallies are recounted by a queued job, not inside the save
+        job = Job.objects.filter(kind="rebuild_tallies").latest("id")
+        self.assertEqual(job.payload, {"years": [2026]})
+        self.assertEqual(AttendanceTally.objects.get(employee=employee, year=2026).absents, 1)
+        run_pending()
+        self.assertEqual(AttendanceTally.objects.get(employee=employee, year=2026).absents, 0)
+        self.assertEqual(yearly_attendance(employee, today), (0, 44))
+
+    def test_leaves_skip_holidays(self):
+        employee = make_employee()
+        # Mon 9 - Fri 13 Feb 2026 with the Monday a holiday
+        leave = LeaveRequest.objects.create(
+            employee=employee, leave_type="VL", reason="x",
+            start_date=date(2026, 2, 9), end_date=date(2026, 2, 13),
+        )
+        self.assertEqual(
+            validate_leave_request(employee, "VL", date(2026, 2, 16), date(2026, 2, 16), today=date(2026, 2, 2)),
+            1,
+        )
+        approve_leaves([leave.pk])
+
+        self.assertEqual(
+            sorted(AttendanceRecord.objects.filter(employee=employee).values_list("date", flat=True)),
+            workdays(date(2026, 2, 9), date(2026, 2, 13)),
+        )
+        balances = {b["code"]: b for b in leave_balances(employee)}
+        self.assertEqual(balances["VL"]["used"], 4)
+
+    def test_admin_lists_holidays(self):
+        admin = User.objects.create_superuser("root", password="x")
+        self.client.force_login(admin)
+        response = self.client.get(reverse("admin:accounts_holiday_changelist"))
+        self.assertContains(response, "Holiday 2026-02-09")
+
+
+class LeaveValidationTests(TestCase):
+    today = date(2026, 3, 2)  # Monday
+
+    def setUp(self):
+        self.employee = make_employee()
+
+    def leave(self, start, end, **kwargs):
+        fields = {"leave_type": "VL", "reason": "x", **kwargs}
+        return LeaveRequest.objects.create(employee=self.employee, start_date=start, end_date=end, **fields)
+
+    def validate(self, start, end, leave_type="VL"):
+        return validate_leave_request(self.employee, leave_type, start, end, today=self.today)
+
+    def assertRejected(self, start, end, message, leave_type="VL"):
+        with self.assertRaises(ValidationError) as ctx:
+            self.validate(start, end, leave_type)
+        self.assertIn(message, ctx.exception.messages[0])
+
+    def test_invalid_input(self):
+        self.assertRejected(date(2026, 3, 9), date(2026, 3, 9), "valid leave type", leave_type="XX")
+        self.assertRejected(date(2026, 3, 10), date(2026, 3, 9), "must not be before")
+        self.assertRejected(date(2026, 3, 7), date(2026, 3, 8), "no working days")
+
+    def test_overlaps_with_pending_and_approved_requests(self):
+        self.leave(date(2026, 3, 9), date(2026, 3, 11))
+        self.leave(date(2026, 3, 16), date(2026, 3, 16), status=LeaveRequest.Status.APPROVED)
+
+        self.assertRejected(date(2026, 3, 11), date(2026, 3, 13), "Mar 09 - Mar 11, 2026")
+        self.assertRejected(date(2026, 3, 5), date(2026, 3, 20), "Mar 09 - Mar 11, 2026")
+        self.assertRejected(date(2026, 3, 16), date(2026, 3, 16), "Mar 16 - Mar 16, 2026")
+        # Touching but not overlapping
+        self.assertEqual(self.validate(date(2026, 3, 12), date(2026, 3, 13)), 2)
+
+    def test_rejected_and_other_employees_requests_do_not_conflict(self):
+        self.leave(date(2026, 3, 9), date(2026, 3, 13), status=LeaveRequest.Status.REJECTED)
+        LeaveRequest.objects.create(
+            employee=make_employee("EMP002"), leave_type="VL", reason="x",
+            start_date=date(2026, 3, 9), end_date=date(2026, 3, 13),
+        )
+        self.assertEqual(self.validate(date(2026, 3, 9), date(2026, 3, 13)), 5)
+
+    def test_active_leave_blocks_any_new_request(self):
+        self.leave(date(2026, 2, 23), date(2026, 3, 4), leave_type="SL", status=LeaveRequest.Status.APPROVED)
+        self.assertRejected(date(2026, 4, 6), date(2026, 4, 6), "active leave")
+
+    def test_pending_requests_count_against_the_balance(self):
+        self.leave(date(2026, 1, 5), date(2026, 1, 16), status=LeaveRequest.Status.APPROVED)  # 10 days
+        self.leave(date(2026, 2, 2), date(2026, 2, 4))  # 3 days, pending
+        self.leave(date(2026, 2, 9), date(2026, 2, 13), status=LeaveRequest.Status.REJECTED)
+
+        self.assertRejected(date(2026, 3, 9), date(2026, 3, 11), "only have 2 day(s)")
+        self.assertEqual(self.validate(date(2026, 3, 9), date(2026, 3, 10)), 2)
+        self.assertEqual(self.validate(date(2026, 3, 9), date(2026, 3, 13), leave_type="SL"), 5)
+
+    def test_two_queries_and_the_overlap_index(self):
+        for week in range(40):
+            start = date(2025, 1, 6) + timedelta(weeks=week)
+            self.leave(start, start, leave_type="SPL", status=LeaveRequest.Status.APPROVED)
+
+        holidays()  # cached reference data, loaded once per process
+        with self.assertNumQueries(2):
+            self.validate(date(2026, 3, 9), date(2026, 3, 10))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.validate(date(2026, 3, 9), date(2026, 3, 10))
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + queries[0]["sql"])
+            plan = " ".join(str(row) for row in cursor.fetchall())
+        self.assertIn("leave_employee_dates_idx", plan)
+
+    def test_view_shows_the_error(self):
+        self.employee.user = User.objects.create_user("juan", password="x")
+        self.employee.save()
+        self.client.force_login(self.employee.user)
+        self.leave(date(2030, 3, 4), date(2030, 3, 6))
+
+        response = self.client.post(reverse("employee_leave"), {
+            "leave_type": "VL", "start_date": "2030-03-05", "end_date": "2030-03-07", "reason": "x",
+        })
+
+        self.assertContains(response, "These dates overlap your leave request")
+        self.assertEqual(LeaveRequest.objects.count(), 1)
+
+
+class LeaveApprovalTests(TestCase):
+    def setUp(self):
+        self.accounting = make_departments(self, "Accounting")["Accounting"]
+        self.employee = make_employee(dept="Accounting")
+        self.other = make_employee("EMP002")
+
+    def leave(self, start, end, employee=None, **kwargs):
+        fields = {"leave_type": "VL", "reason": "x", **kwargs}
+        return LeaveRequest.objects.create(
+            employee=employee or self.employee, start_date=start, end_date=end, **fields,
+        )
+
+    def test_marks_weekdays_on_leave_and_keeps_derived_tables_in_sync(self):
+        # Mon 2 Mar - Tue 10 Mar 2026: seven weekdays
+        leave = self.leave(date(2026, 3, 2), date(2026, 3, 10))
+        AttendanceRecord.objects.create(
+            employee=self.employee, date=date(2026, 3, 2), status=AttendanceRecord.Status.LATE,
+        )
+        AttendanceRecord.objects.create(
+            employee=self.employee, date=date(2026, 3, 3), status=AttendanceRecord.Status.FIELDWORK,
+        )
+        AttendanceRecord.objects.create(
+            employee=self.employee, date=date(2026, 3, 4), status=AttendanceRecord.Status.HEALTH,
+        )
+
+        self.assertEqual(approve_leaves([leave.pk]), 1)
+
+        statuses = dict(
+            AttendanceRecord.objects.filter(employee=self.employee).values_list("date", "status")
+        )
+        self.assertEqual(len(statuses), 7)
+        # Fieldwork and health days are not overwritten by a leave
+        self.assertEqual(statuses.pop(date(2026, 3, 3)), AttendanceRecord.Status.FIELDWORK)
+        self.assertEqual(statuses.pop(date(2026, 3, 4)), AttendanceRecord.Status.HEALTH)
+        self.assertEqual(set(statuses.values()), {AttendanceRecord.Status.ON_LEAVE})
+
+        leave.refresh_from_db()
+        self.assertEqual(leave.status, LeaveRequest.Status.APPROVED)
+        self.assertIsNotNone(leave.responded_at)
+
+        tally = AttendanceTally.objects.get(employee=self.employee, year=2026)
+        self.assertEqual((tally.lates, tally.absents, tally.attended), (0, 0, 7))
+        stats = DailyAttendanceStats.objects.get(date=date(2026, 3, 2), department_id=self.accounting)
+        self.assertEqual((stats.late, stats.on_leave), (0, 1))
+
+    def test_a_day_punched_in_during_approval_is_put_on_leave(self):
+        day = date(2026, 3, 3)
+        leave = self.leave(date(2026, 3, 2), day)
+        real_workdays = leave_approval.workdays
+
+        def punch_meanwhile(start, end):
+            # Lands after the locking read, before the bulk insert
+            record_punch(self.employee, manila(day, 8, 0))
+            return real_workdays(start, end)
+
+        with mock.patch("accounts.leave_approval.workdays", punch_meanwhile):
+            self.assertEqual(approve_leaves([leave.pk]), 1)
+
+        statuses = dict(
+            AttendanceRecord.objects.filter(employee=self.employee).values_list("date", "status")
+        )
+        self.assertEqual(statuses, {
+            date(2026, 3, 2): AttendanceRecord.Status.ON_LEAVE,
+            day: AttendanceRecord.Status.ON_LEAVE,
+        })
+        stats = DailyAttendanceStats.objects.get(date=day, department_id=self.accounting)
+        self.assertEqual((stats.present, stats.on_leave), (0, 1))
+
+    def test_query_count_does_not_grow_with_leave_length(self):
+        short = self.leave(date(2026, 3, 2), date(2026, 3, 2))
+        with CaptureQueriesContext(connection) as one_day:
+            approve_leaves([short.pk])
+
+        maternity = self.leave(date(2026, 4, 6), date(2026, 8, 30), employee=self.other, leave_type="ML")
+        with CaptureQueriesContext(connection) as long_leave:
+            approve_leaves([maternity.pk])
+
+        self.assertEqual(AttendanceRecord.objects.filter(employee=self.other).count(), 105)
+        # Only bulk insert batches grow with the leave (SQLite caps
+        # parameters per statement); the per-day loop needed ~150 queries
+        self.assertLessEqual(len(long_leave), len(one_day) + 2)
+
+    def test_bulk_approve_and_reject_from_the_leave_list(self):
+        admin = User.objects.create_user("admin", password="x", is_staff=True)
+        self.client.force_login(admin)
+        first = self.leave(date(2026, 3, 2), date(2026, 3, 3))
+        second = self.leave(date(2026, 3, 4), date(2026, 3, 4), employee=self.other)
+        third = self.leave(date(2026, 3, 5), date(2026, 3, 5))
+        done = self.leave(date(2026, 3, 9), date(2026, 3, 9), status=LeaveRequest.Status.REJECTED)
+
+        self.client.post(reverse("adminemployee"), {
+            "action": "approve", "leave_ids": [first.pk, second.pk, done.pk],
+        })
+        self.client.post(reverse("adminemployee"), {"action": "reject", "leave_id": third.pk})
+
+        statuses = dict(LeaveRequest.objects.values_list("pk", "status"))
+        self.assertEqual(statuses, {
+            first.pk: LeaveRequest.Status.APPROVED,
+            second.pk: LeaveRequest.Status.APPROVED,
+            third.pk: LeaveRequest.Status.REJECTED,
+            done.pk: LeaveRequest.Status.REJECTED,
+        })
+        self.assertEqual(AttendanceRecord.objects.count(), 3)
+        self.assertEqual(reject_leaves([first.pk]), 0)
+
+
+class AttendanceTallyTests(TestCase):
+    def setUp(self):
+        self.employee = make_employee()
+        self.today = date(2026, 3, 18)
+
+    def walk(self, start):
+        # Reference: the original day-by-day dashboard loop
+        records = {r.date: r for r in AttendanceRecord.objects.filter(employee=self.employee)}
+        lates = absents = 0
+        current = start
+        while current <= self.today:
+            if current.weekday() < 5:
+                att = records.get(current)
+                if att is None or att.status == AttendanceRecord.Status.ABSENT:
+                    absents += 1
+                elif att.status == AttendanceRecord.Status.LATE:
+                    lates += 1
+            current += timedelta(days=1)
+        return lates, absents
+
+    def add(self, day, status):
+        return AttendanceRecord.objects.create(employee=self.employee, date=day, status=status)
+
+    def test_incremental_counters_match_full_walk(self):
+        self.add(date(2026, 1, 5), AttendanceRecord.Status.LATE)
+        self.add(date(2026, 1, 6), AttendanceRecord.Status.ABSENT)
+        self.add(date(2026, 1, 10), AttendanceRecord.Status.LATE)  # Saturday
+        record = self.add(date(2026, 2, 2), AttendanceRecord.Status.PRESENT)
+        self.add(date(2026, 4, 1), AttendanceRecord.Status.ON_LEAVE)  # future
+
+        record.status = AttendanceRecord.Status.LATE
+        record.save()
+
+        self.assertEqual(yearly_attendance(self.employee, self.today), self.walk(date(2026, 1, 1)))
+
+        record.delete()
+        self.assertEqual(yearly_attendance(self.employee, self.today), self.walk(date(2026, 1, 1)))
+
+        start = date(2026, 1, 6)
+        self.assertEqual(yearly_attendance(self.employee, self.today, start=start), self.walk(start))
+
+    def test_reads_single_row_in_steady_state(self):
+        self.add(date(2026, 1, 5), AttendanceRecord.Status.LATE)
+
+        with self.assertNumQueries(1):
+            yearly_attendance(self.employee, self.today)
+
+    def test_rebuild_restores_drifted_counters(self):
+        self.add(date(2026, 1, 5), AttendanceRecord.Status.LATE)
+        AttendanceRecord.objects.update(status=AttendanceRecord.Status.PRESENT)
+
+        rebuild_tallies(2026)
+
+        tally = AttendanceTally.objects.get(employee=self.employee, year=2026)
+        self.assertEqual((tally.lates, tally.attended), (0, 1))
+
+
+class PayslipTests(TestCase):
+    def setUp(self):
+        SalaryGrade.objects.create(grade=10, monthly_salary=Decimal("21750.00"))
+        self.employee = make_employee(salary_grade="SG-10", date_hired=date(2025, 1, 6))
+        self.employee.user = User.objects.create_user(username="EMP001", password="x")
+        self.employee.save()
+
+    def fill(self, start, end, status=AttendanceRecord.Status.PRESENT):
+        records = []
+        current = start
+        while current <= end:
+            if current.weekday() < 5:
+                records.append(AttendanceRecord(employee=self.employee, date=current, status=status))
+            current += timedelta(days=1)
+        AttendanceRecord.objects.bulk_create(records)
+        rebuild_tallies(start.year)
+
+    def test_absences_beyond_sick_leave_are_deducted(self):
+        today = date(2026, 3, 31)
+        self.fill(date(2026, 1, 1), date(2026, 2, 28))
+        # March: 5 lates, the rest of the month missing
+        self.fill(date(2026, 3, 2), date(2026, 3, 6), AttendanceRecord.Status.LATE)
+
+        amounts = compute_payslip(self.employee, date(2026, 3, 1), date(2026, 3, 31), today)
+
+        # 17 missing weekdays + 5 lates * 0.25 = 18.25 days, which also
+        # exhausts the yearly sick leave, so all of it is deducted
+        self.assertEqual(amounts["absent_days"], 17)
+        self.assertEqual(amounts["deductible_absents"], Decimal("18.25"))
+        self.assertEqual(amounts["daily_rate"], Decimal("1000.00"))
+        self.assertEqual(amounts["absence_deduction"], Decimal("18250.00"))
+        self.assertEqual(amounts["net_pay"], Decimal("3956.25"))
+
+    def test_sick_leave_covers_small_absences(self):
+        today = date(2026, 3, 31)
+        self.fill(date(2026, 1, 1), date(2026, 3, 25))
+
+        amounts = compute_payslip(self.employee, date(2026, 3, 1), date(2026, 3, 31), today)
+
+        self.assertEqual(amounts["absent_days"], 4)
+        self.assertEqual(amounts["deductible_absents"], 0)
+        self.assertEqual(amounts["net_pay"], Decimal("22206.25"))
+
+    def test_payslip_query_count_does_not_grow_with_the_year(self):
+        self.client.force_login(self.employee.user)
+        url = reverse("payslip")
+
+        self.fill(date(2026, 1, 1), date(2026, 1, 31))
+        salary_grades()  # warm the reference-data cache
+        with CaptureQueriesContext(connection) as early:
+            self.client.get(url)
+
+        self.fill(date(2026, 2, 1), timezone.localdate() - timedelta(days=1))
+        with CaptureQueriesContext(connection) as late:
+            self.client.get(url)
+
+        self.assertLessEqual(len(late), 8)
+        self.assertEqual(len(early), len(late))
+
+
+class PayrollRunTests(TestCase):
+    def setUp(self):
+        SalaryGrade.objects.create(grade=10, monthly_salary=Decimal("21750.00"))
+        self.today = date(2026, 3, 20)
+
+    def seed(self, n, first=0):
+        statuses = ["present", "late", "absent", "present", "ON LEAVE"]
+        for i in range(first, first + n):
+            employee = make_employee(
+                f"EMP{i:04d}",
+                salary_grade="SG-10",
+                date_hired=date(2026, 2, 10) if i % 3 == 0 else date(2024, 1, 1),
+                emp_status="Job Order" if i % 4 == 0 else "Regular",
+                jo_daily_rate=Decimal("550.00") if i % 4 == 0 else None,
+            )
+            AttendanceRecord.objects.bulk_create([
+                AttendanceRecord(
+                    employee=employee,
+                    date=date(2026, 1, 1) + timedelta(days=d),
+                    status=statuses[(i + d) % len(statuses)],
+                )
+                for d in range(0, 100, 1 + i % 3)
+            ])
+        rebuild_tallies(2026)
+
+    def test_batch_matches_per_employee_payslips(self):
+        self.seed(12)
+
+        run = run_payroll(date(2026, 3, 1), date(2026, 3, 31), today=self.today)
+
+        self.assertEqual(run.employee_count, 12)
+        for slip in Payslip.objects.filter(run=run).select_related("employee"):
+            expected = compute_payslip(slip.employee, date(2026, 3, 1), date(2026, 3, 31), self.today)
+            for field in PAYSLIP_FIELDS:
+                self.assertEqual(getattr(slip, field), expected[field], (slip.employee_id, field))
+
+    def test_payslips_of_a_run_made_before_the_period_ended_are_not_served(self):
+        self.seed(2)
+        employee = Employee.objects.get(emp_id="EMP0001")
+        run_payroll(date(2026, 3, 1), date(2026, 3, 31), today=self.today)
+
+        PayrollRun.objects.update(completed_at=manila(self.today, 12))
+        self.assertIsNone(stored_payslip(employee, date(2026, 3, 1), date(2026, 3, 31)))
+
+        PayrollRun.objects.update(completed_at=manila(date(2026, 4, 1), 9))
+        stored = stored_payslip(employee, date(2026, 3, 1), date(2026, 3, 31))
+        self.assertEqual(stored["net_pay"], Payslip.objects.get(employee=employee).net_pay)
+
+    def test_query_count_does_not_depend_on_headcount(self):
+        self.seed(3)
+        salary_grades()  # warm the reference-data cache
+        with CaptureQueriesContext(connection) as small:
+            run_payroll(date(2026, 2, 1), date(2026, 2, 28), today=self.today)
+
+        self.seed(60, first=100)
+        with CaptureQueriesContext(connection) as large:
+            run_payroll(date(2026, 1, 1), date(2026, 1, 31), today=self.today)
+
+        self.assertEqual(len(small), len(large))
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user("admin", password="x", is_staff=True)
+        self.client.force_login(self.admin)
+        self.day = date(2026, 3, 2)
+        self.departments = make_departments(self, "Accounting", "Engineering")
+        for i, dept in enumerate(["Accounting", "Accounting", "Engineering"]):
+            employee = make_employee(f"EMP{i:03d}", dept=dept, lname=f"Cruz{i}")
+            AttendanceRecord.objects.create(
+                employee=employee,
+                date=self.day,
+                status=AttendanceRecord.Status.PRESENT,
+                hours_worked=Decimal("8.00"),
+            )
+
+    def test_attendance_csv_streams_filtered_rows(self):
+        response = self.client.get(
+            reverse("time_export"),
+            {"date": "2026-03-02", "department": self.departments["Accounting"], "format": "csv"},
+        )
+
+        self.assertTrue(response.streaming)
+        self.assertIn("attendance_2026-03-02.csv", response["Content-Disposition"])
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(",")[:2], ["Date", "Employee ID"])
+        self.assertEqual([line.split(",")[1] for line in lines[1:]], ["EMP000", "EMP001"])
+
+    def test_payroll_xlsx(self):
+        SalaryGrade.objects.create(grade=10, monthly_salary=Decimal("21750.00"))
+        run = run_payroll(date(2026, 3, 1), date(2026, 3, 31), today=date(2026, 3, 20))
+
+        response = self.client.get(reverse("payroll_export", args=[run.pk]), {"format": "xlsx"})
+
+        wb = openpyxl.load_workbook(io.BytesIO(b"".join(response.streaming_content)))
+        rows = list(wb.active.values)
+        self.assertEqual(rows[0][0], "Employee ID")
+        self.assertEqual(len(rows), 4)
+
+    def test_formula_like_text_is_escaped_in_both_formats(self):
+        make_employee("EMP100", fname="=HYPERLINK(\"http://x\")", lname="@SUM(A1)", phone="+639171234567")
+
+        response = self.client.get(reverse("employee_export"), {"format": "csv"})
+        rows = list(csv.reader(b"".join(response.streaming_content).decode().splitlines()))
+        row = next(row for row in rows if row[0] == "EMP100")
+        self.assertEqual(row[1:3], ["'=HYPERLINK(\"http://x\")", "'@SUM(A1)"])
+        self.assertEqual(row[4], "'+639171234567")
+
+        response = self.client.get(reverse("employee_export"), {"format": "xlsx"})
+        wb = openpyxl.load_workbook(io.BytesIO(b"".join(response.streaming_content)))
+        row = next(row for row in wb.active.values if row[0] == "EMP100")
+        self.assertEqual(row[1], "'=HYPERLINK(\"http://x\")")
+
+    def test_requires_staff(self):
+        self.client.force_login(User.objects.create_user("plain", password="x"))
+        response = self.client.get(reverse("employee_export"))
+        self.assertEqual(response.status_code, 302)
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class EmployeeImportTests(TestCase):
+    def workbook(self, rows):
+        wb = openpyxl.Workbook()
+        sheet = wb.active
+        sheet.append(REQUIRED_COLUMNS)
+        for row in rows:
+            sheet.append(row)
+        output = io.BytesIO()
+        wb.save(output)
+        output.seek(0)
+        return output
+
+    def regular(self, n):
+        return [
+            f"first{n}", f"last{n}", f"E{n}@Example.com", datetime(1990, 1, 1),
+            "Regular", "Office of the Municipal Health Officer", "nurse i", None, None,
+        ]
+
+    def test_valid_duplicate_and_invalid_rows(self):
+        make_employee("EMP001", fname="Ana", lname="Reyes", email="ana@example.com", dob=date(1990, 1, 1))
+        rows = [
+            self.regular(1),
+            ["ana", "reyes", "ana@example.com", datetime(1990, 1, 1), "Job Order", None, None, None, 500],
+            self.regular(1),
+            ["", "Santos", "x@example.com", None, "Regular", None, None, None, None],
+            ["Jo", "Cruz", "jo@example.com", None, "Job Order", None, None, None, "abc"],
+            ["Al", "Tan", "al@example.com", None, "Regular", "Nutrition Office", "Mayor", None, None],
+            ["Bo", "Lim", "bo@example.com", None, "Job Order", None, None, None, 550],
+        ]
+
+        report = import_employees(self.workbook(rows), "EMP002")
+
+        self.assertEqual(report.created, 2)
+        self.assertEqual(report.duplicates, [3, 4])
+        self.assertEqual([n for n, _ in report.errors], [5, 6, 7])
+
+        nurse = Employee.objects.get(emp_id="EMP002")
+        self.assertEqual((nurse.fname, nurse.email), ("First1", "e1@example.com"))
+        self.assertEqual((nurse.position, nurse.salary_grade), ("Nurse I", "SG-15"))
+        self.assertEqual(nurse.job_position, Position.objects.get(title="Nurse I"))
+        self.assertEqual(nurse.department_id, nurse.job_position.department_id)
+        self.assertTrue(nurse.user.check_password("EMP002"))
+        self.assertEqual(Employee.objects.get(emp_id="EMP003").jo_daily_rate, Decimal("550.00"))
+
+    def test_queries_are_batched(self):
+        with CaptureQueriesContext(connection) as queries:
+            import_employees(self.workbook([self.regular(n) for n in range(200)]), "EMP100")
+
+        self.assertEqual(Employee.objects.filter(user__isnull=False).count(), 200)
+        # Only bulk insert batches grow with the file (SQLite caps
+        # parameters per statement); the old importer needed 6+ per row
+        self.assertLess(len(queries), 20)
+
+    def test_rejects_wrong_headers(self):
+        wb = openpyxl.Workbook()
+        wb.active.append(["name", "email"])
+        output = io.BytesIO()
+        wb.save(output)
+        output.seek(0)
+
+        with self.assertRaises(ValidationError):
+            import_employees(output, "EMP001")
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+    JOB_RETRY_BASE_SECONDS=10,
+)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user("admin", password="x", is_staff=True)
+        self.client.force_login(self.admin)
+
+    def test_failed_job_is_retried_with_backoff(self):
+        calls = []
+
+        def flaky(job):
+            calls.append(job.attempts)
+            if len(calls) < 3:
+                raise RuntimeError("boom")
+            return {"ok": True}
+
+        with mock.patch.dict(HANDLERS, {"flaky": flaky}), self.assertLogs("accounts.jobs"):
+            job = enqueue("flaky")
+            now = timezone.now()
+            run_pending(now)
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), (Job.Status.QUEUED, 1))
+            self.assertEqual(job.run_after, now + timedelta(seconds=10))
+            self.assertIn("boom", job.message)
+
+            run_pending(now + timedelta(seconds=10))
+            job.refresh_from_db()
+            self.assertEqual(job.run_after, now + timedelta(seconds=30))
+
+            run_pending(now + timedelta(seconds=30))
+            job.refresh_from_db()
+
+        self.assertEqual(calls, [1, 2, 3])
+        self.assertEqual((job.status, job.result), (Job.Status.SUCCEEDED, {"ok": True}))
+
+    def test_gives_up_after_max_attempts(self):
+        def broken(job):
+            raise RuntimeError("boom")
+
+        with mock.patch.dict(HANDLERS, {"broken": broken}), self.assertLogs("accounts.jobs"):
+            job = enqueue("broken", max_attempts=2)
+            now = timezone.now()
+            run_pending(now)
+            run_pending(now + timedelta(days=1))
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.FAILED, 2))
+
+    def test_upload_is_kept_for_retries_and_deleted_once_the_job_gives_up(self):
+        with tempfile.TemporaryDirectory() as media, self.settings(MEDIA_ROOT=media):
+            path = default_storage.save("imports/employees.xlsx", io.BytesIO(b"not a workbook"))
+            job = enqueue("import_employees", {"path": path}, max_attempts=2)
+            now = timezone.now()
+
+            with (
+                mock.patch("accounts.jobs.import_employees", side_effect=OSError("disk")),
+                self.assertLogs("accounts.jobs"),
+            ):
+                run_pending(now)
+                self.assertTrue(default_storage.exists(path))
+                run_pending(now + timedelta(days=1))
+
+            job.refresh_from_db()
+            self.assertEqual(job.status, Job.Status.FAILED)
+            self.assertFalse(default_storage.exists(path))
+
+    def test_a_periodic_task_runs_on_one_worker_at_a_time(self):
+        overlapping = []
+
+        def task(now):
+            # Another worker ticking while this one is still running the task
+            overlapping.append(run_periodic_tasks(now))
+            return {}
+
+        now = timezone.now()
+        with mock.patch.dict(PERIODIC_TASKS, {"solo": (timedelta(minutes=5), task)}, clear=True):
+            self.assertEqual(run_periodic_tasks(now), ["solo"])
+            self.assertEqual(run_periodic_tasks(now + timedelta(minutes=5)), ["solo"])
+
+        self.assertEqual(overlapping, [[], []])
+        self.assertEqual(TaskRun.objects.get(name="solo").last_run_at, now + timedelta(minutes=5))
+
+    def test_a_failing_periodic_task_does_not_stop_the_others(self):
+        def broken(now):
+            raise RuntimeError("boom")
+
+        now = timezone.now()
+        tasks = {"broken": (timedelta(minutes=5), broken), "fine": (timedelta(minutes=5), lambda now: {"ok": True})}
+        with mock.patch.dict(PERIODIC_TASKS, tasks, clear=True), self.assertLogs("accounts.jobs"):
+            self.assertEqual(run_periodic_tasks(now), ["broken", "fine"])
+
+        self.assertEqual(TaskRun.objects.get(name="broken").last_result, {"error": "RuntimeError: boom"})
+        self.assertEqual(TaskRun.objects.get(name="fine").last_result, {"ok": True})
+
+    def test_stale_running_job_is_requeued(self):
+        job = enqueue("import_employees")
+        claim_next()
+        Job.objects.update(started_at=timezone.now() - timedelta(hours=2))
+
+        self.assertEqual(requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.Status.QUEUED)
+
+    def test_payroll_is_enqueued_and_polled(self):
+        SalaryGrade.objects.create(grade=10, monthly_salary=Decimal("21750.00"))
+        make_employee(salary_grade="SG-10")
+
+        response = self.client.post(reverse("payroll"), {"month": "2026-01"})
+        job = Job.objects.get()
+        self.assertRedirects(response, reverse("payroll") + f"?job={job.pk}")
+        self.assertFalse(PayrollRun.objects.exists())
+        page = self.client.get(response.url)
+        self.assertContains(page, reverse("job_status", args=[job.pk]))
+
+        run_pending()
+
+        status = self.client.get(reverse("job_status", args=[job.pk])).json()
+        self.assertEqual(status["status"], "succeeded")
+        self.assertEqual(status["percent"], 100)
+        run = PayrollRun.objects.get()
+        self.assertEqual(status["result"]["url"], reverse("payroll") + f"?run={run.pk}")
+
+    def test_upload_is_imported_by_the_worker(self):
+        wb = openpyxl.Workbook()
+        wb.active.append(REQUIRED_COLUMNS)
+        wb.active.append(["Bo", "Lim", "bo@example.com", None, "Job Order", None, None, None, 550])
+        upload = io.BytesIO()
+        wb.save(upload)
+        upload.seek(0)
+        upload.name = "employees.xlsx"
+
+        with tempfile.TemporaryDirectory() as media, self.settings(MEDIA_ROOT=media):
+            self.client.post(reverse("adminemployee"), {"bulk_upload": "1", "excel_file": upload})
+            job = Job.objects.get(kind="import_employees")
+            run_pending()
+            job.refresh_from_db()
+
+        self.assertEqual(job.status, Job.Status.SUCCEEDED, job.message)
+        self.assertEqual(job.result["created"], 1)
+        self.assertTrue(Employee.objects.filter(fname="Bo", user__isnull=False).exists())
+
+
+class CloseOpenAttendanceTests(TestCase):
+    def setUp(self):
+        self.today = date(2026, 3, 4)
+        self.employee = make_employee()
+
+    def record(self, day, time_in, emp_id=None, **kwargs):
+        employee = make_employee(emp_id) if emp_id else self.employee
+        return AttendanceRecord.objects.create(employee=employee, date=day, time_in=time_in, **kwargs)
+
+    def test_closes_todays_records_after_five_in_one_update(self):
+        on_time = self.record(self.today, time(8, 30))
+        evening = self.record(self.today, time(17, 30), emp_id="EMP002")
+        done = self.record(self.today, time(8, 0), emp_id="EMP003", time_out=time(12, 0))
+
+        self.assertEqual(close_open_attendance(manila(self.today, 16, 59)), 0)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(close_open_attendance(manila(self.today, 17, 5)), 2)
+        updates = [q for q in queries if q["sql"].startswith('UPDATE "attendance_record"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(close_open_attendance(manila(self.today, 18)), 0)
+
+        # The bypassed signals are made up for by the rollup deltas
+        self.assertEqual(daily_summaries([self.today])[self.today]["hours_count"], 2)
+
+        for record in (on_time, evening, done):
+            record.refresh_from_db()
+        self.assertEqual((on_time.time_out, on_time.hours_worked), (time(17, 0), Decimal("8.50")))
+        self.assertEqual(evening.hours_worked, Decimal("0.00"))
+        self.assertEqual(done.time_out, time(12, 0))
+
+    def test_closes_records_left_open_on_earlier_days(self):
+        old = self.record(self.today - timedelta(days=1), time(9, 10, 30))
+
+        close_open_attendance(manila(self.today, 7))
+
+        old.refresh_from_db()
+        self.assertEqual(old.hours_worked, Decimal("7.83"))
+
+    def test_periodic_run_is_recorded_and_throttled(self):
+        self.record(self.today, time(8, 0))
+        now = manila(self.today, 17, 30)
+
+        self.assertEqual(run_periodic_tasks(now), ["close_open_attendance", "prune_qr_claims"])
+        self.assertEqual(run_periodic_tasks(now + timedelta(minutes=5)), [])
+        self.assertEqual(run_periodic_tasks(now + timedelta(minutes=15)), ["close_open_attendance"])
+
+        task = TaskRun.objects.get(name="close_open_attendance")
+        self.assertEqual(task.last_run_at, now + timedelta(minutes=15))
+        self.assertEqual(task.last_result, {"closed": 0})
+
+
+class DailyAttendanceStatsTests(TestCase):
+    def setUp(self):
+        self.day = date(2026, 3, 2)
+        self.departments = make_departments(self, "Accounting", "Engineering")
+        self.accounting = [make_employee(f"ACC{i}", dept="Accounting") for i in range(3)]
+        self.other = make_employee("OTH0")
+
+    def assertMatchesRebuild(self, days):
+        maintained = {
+            (s.date, s.department_id): [getattr(s, f) for f in COUNTER_FIELDS]
+            for s in DailyAttendanceStats.objects.all()
+        }
+        rebuild_daily_stats(days)
+        rebuilt = {
+            (s.date, s.department_id): [getattr(s, f) for f in COUNTER_FIELDS]
+            for s in DailyAttendanceStats.objects.all()
+        }
+        self.assertEqual(maintained, rebuilt)
+
+    def test_incremental_updates_match_a_rebuild(self):
+        a, b, c = self.accounting
+        record_punch(a, manila(self.day, 8, 0))
+        record_punch(b, manila(self.day, 9, 0))
+        record_punch(self.other, manila(self.day, 8, 5))
+        record_punch(a, manila(self.day, 17, 0))
+        absent = AttendanceRecord.objects.create(
+            employee=c, date=self.day, status=AttendanceRecord.Status.ABSENT,
+        )
+
+        stats = DailyAttendanceStats.objects.get(date=self.day, department_id=self.departments["Accounting"])
+        self.assertEqual((stats.present, stats.late, stats.absent), (1, 1, 1))
+        self.assertEqual((stats.hours_total, stats.hours_count), (Decimal("9.00"), 1))
+
+        absent.status = AttendanceRecord.Status.FIELDWORK
+        absent.hours_worked = Decimal("4.00")
+        absent.save()
+        AttendanceRecord.objects.get(employee=b).delete()
+        self.assertMatchesRebuild([self.day])
+
+        stats.refresh_from_db()
+        self.assertEqual((stats.late, stats.absent, stats.fieldwork), (0, 0, 1))
+        self.assertEqual(stats.hours_count, 2)
+
+    def test_bulk_writes_add_deltas_that_match_a_rebuild(self):
+        a, b, c = self.accounting
+        record_punch(a, manila(self.day, 8, 0))
+        record_punch(b, manila(self.day, 9, 0))
+        record_punch(self.other, manila(self.day, 8, 5))
+        close_open_attendance(manila(self.day, 17, 30))
+
+        leave = LeaveRequest.objects.create(
+            employee=b, leave_type="VL", reason="x",
+            start_date=self.day, end_date=self.day + timedelta(days=2),
+        )
+        approve_leaves([leave.pk])
+
+        days = [self.day + timedelta(days=n) for n in range(3)]
+        self.assertMatchesRebuild(days)
+        stats = DailyAttendanceStats.objects.get(date=self.day, department_id=self.departments["Accounting"])
+        self.assertEqual((stats.present, stats.late, stats.on_leave, stats.hours_count), (1, 0, 1, 2))
+
+    def test_transfer_moves_the_employees_counts(self):
+        a = self.accounting[0]
+        record_punch(a, manila(self.day, 8, 0))
+        record_punch(a, manila(self.day, 16, 0))
+        record_punch(a, manila(self.day + timedelta(days=1), 9, 0))
+        record_punch(self.accounting[1], manila(self.day, 8, 0))
+
+        a.dept = "Engineering"
+        a.save()
+
+        accounting = DailyAttendanceStats.objects.get(date=self.day, department_id=self.departments["Accounting"])
+        engineering = DailyAttendanceStats.objects.get(date=self.day, department_id=self.departments["Engineering"])
+        self.assertEqual((accounting.present, accounting.hours_count), (1, 0))
+        self.assertEqual((engineering.present, engineering.hours_total), (1, Decimal("8.00")))
+        self.assertMatchesRebuild([self.day, self.day + timedelta(days=1)])
+
+        # Punches after the transfer land on the new department
+        record_punch(a, manila(self.day + timedelta(days=1), 17, 0))
+        self.assertMatchesRebuild([self.day, self.day + timedelta(days=1)])
+
+    def test_dashboard_reads_rollups_with_live_fallback(self):
+        record_punch(self.accounting[0], manila(self.day, 8, 0))
+        record_punch(self.accounting[0], manila(self.day, 16, 0))
+        # Written without signals, as before the rollups existed
+        AttendanceRecord.objects.bulk_create([
+            AttendanceRecord(
+                employee=self.other,
+                date=self.day + timedelta(days=1),
+                status=AttendanceRecord.Status.LATE,
+                hours_worked=Decimal("6.00"),
+            ),
+        ])
+
+        days = [self.day, self.day + timedelta(days=1), self.day + timedelta(days=2)]
+        with self.assertNumQueries(2):
+            summaries = daily_summaries(days)
+
+        self.assertEqual(summaries[days[0]]["present"], 1)
+        self.assertEqual(summaries[days[0]]["avg_hours"], Decimal("8.00"))
+        self.assertEqual(summaries[days[1]]["late"], 1)
+        self.assertEqual(summaries[days[1]]["avg_hours"], Decimal("6.00"))
+        self.assertEqual(summaries[days[2]]["present"], 0)
+
+
+class TimeTrackingTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("admin", password="x", is_staff=True))
+        self.day = date(2026, 3, 2)
+        self.departments = make_departments(self, "Accounting", "Engineering")
+        statuses = ["present", "late", "ON LEAVE", "present"]
+        for i in range(7):
+            employee = make_employee(f"EMP{i:03d}", dept="Accounting" if i < 5 else "Engineering")
+            AttendanceRecord.objects.create(
+                employee=employee,
+                date=self.day,
+                status=statuses[i % 4],
+                hours_worked=Decimal(6 + i % 3),
+            )
+
+    def test_summary_cards_in_one_aggregate(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("time"), {"date": "2026-03-02", "department": self.departments["Accounting"]}
+            )
+
+        self.assertEqual(response.context["today_present"], 3)
+        self.assertEqual(response.context["today_late"], 1)
+        self.assertEqual(response.context["today_on_leave"], 1)
+        self.assertEqual(response.context["today_avg_hours"], 6.8)
+        counts = [q for q in queries if "COUNT(" in q["sql"] and "attendance_record" in q["sql"]]
+        self.assertEqual(len(counts), 1)
+
+    def test_logs_are_paged_by_keyset(self):
+        seen = []
+        params = {"date": "2026-03-02"}
+        with mock.patch("accounts.views.keyset_page", partial(keyset_page, size=3)):
+            while True:
+                response = self.client.get(reverse("time"), params)
+                seen += [log.employee_id for log in response.context["recent_logs"]]
+                if not response.context["next_page"]:
+                    break
+                params = QueryDict(response.context["next_page"][1:])
+
+        expected = list(
+            AttendanceRecord.objects.order_by("-date", "-created_at", "-id")
+            .values_list("employee_id", flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    def test_bad_cursor_falls_back_to_first_page(self):
+        response = self.client.get(reverse("time"), {"date": "2026-03-02", "after": "garbage"})
+        self.assertEqual(len(response.context["recent_logs"]), 7)
+
+
+class DirectoryTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("admin", password="x", is_staff=True))
+        names = [("Maria", "Santos"), ("Jose", "Reyes"), ("Ana", "Santiago"), ("Pedro", "Bautista"), ("Mario", "Reyes")]
+        for i, (fname, lname) in enumerate(names):
+            make_employee(f"EMP{i:03d}", fname=fname, lname=lname, dept="Accounting")
+        make_employee("EMP900", fname="Marco", lname="Santos", is_archived=True)
+
+    def api(self, **params):
+        return self.client.get(reverse("employee_directory_api"), params).json()
+
+    def test_search_matches_word_prefixes(self):
+        ids = lambda page: {row["emp_id"] for row in page["results"]}
+        self.assertEqual(ids(self.api(q="sant")), {"EMP002", "EMP000"})
+        self.assertEqual(ids(self.api(q="MAR")), {"EMP004", "EMP000"})
+        self.assertEqual(ids(self.api(q="reyes mario")), {"EMP004"})
+        self.assertEqual(ids(self.api(q="emp003")), {"EMP003"})
+        self.assertEqual(ids(self.api(q="antos")), set())
+        self.assertIsNone(self.api(q="sant")["next"])
+
+    def test_archived_filter(self):
+        page = self.api(archived="1")
+        self.assertEqual([row["emp_id"] for row in page["results"]], ["EMP900"])
+
+    def test_pages_follow_the_cursor_in_constant_queries(self):
+        AttendanceRecord.objects.create(
+            employee_id="EMP001", date=timezone.localdate(), time_in=time(8, 0), status="present"
+        )
+        seen, params, pages = [], {}, 0
+        with mock.patch("accounts.views.directory_page", partial(directory_page, size=2)):
+            while True:
+                with CaptureQueriesContext(connection) as queries:
+                    page = self.api(**params)
+                # session + user + page + today's attendance
+                self.assertEqual(len(queries), 4)
+                seen += page["results"]
+                pages += 1
+                if not page["next"]:
+                    break
+                params = {"after": page["next"]}
+
+        self.assertEqual(
+            [row["emp_id"] for row in seen],
+            list(Employee.objects.filter(is_archived=False)
+                 .order_by("lname", "fname", "emp_id").values_list("emp_id", flat=True)),
+        )
+        self.assertEqual(pages, 3)
+        jose = next(row for row in seen if row["emp_id"] == "EMP001")
+        self.assertEqual(jose["today_att"]["time_in"], "08:00:00")
+        self.assertIsNone(seen[0]["today_att"])
+
+    def test_adminemployee_renders_first_page(self):
+        with mock.patch("accounts.views.directory_page", partial(directory_page, size=2)):
+            response = self.client.get(reverse("adminemployee"))
+        self.assertEqual(len(response.context["employees"]), 2)
+        self.assertContains(response, response.context["next_cursor"])
+
+
+class LeaveQueueTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user("admin", password="x", is_staff=True))
+        employee = make_employee()
+        now = timezone.now()
+        self.ids = {}
+        specs = [
+            ("pending_old", LeaveRequest.Status.PENDING, 10, None),
+            ("pending_new", LeaveRequest.Status.PENDING, 1, None),
+            ("approved_recent", LeaveRequest.Status.APPROVED, 5, 1),
+            ("rejected_recent", LeaveRequest.Status.REJECTED, 3, 0),
+            ("approved_old", LeaveRequest.Status.APPROVED, 20, 15),
+        ]
+        for name, status, filed_days_ago, responded_days_ago in specs:
+            leave = LeaveRequest.objects.create(
+                employee=employee, leave_type="VL", reason=name, status=status,
+                start_date=date(2026, 3, 2), end_date=date(2026, 3, 2),
+                responded_at=None if responded_days_ago is None else now - timedelta(days=responded_days_ago),
+            )
+            LeaveRequest.objects.filter(pk=leave.pk).update(date_filed=now - timedelta(days=filed_days_ago))
+            self.ids[name] = leave.pk
+
+    def api(self, **params):
+        return self.client.get(reverse("leave_queue_api"), params).json()
+
+    def reasons(self, rows):
+        return [row["reason"] for row in rows]
+
+    def test_default_queue_is_pending_and_recent_decisions(self):
+        self.assertEqual(
+            self.reasons(self.api()["results"]),
+            ["pending_new", "rejected_recent", "approved_recent", "pending_old"],
+        )
+        self.assertEqual(
+            self.reasons(self.api(status="APPROVED")["results"]),
+            ["approved_recent", "approved_old"],
+        )
+
+    def test_pages_follow_the_cursor_in_constant_queries(self):
+        seen, params = [], {"status": "APPROVED"}
+        with mock.patch("accounts.views.leave_queue_page", partial(leave_queue_page, size=1)):
+            while True:
+                with CaptureQueriesContext(connection) as queries:
+                    page = self.api(**params)
+                # session + user + page (employees joined in)
+                self.assertEqual(len(queries), 3)
+                seen += page["results"]
+                if not page["next"]:
+                    break
+                params["after"] = page["next"]
+        self.assertEqual(self.reasons(seen), ["approved_recent", "approved_old"])
+
+    def test_status_filter_is_served_by_the_index(self):
+        with connection.cursor() as cursor:
+            sql, params = leave_queue("PENDING").order_by("-date_filed", "-id")[:50].query.sql_with_params()
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(str(row) for row in cursor.fetchall())
+        self.assertIn("leave_status_filed_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_employee_page_queries_only_the_visible_panel(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("adminemployee"))
+        self.assertEqual(response.context["leave_requests"], [])
+        self.assertFalse(any("accounts_leaverequest" in q["sql"] for q in queries))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("adminemployee"), {"leave": "1"})
+        self.assertEqual(len(response.context["leave_requests"]), 4)
+        self.assertEqual(response.context["employees"], [])
+        self.assertFalse(any('FROM "attendance_record"' in q["sql"] for q in queries))
+
+
+class EmployeeSearchTests(TestCase):
+    def setUp(self):
+        self.departments = make_departments(self, "Treasury", "Health Office")
+        make_employee("EMP001", fname="Maria", lname="Santos", position="Clerk", dept="Treasury")
+        make_employee("EMP002", fname="José", lname="Reyes", position="Santos Liaison", dept="Treasury")
+        make_employee("EMP003", fname="Ana", lname="Garcia", position="Nurse", dept="Health Office")
+
+    def test_name_hits_rank_above_position_hits(self):
+        self.assertEqual(search_employee_ids("santos"), ["EMP001", "EMP002"])
+        self.assertEqual(search_employee_ids("santos", department_id=self.departments["Treasury"], status="Job Order"), [])
+
+    def test_diacritics_and_punctuation_are_ignored(self):
+        self.assertEqual(search_employee_ids("jose"), ["EMP002"])
+        self.assertEqual(search_employee_ids('"health" office!'), ["EMP003"])
+        self.assertEqual(search_employee_ids("  "), [])
+
+    def test_index_follows_saves_bulk_writes_and_deletes(self):
+        employee = Employee.objects.get(pk="EMP003")
+        employee.lname = "Villanueva"
+        employee.save()
+        self.assertEqual(search_employee_ids("garcia"), [])
+        self.assertEqual(search_employee_ids("villa"), ["EMP003"])
+
+        Employee.objects.filter(pk="EMP001").update(position="Engineer")
+        Employee.objects.bulk_create([
+            Employee(emp_id="EMP004", fname="Pedro", lname="Engle", email="p@example.com", emp_status="Regular"),
+        ])
+        self.assertEqual(search_employee_ids("eng"), ["EMP004", "EMP001"])
+
+        Employee.objects.filter(pk="EMP004").delete()
+        self.assertEqual(search_employee_ids("eng"), ["EMP001"])
+
+
+class ReferenceDataCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        SalaryGrade.objects.create(grade=1, monthly_salary=Decimal("13000.00"))
+
+    def test_steady_state_costs_no_queries(self):
+        self.assertEqual(salary_grades(), {1: Decimal("13000.00")})
+        self.assertIn("Office of the Municipal Engineer", dict(departments()).values())
+        with self.assertNumQueries(0):
+            salary_grades()
+            departments()
+
+    def test_salary_grade_changes_invalidate(self):
+        salary_grades()
+        grade = SalaryGrade.objects.get(grade=1)
+        grade.monthly_salary = Decimal("14000.00")
+        grade.save()
+        self.assertEqual(salary_grades(), {1: Decimal("14000.00")})
+
+        grade.delete()
+        self.assertEqual(salary_grades(), {})
+
+    def test_org_structure_changes_invalidate(self):
+        departments()
+        ids = make_departments(self, "Treasury")
+        self.assertIn((ids["Treasury"], "Treasury"), departments())
+
+        Department.objects.get(pk=ids["Treasury"]).delete()
+        self.assertNotIn("Treasury", dict(departments()).values())
+
+    def test_admin_pages_read_reference_data_from_cache(self):
+        self.client.force_login(User.objects.create_user("admin", password="x", is_staff=True))
+        self.client.get(reverse("adminemployee"))
+        self.client.get(reverse("time"))
+
+        for name in ["adminemployee", "time"]:
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse(name))
+            sql = " ".join(q["sql"] for q in queries)
+            self.assertNotIn('FROM "salary_grade"', sql)
+            self.assertNotIn("DISTINCT", sql)
+
+
+class OrgStructureTests(TestCase):
+    engineer = "Office of the Municipal Engineer"
+
+    def setUp(self):
+        cache.clear()
+
+    def test_migration_seeds_the_plantilla(self):
+        position = Position.objects.get(department__name=self.engineer)
+        self.assertEqual(position.title, "Administrative Aide I (Utility Worker I)")
+        self.assertEqual(position.salary_grade, "SG-1")
+
+    def test_saving_links_labels_to_keys(self):
+        employee = make_employee(dept=self.engineer, position="administrative aide i (utility worker i)")
+        position = Position.objects.get(department__name=self.engineer)
+        self.assertEqual(employee.department_id, position.department_id)
+        self.assertEqual(employee.job_position_id, position.pk)
+
+        employee.dept = "Somewhere Else"
+        employee.save()
+        self.assertIsNone(employee.department_id)
+        self.assertIsNone(employee.job_position_id)
+
+    def test_linking_costs_no_queries_once_cached(self):
+        employee = make_employee(dept=self.engineer)
+        employee.position = "Administrative Aide I (Utility Worker I)"
+        with self.assertNumQueries(1):
+            employee.save()
+
+    def test_renames_rewrite_labels(self):
+        employee = make_employee(dept=self.engineer, position="Administrative Aide I (Utility Worker I)")
+        department = Department.objects.get(name=self.engineer)
+        department.name = "Municipal Engineering Office"
+        department.save()
+        self.addCleanup(cache.clear)
+
+        employee.refresh_from_db()
+        self.assertEqual(employee.dept, "Municipal Engineering Office")
+        self.assertEqual(employee.department_id, department.pk)
+        self.assertIn((department.pk, "Municipal Engineering Office"), departments())
+
+    def test_department_filter_takes_an_id(self):
+        admin = User.objects.create_user("admin", password="x", is_staff=True)
+        self.client.force_login(admin)
+        make_employee("EMP001", dept=self.engineer)
+        make_employee("EMP002", dept="Office of the Municipal Mayor")
+        dept_id = Department.objects.get(name=self.engineer).pk
+
+        page = self.client.get(reverse("employee_directory_api"), {"dept": dept_id}).json()
+        self.assertEqual([row["emp_id"] for row in page["results"]], ["EMP001"])
+        page = self.client.get(reverse("employee_directory_api"), {"dept": "not-a-number"}).json()
+        self.assertEqual(len(page["results"]), 2)
+
+
+class PerfInstrumentationTests(TestCase):
+    def setUp(self):
+        perf_stats.clear()
+        self.admin = User.objects.create_user("admin", password="x", is_staff=True)
+        self.client.force_login(self.admin)
+
+    def test_middleware_records_each_view(self):
+        for _ in range(3):
+            self.client.get(reverse("employee_list"))
+        self.client.get(reverse("employee_directory_api"))
+
+        rows = {row["view"]: row for row in perf_stats.report()}
+        listing = rows["employee_list"]
+        self.assertEqual(listing["count"], 3)
+        self.assertGreater(listing["queries_p50"], 0)
+        self.assertGreater(listing["template_ms_p95"], 0)
+        self.assertGreater(listing["bytes_p50"], 1000)
+        self.assertEqual(rows["employee_directory_api"]["template_ms_p99"], 0)
+
+    def test_measure_and_query_budget(self):
+        with measure() as measurement:
+            list(Employee.objects.all())
+            list(Department.objects.all())
+        self.assertEqual(measurement.queries, 2)
+
+        with self.assertRaisesMessage(AssertionError, "2 queries executed, budget is 1"):
+            with query_budget(1):
+                list(Employee.objects.all())
+                list(Department.objects.all())
+
+    @override_settings(PERF_QUERY_BUDGET=1)
+    def test_requests_over_budget_are_logged(self):
+        with self.assertLogs("hris.perf", "WARNING") as logs:
+            self.client.get(reverse("employee_list"))
+        self.assertIn("(employee_list) ran", logs.output[0])
+
+    def test_report_page_is_staff_only(self):
+        self.client.get(reverse("employee_list"))
+        response = self.client.get(reverse("perf_report"))
+        self.assertContains(response, "employee_list")
+
+        self.client.force_login(User.objects.create_user("clerk", password="x"))
+        response = self.client.get(reverse("perf_report"))
+        self.assertEqual(response.status_code, 302)
+
+
+class SyntheticDataTests(TestCase):
+    today = date(2026, 3, 4)
+
+    def setUp(self):
+        cache.clear()
+        self.counts = generate(employees=6, years=1, seed=3, today=self.today)
+
+    def test_generates_consistent_history(self):
+        self.assertEqual(Employee.objects.count(), 6)
+        self.assertEqual(AttendanceRecord.objects.count(), self.counts.attendance)
+        self.assertFalse(AttendanceRecord.objects.filter(date__gte=self.today).exists())
+        self.assertFalse(AttendanceRecord.objects.filter(date__week_day__in=[1, 7]).exists())
+
+        for employee in Employee.objects.filter(emp_status=Employee.EmpStatus.REGULAR):
+            self.assertEqual(employee.department.name, employee.dept)
+            self.assertEqual(employee.job_position.title, employee.position)
+
+        # Derived tables were rebuilt to match the bulk-inserted records
+        stored = {
+            (t.employee_id, t.year): (t.lates, t.absents, t.attended)
+            for t in AttendanceTally.objects.all()
+        }
+        rebuild_tallies(2025)
+        rebuild_tallies(2026)
+        self.assertEqual(
+            stored,
+            {(t.employee_id, t.year): (t.lates, t.absents, t.attended) for t in AttendanceTally.objects.all()},
+        )
+
+        filed = LeaveRequest.objects.values_list("date_filed", "start_date")
+        self.assertTrue(all(when.date() < start for when, start in filed))
+
+    def test_new_ids_continue_past_three_digits(self):
+        make_employee("EMP999")
+        generate(employees=2, years=1, seed=4, today=self.today)
+        self.assertEqual(Employee.objects.filter(emp_id__in=["EMP1000", "EMP1001"]).count(), 2)
+        self.assertEqual(generate_next_emp_id(), "EMP1002")
+
+
+class BenchmarkSuiteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        generate(employees=6, years=1, seed=5)
+
+    def test_runs_and_rolls_back(self):
+        employees = Employee.objects.count()
+        document = run_suite(["employeedash", "qr_submit", "bulk_import"], repeat=2, warmup=1)
+
+        self.assertEqual(set(document["results"]), {"employeedash", "qr_submit", "bulk_import"})
+        self.assertEqual(document["results"]["qr_submit"]["runs"], 2)
+        self.assertGreater(document["results"]["employeedash"]["queries"], 0)
+        self.assertEqual(Employee.objects.count(), employees)
+        self.assertFalse(AttendanceRecord.objects.filter(date=timezone.localdate()).exists())
+
+    def test_compare_flags_regressions(self):
+        baseline = {"results": {
+            "payslip": {"median_ms": 10.0, "queries": 6},
+            "admindash": {"median_ms": 10.0, "queries": 6},
+            "time_tracking": {"median_ms": 10.0, "queries": 4},
+        }}
+        current = {"results": {
+            "payslip": {"median_ms": 20.0, "queries": 6},
+            "admindash": {"median_ms": 11.0, "queries": 7},
+            "time_tracking": {"median_ms": 10.5, "queries": 4},
+            "adminemployee": {"median_ms": 30.0, "queries": 5},
+        }}
+
+        rows = {row[0]: row for row in compare(current, baseline)}
+
+        self.assertEqual(set(rows), {"payslip", "admindash", "time_tracking"})
+        self.assertAlmostEqual(rows["payslip"][3], 100.0)
+        self.assertTrue(rows["payslip"][-1])
+        self.assertTrue(rows["admindash"][-1])
+        self.assertFalse(rows["time_tracking"][-1])
+
+    def test_compare_against_a_zero_baseline_uses_the_noise_floor(self):
+        baseline = {"results": {
+            "fast": {"median_ms": 0.0, "queries": 1},
+            "slow": {"median_ms": 0.0, "queries": 1},
+        }}
+        current = {"results": {
+            "fast": {"median_ms": 1.0, "queries": 1},
+            "slow": {"median_ms": 5.0, "queries": 1},
+        }}
+
+        rows = {row[0]: row for row in compare(current, baseline)}
+
+        self.assertIsNone(rows["fast"][3])
+        self.assertFalse(rows["fast"][-1])
+        self.assertTrue(rows["slow"][-1])
@@ -9,6 +9,7 @@ urlpatterns = [
     path("employee/leave/", views.employee_leave, name="employee_leave"),
     
     path('qr-attendance/', views.admin_qr_attendance, name='qr_attendance'),
+    path('qr-attendance/current/', views.admin_qr_current, name='qr_attendance_current'),
     
     path('adminlogin', views.adminlogin, name='adminlogin'),
     path('adminlogout', views.adminlogout, name='adminlogout'),
@@ -18,8 +19,15 @@ urlpatterns = [
     path('adminemployee', views.adminemployee, name='adminemployee'),
 
     path('employees/', views.employee_list, name='employee_list'),
+    path('employees/export/', views.employee_export, name='employee_export'),
+    path('api/employees/', views.employee_directory_api, name='employee_directory_api'),
+    path('api/leaves/', views.leave_queue_api, name='leave_queue_api'),
     path('time', views.time_tracking, name='time'),
+    path('time/export', views.time_export, name='time_export'),
     path('message', views.message_admin, name='message'),
+    path('payroll', views.payroll, name='payroll'),
+    path('payroll/<int:run_id>/export', views.payroll_export, name='payroll_export'),
+    path('jobs/<int:job_id>/', views.job_status, name='job_status'),
 
     path('employees/<str:emp_id>/delete/', views.employee_delete, name='employee_delete'),
     path('employees/<str:emp_id>/archive/', views.employee_archive, name='employee_archive'),
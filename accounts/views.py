@@ -1,11 +1,9 @@
-import re
-import openpyxl
 from decimal import Decimal
 import calendar
-from datetime import date, datetime, time
+from datetime import date
 from datetime import timedelta
 from django.shortcuts import render, redirect, get_object_or_404
-from django.db.models import Q, Avg
+from django.db.models import Q, Avg, Count
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.views.decorators.csrf import csrf_protect
@@ -15,18 +13,40 @@ from django.contrib.auth.models import User
 from django.contrib import messages
 from django.urls import reverse
 from .models import SalaryGrade
-import uuid
 import json
-import base64
-import qrcode
-from io import BytesIO
 from django.utils.timezone import now
 from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from uuid import uuid4
 from .models import LeaveRequest
+from .attendance import PunchAction, record_punch
+from .leave_approval import approve_leaves, reject_leaves
+from .leave_queue import leave_queue_page, serialize_leave
+from .leaves import leave_balances, validate_leave_request
+from .daily_stats import daily_summaries
+from . import refdata
+from .directory import department_param, directory_page
+from .exports import (
+    ATTENDANCE_HEADER,
+    EMPLOYEE_HEADER,
+    PAYSLIP_HEADER,
+    attendance_rows,
+    employee_rows,
+    export_response,
+    payslip_rows,
+)
+from .imports import generate_next_emp_id
+from .jobs import enqueue
+from .org_structure import position_map
+from .pagination import keyset_page
+from .payroll import compute_payslip, month_period, monthly_periods, stored_payslip
+from .tallies import yearly_attendance
 
 from .models import (
     Employee,
     AttendanceRecord,
+    Job,
+    PayrollRun,
     Message,
     FAQ,
     Announcement,
@@ -35,33 +55,13 @@ from .models import (
     WeeklyActivity,
 )
 
+# Time logs page through records newest first; id makes the key unique
+TIME_LOG_ORDER = ["-date", "-created_at", "-id"]
+
 # Fixed annual leave allocations for regular employees
 ANNUAL_VACATION_LEAVE_DAYS = 15
 ANNUAL_SICK_LEAVE_DAYS = 15
 
-LEAVE_LIMITS = {
-    "VL": 15,     # Vacation Leave (cumulative)
-    "SL": 15,     # Sick Leave (cumulative)
-    "SPL": 3,     # Special Privilege (non-cumulative)
-    "WL": 5,      # Wellness Leave (non-cumulative)
-    "PL": 7,      # Paternity Leave
-    "ML": 105,    # Maternity Leave
-    "SP": 7,      # Solo Parent Leave
-    "EL": 5,      # Emergency Leave
-}
-
-def generate_next_emp_id():
-    last = Employee.objects.order_by("-emp_id").first()
-    if not last or not last.emp_id.startswith("EMP"):
-        return "EMP001"
-    suffix = last.emp_id[3:]
-    try:
-        num = int(suffix)
-    except ValueError:
-        return "EMP001"
-    return f"EMP{num + 1:03d}"
-
-
 def get_current_period(today):
     if today.day <= 15:
         start = today.replace(day=1)
@@ -159,13 +159,19 @@ def admindash(request):
     ).count()
 
     today = localdate()
-    today_records = AttendanceRecord.objects.filter(date=today)
+    start_of_week = today - timedelta(days=today.weekday())
+    weekdays = [start_of_week + timedelta(days=i) for i in range(5)]
 
-    present = today_records.filter(status=AttendanceRecord.Status.PRESENT).count()
-    late = today_records.filter(status=AttendanceRecord.Status.LATE).count()
-    absent = today_records.filter(status=AttendanceRecord.Status.ABSENT).count()
-    fieldwork = today_records.filter(status=AttendanceRecord.Status.FIELDWORK).count()
-    health = today_records.filter(status=AttendanceRecord.Status.HEALTH).count()
+    # One rollup query for today and the week so far (live counts only
+    # for days that have no rollup rows yet)
+    summaries = daily_summaries({day for day in weekdays if day <= today} | {today})
+    today_stats = summaries[today]
+
+    present = today_stats["present"]
+    late = today_stats["late"]
+    absent = today_stats["absent"]
+    fieldwork = today_stats["fieldwork"]
+    health = today_stats["health"]
 
     total = present + late + absent + fieldwork + health
     if total == 0:
@@ -174,19 +180,10 @@ def admindash(request):
     def pct(x):
         return int((x / total) * 100)
 
-    start_of_week = today - timedelta(days=today.weekday())
-    weekdays = [start_of_week + timedelta(days=i) for i in range(5)]
-
-    daily_averages = []
-    for day in weekdays:
-        avg = (
-            AttendanceRecord.objects.filter(
-                date=day,
-                hours_worked__isnull=False,
-            ).aggregate(avg=Avg("hours_worked"))["avg"]
-            or Decimal("0")
-        )
-        daily_averages.append(float(avg))
+    daily_averages = [
+        float(summaries[day]["avg_hours"]) if day in summaries else 0.0
+        for day in weekdays
+    ]
 
     max_hours = max(daily_averages) or 1
     x_positions = [5, 25, 45, 65, 85]
@@ -221,79 +218,41 @@ def admindash(request):
 @csrf_protect
 def adminemployee(request):
     q = request.GET.get("q", "").strip()
-    dept = request.GET.get("dept", "").strip()
+    dept = department_param(request.GET.get("dept"))
     status = request.GET.get("status", "").strip()
     edit_id = request.GET.get("edit")
     show_archived = request.GET.get("archived") == "1"
 
     show_sg_editor = request.GET.get("edit_sg") == "1"
-    salary_grades = SalaryGrade.objects.all().order_by("grade")
+    salary_grades = refdata.salary_grades()
 
     # AUTO-CREATE SG rows if none exist (production fix)
-    if not salary_grades.exists():
-        for i in range(1, 28):  # SG-1 to SG-33
-            SalaryGrade.objects.create(
-                grade=i,
-                monthly_salary=Decimal("0.00")
+    if not salary_grades:
+        SalaryGrade.objects.bulk_create(
+            [SalaryGrade(grade=i, monthly_salary=Decimal("0.00")) for i in range(1, 28)],  # SG-1 to SG-27
+            ignore_conflicts=True,
         )
-    salary_grades = SalaryGrade.objects.all().order_by("grade")
-
-    employees = Employee.objects.filter(is_archived=show_archived)
-    if q:
-        employees = employees.filter(
-            Q(emp_id__icontains=q)
-            | Q(fname__icontains=q)
-            | Q(lname__icontains=q)
-            | Q(position__icontains=q)
-            | Q(dept__icontains=q)
-        )
-
-    if dept:
-        employees = employees.filter(dept=dept)
-
-    if status:
-        employees = employees.filter(emp_status=status)
+        refdata.invalidate(refdata.SALARY_GRADES)
+        salary_grades = refdata.salary_grades()
 
     show_form = request.GET.get("add") == "1" or bool(edit_id)
     edit_employee = get_object_or_404(Employee, pk=edit_id) if edit_id else None
 
-    # ✅ LEAVE APPROVAL HANDLER (SAFE)
-    leave_id = request.POST.get("leave_id")
+    # Leave approval: one request from its row, or every ticked one
+    leave_ids = [
+        int(pk)
+        for pk in request.POST.getlist("leave_ids") or [request.POST.get("leave_id")]
+        if pk and pk.isdigit()
+    ]
     action = request.POST.get("action")
 
-    if leave_id and action:
-        try:
-            leave = LeaveRequest.objects.get(id=leave_id)
-
-            if action == "approve":
-                leave.status = "APPROVED"
-                leave.responded_at = timezone.now()
-
-                # ✅ CREATE ATTENDANCE = ON LEAVE
-                current = leave.start_date
-                while current <= leave.end_date:
-                    if current.weekday() < 5:  # weekdays only
-                        record, created = AttendanceRecord.objects.get_or_create(
-                            employee=leave.employee,
-                            date=current,
-                        )
-
-                        if record.status in [
-                            AttendanceRecord.Status.ABSENT,
-                            AttendanceRecord.Status.LATE,
-                            AttendanceRecord.Status.PRESENT,
-                            None
-                        ]:
-                            record.status = AttendanceRecord.Status.ON_LEAVE
-                            record.save()
-                    current += timedelta(days=1)
-            elif action == "reject":
-                leave.status = "REJECTED"
-                leave.responded_at = timezone.now()
-
-            leave.save()
-        except LeaveRequest.DoesNotExist:
-            pass
+    if leave_ids and action:
+        if action == "approve":
+            count = approve_leaves(leave_ids)
+            messages.success(request, f"{count} leave request(s) approved.")
+        elif action == "reject":
+            count = reject_leaves(leave_ids)
+            messages.success(request, f"{count} leave request(s) rejected.")
 
         return redirect(request.path + "?leave=1")
 
@@ -307,278 +266,15 @@ def adminemployee(request):
                 messages.error(request, "No file uploaded.")
                 return redirect(reverse("adminemployee") + "?add=1")
 
-            try:
-                wb = openpyxl.load_workbook(excel_file)
-                sheet = wb.active
-            except Exception:
-                messages.error(request, "Invalid Excel file.")
-                return redirect(reverse("adminemployee") + "?add=1")
-
-            # ✅ GET HEADERS
-            headers = [cell.value for cell in sheet[1]]
-
-            # ✅ EXPECTED FORMAT (STRICT)
-            required_columns = [
-                "fname", "lname", "email", "birthday",
-                "employment_status", "department", "position",
-                "salary_grade", "jo_daily_rate"
-            ]
-
-            # ❌ REJECT IF NOT MATCH
-            if headers != required_columns:
-                messages.error(request, "Invalid Excel format. Please use the correct template.")
-                return redirect(reverse("adminemployee") + "?add=1")
-
-            # TEMP SUCCESS MESSAGE
-            # ✅ PROCESS ROWS
-            success_count = 0
-            error_count = 0
-            duplicate_count = 0
-
-            current_id = generate_next_emp_id()
-            VALID_STRUCTURE = {
-                "Office of the Municipal Mayor": {
-                    "Administrative Aide I (Utility Worker I)": "SG-1",
-                    "Senior Administrative Assistant II / Private Secretary II": "SG-18",
-                    "Administrative Aide IV (Driver II)": "SG-4",
-                    "Security Officer III": "SG-18",
-                    "Barangay Health Aide": "SG-4",
-                },
-                "Office of the Municipal Administrator": {
-                    "MGDH I (Municipal Administrator)": "SG-24",
-                    "Waterworks Supervisor": "SG-14",
-                    "Population Program Worker II": "SG-7",
-                },
-                "Office of the Municipal Vice Mayor": {
-                    "Municipal Vice Mayor": "SG-25",
-                },
-                "Office of the Municipal HRMO": {
-                    "MGDH I (Human Resource Management Officer)": "SG-24",
-                },
-                "Public Employment Service Office": {
-                    "Senior Labor and Employment Officer": "SG-19",
-                },
-                "Office on Public Affairs & Information Assistance": {
-                    "Barangay Health Aide": "SG-4",
-                },
-                "Business Permit and Licensing Office": {
-                    "Senior Administrative Assistant II (Data Controller III)": "SG-15",
-                },
-                "Sangguniang Bayan Members": {
-                    "Sangguniang Bayan Member": "SG-24",
-                },
-                "Office of the Secretary to the Sangguniang Bayan": {
-                    "Secretary to the Sangguniang Bayan": "SG-24",
-                    "Local Legislative Staff Officer III": "SG-18",
-                    "Local Legislative Staff Officer II": "SG-11",
-                    "Local Legislative Staff Assistant I": "SG-8",
-                    "Local Legislative Staff Employee II": "SG-4",
-                    "Administrative Aide II (Bookbinder II)": "SG-2",
-                },
-                "Office of the Municipal Budget": {
-                    "Municipal Budget Officer": "SG-24",
-                    "Administrative Aide IV (Budgeting Aide)": "SG-4",
-                    "Administrative Aide I (Utility Worker I)": "SG-1",
-                },
-                "Office of the Municipal Planning & Development Coordinator": {
-                    "MGDH II (Municipal Planning & Development Coordinator)": "SG-24",
-                    "Administrative Officer I (Planning Officer I)": "SG-11",
-                    "Administrative Aide IV (Clerk II)": "SG-4",
-                    "Administrative Aide I (Utility Worker I)": "SG-1",
-                },
-                "Office of the Municipal Accountant": {
-                    "Administrative Officer V (Municipal Accountant)": "SG-18",
-                    "Administrative Aide IV (Clerk II)": "SG-4",
-                    "Administrative Assistant III (Bookkeeper II)": "SG-9",
-                    "Administrative Aide I (Utility Worker I)": "SG-1",
-                },
-                "Office of the Municipal General Services": {
-                    "Administrative Aide I (Utility Worker I)": "SG-1",
-                    "Administrative Aide IV (Driver II)": "SG-4",
-                    "Water Pump Operator": "SG-4",
-                },
-                "Local Youth Development Office": {
-                    "Youth Development Officer I": "SG-10",
-                },
-                "Office of the Municipal Treasurer": {
-                    "Municipal Treasurer II": "SG-24",
-                    "Cemetery Caretaker": "SG-3",
-                    "Administrative Aide IV (Clerk II)": "SG-4",
-                    "Administrative Officer III (Cashier II)": "SG-14",
-                    "Revenue Collection Clerk II": "SG-7",
-                    "Revenue Collection Clerk I": "SG-5",
-                    "Administrative Aide VI (Cash Clerk III)": "SG-6",
-                },
-                "Market / Fishport": {
-                    "Administrative Aide I (Utility Worker I)": "SG-1",
-                },
-                "Office of the Municipal Assessor": {
-                    "Municipal Assessor II": "SG-24",
-                    "Assessment Clerk I": "SG-6",
-                    "Administrative Aide I (Utility Worker I)": "SG-1",
-                    "Administrative Aide VI (Equipment Operator II)": "SG-8",
-                },
-                "Office of the Municipal Health Officer": {
-                    "Rural Health Physician": "SG-24",
-                    "Nurse I": "SG-15",
-                    "Midwife II": "SG-11",
-                    "Medical Technologist I": "SG-11",
-                    "Ambulance Driver": "SG-4",
-                    "Administrative Aide I (Utility Worker I)": "SG-1",
-                    "Sanitation Inspector I": "SG-9",
-                },
-                "Nutrition Office": {
-                    "Nutrition Officer II": "SG-15",
-                    "Barangay Health Aide": "SG-4",
-                },
-                "Office of the Municipal Civil Registrar": {
-                    "Municipal Civil Registrar II": "SG-24",
-                    "Administrative Aide IV (Bookbinder II)": "SG-4",
-                    "Water Pump Operator": "SG-4",
-                },
-                "Office of the Municipal Social Welfare and Development Officer": {
-                    "Municipal Social Welfare and Development Officer": "SG-24",
-                    "Municipal Social Welfare Assistant": "SG-8",
-                    "Day Care Worker I": "SG-6",
-                },
-                "Office of the Municipal Agriculture": {
-                    "Municipal Agricultural Officer": "SG-20",
-                    "Agricultural Technologist": "SG-10",
-                    "Administrative Aide I (Utility Worker I)": "SG-1",
-                },
-                "Office of the MENRO": {
-                    "Administrative Aide IV (Records Officer II)": "SG-10",
-                    "Administrative Aide I (Utility Worker I)": "SG-1",
-                },
-                "Office of the Municipal Disaster Risk Reduction & Management Officer": {
-                    "Municipal Disaster Risk Reduction and Management Officer": "SG-24",
-                    "Administrative Aide IV (Computer Operator II)": "SG-6",
-                    "Local Disaster Risk Reduction & Management Assistant": "SG-8",
-                },
-                "Office of the Municipal Engineer": {
-                    "Administrative Aide I (Utility Worker I)": "SG-1",
-                },
-            }
-            for row in sheet.iter_rows(min_row=2, values_only=True):
-                try:
-                    # ✅ NORMALIZE FIRST (PUT THIS AT THE VERY TOP)
-                    fname = str(row[0]).strip().title()
-                    lname = str(row[1]).strip().title()
-                    email = str(row[2]).strip().lower()
-                    # ✅ STRONG DUPLICATE CHECK (ALL must match)
-                    dob_value = row[3]
-
-                    if isinstance(dob_value, datetime):
-                        dob_value = dob_value.date()
-                    # 2️⃣ VALIDATE
-                    if not fname or not lname:
-                        error_count += 1
-                        continue
-
-                    if Employee.objects.filter(
-                        fname=fname,
-                        lname=lname,
-                        dob=dob_value,
-                        email=email
-                    ).exists():
-                        duplicate_count += 1
-                        continue
-                    status = str(row[4]).strip().lower()
-                    
-                    # ✅ REGULAR
-                    if status == "regular":
-                        emp_status = "Regular"
-
-                        dept_val = str(row[5]).strip()
-                        pos_val = str(row[6]).strip().title()
-
-                        # ❌ missing fields
-                        if not dept_val or not pos_val:
-                            error_count += 1
-                            continue
-
-                        # ❌ invalid department
-                        if dept_val not in VALID_STRUCTURE:
-                            error_count += 1
-                            continue
-
-                        # ❌ invalid position
-                        if pos_val not in VALID_STRUCTURE[dept_val]:
-                            error_count += 1
-                            continue
-
-                        # ✅ AUTO-FIX salary grade (IGNORE Excel SG)
-                        dept = dept_val
-                        position = pos_val
-                        salary_grade = VALID_STRUCTURE[dept_val][pos_val]
-
-                        jo_rate = None
-                    # ✅ JOB ORDER
-                    elif status == "job order":
-                        emp_status = "Job Order"
-                        if row[8] is None:
-                            error_count += 1
-                            continue
-
-                        dept = None
-                        position = None
-                        salary_grade = None
-                        
-                        try: 
-                            jo_rate = Decimal(str(row[8]))
-                        except:
-                            error_count += 1
-                            continue
-                    else:
-                        error_count += 1
-                        continue
-                    emp = Employee(
-                        emp_id=current_id,
-                        fname=fname,
-                        lname=lname,
-                        email=email,
-                        dob=dob_value,
-                        emp_status=emp_status,
-                        dept=dept,
-                        position=position,
-                        salary_grade=salary_grade,
-                        jo_daily_rate=jo_rate,
-                    )
-
-                    emp.full_clean()
-                    emp.save()
-                    # ✅ increment ID
-                    num = int(current_id.replace("EMP", ""))
-                    current_id = f"EMP{num + 1:03d}"
-
-                    # ✅ CREATE USER (same as your system)
-                    if not User.objects.filter(username=emp.emp_id).exists():
-                        user = User.objects.create_user(
-                            username=emp.emp_id,
-                            password=emp.emp_id,
-                            first_name=emp.fname,
-                            last_name=emp.lname,
-                            email=emp.email,
-                        )
-                        emp.user = user
-                        emp.save()
-
-                    success_count += 1
-
-                except ValidationError:
-                    error_count += 1
-                    continue
-
-            # ✅ FINAL MESSAGE
-            messages.success(
-                request,
-                f"Uploaded: {success_count} successful, {duplicate_count} duplicates, {error_count} failed."
-            )
-            return redirect(reverse("adminemployee") + "?add=1")
+            # Imported off the request by the job worker; the page polls for progress
+            path = default_storage.save(f"job_uploads/{uuid4().hex}.xlsx", excel_file)
+            job = enqueue("import_employees", {"path": path}, user=request.user)
+            messages.success(request, "Upload received. Importing in the background...")
+            return redirect(reverse("adminemployee") + f"?add=1&job={job.pk}")
 
         # ---- Salary Grade update ----
         if request.POST.get("update_sg"):
-            for sg in salary_grades:
+            for sg in SalaryGrade.objects.all():
                 field = f"sg_{sg.grade}"
                 if field in request.POST:
                     try:
@@ -649,38 +345,23 @@ def adminemployee(request):
 
             return redirect("adminemployee")
     # ================= GET =================
-    today = localdate()
-    rec_map = {
-    r.employee.emp_id: r
-    for r in AttendanceRecord.objects.filter(date=today)
-    }
-
-
-    for e in employees:
-        e.today_att = rec_map.get(e.emp_id)
-
-    leave_requests = LeaveRequest.objects.select_related("employee").order_by("-date_filed")
-
-    status_filter = request.GET.get("status")
-
-    if status_filter:
-        leave_requests = leave_requests.filter(status=status_filter)
+    # Only the panel on screen is queried, first page only; the template
+    # pulls the rest from the directory / leave queue APIs
+    show_leave = request.GET.get("leave") == "1"
+    employees, next_cursor, leave_requests, leave_next = [], None, [], None
+    if show_leave:
+        leave_requests, leave_next = leave_queue_page(request.GET)
     else:
-        pending = leave_requests.filter(status="PENDING")
-
-        recent = leave_requests.filter(
-            status__in=["APPROVED", "REJECTED"],
-            responded_at__gte=timezone.now() - timedelta(days=2)
-        )
-
-        leave_requests = (pending | recent).distinct()
+        employees, next_cursor = directory_page(request.GET, localdate())
 
     context = {
         "employees": employees,
+        "next_cursor": next_cursor,
         "q": q,
         "dept": dept,
         "status": status,
-        "dept_choices": Employee.objects.values_list("dept", flat=True).distinct(),
+        "dept_choices": refdata.departments(),
+        "position_map": position_map(),
         "status_choices": Employee.EmpStatus.choices,
         "show_form": show_form,
         "edit_employee": edit_employee,
@@ -688,9 +369,10 @@ def adminemployee(request):
         "is_archives": show_archived,
         "show_sg_editor": show_sg_editor,
         "salary_grades": salary_grades,
-        "show_leave": request.GET.get("leave") == "1",
+        "show_leave": show_leave,
         "leave_requests": leave_requests,
-
+        "leave_next": leave_next,
+        "job": _requested_job(request),
     }
 
 
@@ -768,122 +450,144 @@ def employee_reset_password(request, emp_id):
 @csrf_protect
 def employee_toggle_attendance(request, emp_id):
     """
-    Admin Time-in / Time-out for an employee.
-    Uses Asia/Manila local time; one record per day; 8:00–17:00 schedule.
+    Admin Time-in / Time-out for an employee: the same punch as a QR scan
+    (accounts.attendance), so lateness and hours follow their shift.
     """
     if request.method != "POST":
         return redirect("adminemployee")
 
     employee = get_object_or_404(Employee, pk=emp_id)
+    result = record_punch(employee)
 
-    # Now in Philippine Standard Time if TIME_ZONE="Asia/Manila"
-    now = timezone.localtime()
-    today = now.date()
+    if result.action == PunchAction.TOO_SOON:
+        messages.error(request, "Please wait 5 minutes before timing out.")
 
-    # Fixed schedule: 8:00 AM to 5:00 PM PST, Monday–Saturday
-    scheduled_start = time(8, 0)
-    scheduled_end = time(17, 0)
+    return redirect("adminemployee")
 
-    # Get or create today's attendance record
-    record, created = AttendanceRecord.objects.get_or_create(
-        employee=employee,
-        date=today,
-        defaults={"status": AttendanceRecord.Status.PRESENT},
-    )
 
-    # No time_in yet → Time-in
-    if record.time_in is None:
-        record.time_in = now.time()
+@login_required
+@user_passes_test(_is_admin)
+def time_tracking(request):
+    today = localdate()
 
-        # Lateness based on 8:00 AM PST
-        if record.time_in <= scheduled_start:
-            record.status = AttendanceRecord.Status.PRESENT
-        else:
-            record.status = AttendanceRecord.Status.LATE
+    selected_date = _parse_date(request.GET.get("date"), today)
+    selected_department = department_param(request.GET.get("department"))
 
-    # Already time_in but no time_out → Time-out
-    elif record.time_out is None:
-        record.time_out = now.time()
+    records = AttendanceRecord.objects.filter(date=selected_date)
 
-        in_dt = timezone.make_aware(
-                    datetime.combine(today, record.time_in)
-                )
-        diff = now - in_dt
+    # Filter by department id
+    if selected_department:
+        records = records.filter(employee__department_id=selected_department)
+
+    # All summary cards in one pass over the filtered records
+    summary = records.aggregate(
+        present=Count("id", filter=Q(status=AttendanceRecord.Status.PRESENT)),
+        late=Count("id", filter=Q(status=AttendanceRecord.Status.LATE)),
+        on_leave=Count(
+            "id",
+            filter=Q(status__in=[
+                AttendanceRecord.Status.FIELDWORK,
+                AttendanceRecord.Status.HEALTH,
+                AttendanceRecord.Status.ON_LEAVE,
+            ]),
+        ),
+        avg_hours=Avg("hours_worked"),
+    )
+    avg_hours = summary["avg_hours"] or 0
 
-        out_dt = datetime.combine(today, record.time_out)
-        start_dt = datetime.combine(today, scheduled_start)
-        end_dt = datetime.combine(today, scheduled_end)
+    # Logs one page at a time, newest first
+    recent_logs, next_cursor = keyset_page(
+        records.select_related("employee"),
+        TIME_LOG_ORDER,
+        cursor=request.GET.get("after"),
+    )
 
-        # Clamp to 8:00–17:00
-        if in_dt < start_dt:
-            in_dt = start_dt
-        if out_dt > end_dt:
-            out_dt = end_dt
+    departments = refdata.departments()
 
-        delta = out_dt - in_dt
-        seconds = max(delta.total_seconds(), 0)
-        hours = Decimal(seconds) / Decimal("3600")
-        record.hours_worked = hours.quantize(Decimal("0.01"))
+    next_page = None
+    if next_cursor:
+        params = request.GET.copy()
+        params["after"] = next_cursor
+        next_page = f"?{params.urlencode()}"
 
-    # If both exist, do nothing (already completed)
-    record.save()
+    context = {
+        "today_present": summary["present"],
+        "today_on_leave": summary["on_leave"],
+        "today_late": summary["late"],
+        "today_avg_hours": round(float(avg_hours), 2) if avg_hours else 0,
+        "recent_logs": recent_logs,
+        "next_page": next_page,
+        "is_first_page": not request.GET.get("after"),
+        "departments": departments,
+        "selected_department": selected_department,
+        "selected_department_name": dict(departments).get(selected_department),
+    }
 
-    return redirect("adminemployee")
+    return render(request, "accounts/time.html", context)
+
+
+def _parse_date(value, default=None):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return default
 
 
 @login_required
 @user_passes_test(_is_admin)
-def time_tracking(request):
+def time_export(request):
+    # Same filters as time_tracking, plus an optional start/end range
     today = localdate()
+    selected_department = department_param(request.GET.get("department"))
 
-    selected_date = request.GET.get("date")
-    selected_department = request.GET.get("department")
+    records = AttendanceRecord.objects.all()
 
-    records = AttendanceRecord.objects.select_related("employee")
-
-    # Filter by date
-    if selected_date:
-        records = records.filter(date=selected_date)
+    start = _parse_date(request.GET.get("start"))
+    end = _parse_date(request.GET.get("end"))
+    if start and end:
+        records = records.filter(date__range=(start, end))
+        filename = f"attendance_{start}_{end}"
     else:
-        records = records.filter(date=today)
+        day = _parse_date(request.GET.get("date"), today)
+        records = records.filter(date=day)
+        filename = f"attendance_{day}"
 
-    # Filter by department (FIXED: dept instead of department)
     if selected_department:
-        records = records.filter(employee__dept=selected_department)
-
-    present = records.filter(status=AttendanceRecord.Status.PRESENT).count()
-    late = records.filter(status=AttendanceRecord.Status.LATE).count()
-    on_leave = records.filter(
-        status__in=[
-            AttendanceRecord.Status.FIELDWORK,
-            AttendanceRecord.Status.HEALTH,
-            AttendanceRecord.Status.ON_LEAVE,
-        ]
-    ).count()
+        records = records.filter(employee__department_id=selected_department)
 
-    avg_hours = records.aggregate(avg=Avg("hours_worked"))["avg"] or 0
+    return export_response(
+        request.GET.get("format"),
+        filename,
+        ATTENDANCE_HEADER,
+        attendance_rows(records),
+    )
 
-    # Get unique departments (FIXED: dept instead of department)
-    departments = (
-        Employee.objects
-        .exclude(dept__isnull=True)
-        .exclude(dept__exact="")
-        .values_list("dept", flat=True)
-        .distinct()
-        .order_by("dept")
+
+@login_required
+@user_passes_test(_is_admin)
+def employee_export(request):
+    show_archived = request.GET.get("archived") == "1"
+    employees = Employee.objects.filter(is_archived=show_archived).order_by("lname", "fname")
+
+    return export_response(
+        request.GET.get("format"),
+        "employees_archived" if show_archived else "employees",
+        EMPLOYEE_HEADER,
+        employee_rows(employees),
     )
 
-    context = {
-        "today_present": present,
-        "today_on_leave": on_leave,
-        "today_late": late,
-        "today_avg_hours": round(float(avg_hours), 2) if avg_hours else 0,
-        "recent_logs": records,
-        "departments": departments,
-        "selected_department": selected_department,
-    }
 
-    return render(request, "accounts/time.html", context)
+@login_required
+@user_passes_test(_is_admin)
+def payroll_export(request, run_id):
+    run = get_object_or_404(PayrollRun, pk=run_id)
+
+    return export_response(
+        request.GET.get("format"),
+        f"payroll_{run.period_start:%Y_%m}",
+        PAYSLIP_HEADER,
+        payslip_rows(run.payslips.all()),
+    )
 
 
 @login_required
@@ -949,33 +653,7 @@ def employeedash(request):
     if not employee:
         return redirect("employeelogin")
     
-    leave_balances = []
-
-    for code, limit in LEAVE_LIMITS.items():
-        approved = LeaveRequest.objects.filter(
-            employee=employee,
-            leave_type=code,
-            status="APPROVED"
-        )
-
-        used_days = 0
-
-        for leave in approved:
-            current = leave.start_date
-            while current <= leave.end_date:
-                if current.weekday() < 5:
-                    used_days += 1
-                current += timedelta(days=1)
-
-        remaining = max(limit - used_days, 0)
-
-        leave_balances.append({
-            "name": dict(LeaveRequest.LeaveType.choices).get(code, code),
-            "remaining": remaining,
-            "limit": limit
-        })
-
-    auto_timeout_absentees()
+    balances = leave_balances(employee)
 
     # Latest announcements for the dashboard
     anns = Announcement.objects.filter(is_active=True)[:5]
@@ -993,41 +671,9 @@ def employeedash(request):
         date=today
     ).first()
 
-    year_start = max(
-        employee.date_hired,
-        date(today.year, 1, 1)
-    ) if employee.date_hired else date(today.year, 1, 1)
-
-    start_date = year_start  # ✅ ADD THIS
-
-    all_workdays = []
-    current = start_date
-    while current <= today:
-        if current.weekday() < 5:
-            all_workdays.append(current)
-        current += timedelta(days=1)
-
-    attendance_qs = AttendanceRecord.objects.filter(
-        employee=employee,
-        date__range=(start_date, today)
-    )
-
-    attendance_map = {att.date: att for att in attendance_qs}
-
-    total_lates = 0
-    total_absents = 0
+    # Precomputed yearly counters (missing weekday = absent)
+    total_lates, total_absents = yearly_attendance(employee, today)
 
-    for day in all_workdays:
-        att = attendance_map.get(day)
-
-        if att:
-            if att.status == AttendanceRecord.Status.LATE:
-                total_lates += 1
-            elif att.status == AttendanceRecord.Status.ABSENT:
-                total_absents += 1
-        else:
-            total_absents += 1  # ✅ MISSING = ABSENT
-            
     late_absent_occurrences = total_lates + total_absents
 
     # Only REGULAR employees get 15 days sick leave
@@ -1035,40 +681,6 @@ def employeedash(request):
     if is_regular:
         sick_annual = 15
 
-        start_date = max(
-            employee.date_hired,
-            date(today.year, 1, 1)
-        ) if employee.date_hired else date(today.year, 1, 1)
-
-        all_workdays = []
-        current = start_date
-
-        while current <= today:
-            if current.weekday() < 5:
-                all_workdays.append(current)
-            current += timedelta(days=1)
-
-        attendance_qs = AttendanceRecord.objects.filter(
-            employee=employee,
-            date__range=(start_date, today)
-        )
-
-        attendance_map = {att.date: att for att in attendance_qs}
-
-        total_lates = 0
-        total_absents = 0
-
-        for day in all_workdays:
-            att = attendance_map.get(day)
-
-            if att:
-                if att.status == AttendanceRecord.Status.LATE:
-                    total_lates += 1
-                elif att.status == AttendanceRecord.Status.ABSENT:
-                    total_absents += 1
-            else:
-                total_absents += 1  # ✅ MISSING = ABSENT
-
         sick_days_deducted = (
             Decimal(total_absents) * 1 +
             Decimal(total_lates) * Decimal("0.25")
@@ -1111,7 +723,7 @@ def employeedash(request):
 
         "pending_activities": pending_activities,
 
-        "leave_balances": leave_balances,
+        "leave_balances": balances,
     }
     return render(request, "accounts/employeedash.html", context)
 
@@ -1125,17 +737,7 @@ def payslip(request):
     hire_date = employee.date_hired or today
 
     # ===== PERIODS =====
-    periods = []
-    current = date(hire_date.year, hire_date.month, 1)
-
-    while current <= today:
-        last_day = calendar.monthrange(current.year, current.month)[1]
-        periods.append((current, current.replace(day=last_day)))
-
-        if current.month == 12:
-            current = current.replace(year=current.year + 1, month=1, day=1)
-        else:
-            current = current.replace(month=current.month + 1, day=1)
+    periods = monthly_periods(hire_date, today)
 
     selected_value = request.GET.get("period")
     if selected_value:
@@ -1162,158 +764,85 @@ def payslip(request):
     selected_period_value = f"{selected_start.strftime('%Y-%m-%d')}_{selected_end.strftime('%Y-%m-%d')}"
     selected_label = selected_start.strftime('%b %Y')
 
-    # ===== DEFAULTS =====
-    is_job_order = employee.emp_status == Employee.EmpStatus.JOB_ORDER
-    monthly = Decimal("0.00")
-    daily_rate = Decimal("0.00")
-    absence_deduction = Decimal("0.00")
-    absent_days = 0
-    deductible_absents = 0
-    basic_salary = Decimal("0.00")
-    rata = Decimal("0.00")
-
-    # ================= JOB ORDER =================
-    if is_job_order:
-        daily_rate = employee.jo_daily_rate or Decimal("0")
-
-        payable_days = AttendanceRecord.objects.filter(
-            employee=employee,
-            date__range=(selected_start, selected_end),
-            status__in=[
-                AttendanceRecord.Status.PRESENT,
-                AttendanceRecord.Status.LATE,
-                AttendanceRecord.Status.FIELDWORK,
-                AttendanceRecord.Status.HEALTH,
-            ],
-        ).values("date").distinct().count()
-
-        basic_salary = (daily_rate * Decimal(payable_days)).quantize(Decimal("0.01"))
-
-    # ================= REGULAR =================
-    else:
-        match = re.search(r"\d+", employee.salary_grade or "")
-        sg_num = int(match.group()) if match else None
-
-        salary_obj = SalaryGrade.objects.filter(grade=sg_num).first()
-        monthly = salary_obj.monthly_salary if salary_obj else Decimal("0")
-
-        daily_rate = (monthly / Decimal("21.75")).quantize(Decimal("0.01"))
-
-        # ✅ GET ATTENDANCE FIRST (FIXED ORDER)
-        attendance_qs = AttendanceRecord.objects.filter(
-            employee=employee,
-            date__range=(selected_start, selected_end)
-        )
-        attendance_map = {att.date: att for att in attendance_qs}
-
-        # ✅ CORRECT ABSENCE COUNT (FINAL)
-        end_date = min(selected_end, today)
-
-        total_absents = 0
-        current = selected_start
-
-        while current <= end_date:
-            if current.weekday() < 5 and current >= hire_date:
-                att = attendance_map.get(current)
-
-                if not att or att.status == AttendanceRecord.Status.ABSENT:
-                    total_absents += 1
-
-            current += timedelta(days=1)
-
-        absent_days = total_absents
-        basic_salary = monthly
-
-        # ===== YEARLY LEAVE =====
-        year_start = max(
-            employee.date_hired,
-            date(today.year, 1, 1)
-        ) if employee.date_hired else date(today.year, 1, 1)
-
-        year_attendance = AttendanceRecord.objects.filter(
-            employee=employee,
-            date__range=(year_start, today)
-        )
-
-        year_lates = 0
-        year_absents = 0
-
-        current = year_start
-        while current <= today:
-            if current.weekday() < 5 and current >= hire_date:
-                att = year_attendance.filter(date=current).first()
-
-                if att:
-                    if att.status == AttendanceRecord.Status.LATE:
-                        year_lates += 1
-                    elif att.status == AttendanceRecord.Status.ABSENT:
-                        year_absents += 1
-                else:
-                    year_absents += 1
+    # Prefer the official payroll run; fall back to a live computation
+    amounts = (
+        stored_payslip(employee, selected_start, selected_end)
+        or compute_payslip(employee, selected_start, selected_end, today)
+    )
 
-            current += timedelta(days=1)
+    context = {
+        "employee": employee,
 
-        leave_used = (
-            Decimal(year_absents) +
-            Decimal(year_lates) * Decimal("0.25")
-        )
+        # ✅ ADD THESE BACK (DROPDOWN FIX)
+        "period_options": period_options,
+        "selected_period_value": selected_period_value,
+        "selected_period_label": selected_label,
 
-        remaining_sick_leave = max(Decimal("15") - leave_used, 0)
+        **amounts,
+    }
 
-        # ===== MONTH CALC =====
-        period_lates = sum(
-            1 for att in attendance_map.values()
-            if att.status == AttendanceRecord.Status.LATE
-        )
+    return render(request, "accounts/payslip.html", context)
 
-        period_leave_used = (
-            Decimal(absent_days) +
-            Decimal(period_lates) * Decimal("0.25")
+@login_required
+@user_passes_test(_is_admin)
+@csrf_protect
+def payroll(request):
+    if request.method == "POST":
+        try:
+            year, month = (int(part) for part in request.POST.get("month", "").split("-"))
+            period_start, period_end = month_period(year, month)
+        except ValueError:
+            messages.error(request, "Please choose a valid payroll month.")
+            return redirect("payroll")
+
+        job = enqueue(
+            "run_payroll",
+            {"period_start": period_start.isoformat(), "period_end": period_end.isoformat()},
+            user=request.user,
         )
+        messages.success(request, f"Payroll for {period_start:%B %Y} queued.")
+        return redirect(reverse("payroll") + f"?job={job.pk}")
 
-        if remaining_sick_leave > 0:
-            deductible_absents = max(
-                period_leave_used - remaining_sick_leave,
-                0
-            )
-        else:
-            deductible_absents = period_leave_used
+    runs = PayrollRun.objects.select_related("created_by")[:12]
 
-        # ✅ HARD CAP (CANNOT EXCEED SALARY)
-        absence_deduction = min(
-            daily_rate * deductible_absents,
-            monthly
-        ).quantize(Decimal("0.01"))
+    selected_run = None
+    payslips = []
+    run_id = request.GET.get("run")
+    if run_id:
+        selected_run = get_object_or_404(PayrollRun, pk=run_id)
+        payslips = selected_run.payslips.select_related("employee")
 
-        rata = Decimal("1000.00")
+    context = {
+        "runs": runs,
+        "selected_run": selected_run,
+        "payslips": payslips,
+        "default_month": localdate().strftime("%Y-%m"),
+        "job": _requested_job(request),
+    }
+    return render(request, "accounts/payroll.html", context)
 
-    # ===== FINAL =====
-    philhealth = (monthly * Decimal("0.025")).quantize(Decimal("0.01"))
-    total_earnings = basic_salary + rata
-    total_deductions = philhealth + absence_deduction
-    net_pay = total_earnings - total_deductions
 
-    context = {
-        "employee": employee,
+def _requested_job(request):
+    job_id = request.GET.get("job")
+    return Job.objects.filter(pk=job_id).first() if job_id and job_id.isdigit() else None
 
-        # ✅ ADD THESE BACK (DROPDOWN FIX)
-        "period_options": period_options,
-        "selected_period_value": selected_period_value,
-        "selected_period_label": selected_label,
 
-        "basic_salary": basic_salary,
-        "rata": rata,
-        "total_earnings": total_earnings,
-        "total_deductions": total_deductions,
-        "net_pay": net_pay,
-        "daily_rate": daily_rate,
-        "absent_days": absent_days,
-        "deductible_absents": deductible_absents,
-        "philhealth": philhealth,
-        "absence_deduction": absence_deduction,
-    }
+@login_required
+@user_passes_test(_is_admin)
+def job_status(request, job_id):
+    job = get_object_or_404(Job, pk=job_id)
+    response = JsonResponse({
+        "id": job.pk,
+        "kind": job.kind,
+        "status": job.status,
+        "percent": job.percent,
+        "attempts": job.attempts,
+        "message": job.message,
+        "result": job.result,
+    })
+    response["Cache-Control"] = "no-store"
+    return response
 
-    return render(request, "accounts/payslip.html", context)
 
 @login_required(login_url="employeelogin")
 def benefits(request):
@@ -1444,68 +973,28 @@ def employee_leave(request):
     employee = _get_employee_from_user(request.user)
 
     if request.method == "POST":
-        today = date.today()
-
-        active_leave = LeaveRequest.objects.filter(
-            employee=employee,
-            status=LeaveRequest.Status.APPROVED,
-            start_date__lte=today,
-            end_date__gte=today
-        ).exists()
-
-        if active_leave:
-            return render(request, "accounts/employee_leave.html", {
-                "leaves": LeaveRequest.objects.filter(employee=employee).order_by("-date_filed"),
-                "today": today,
-                "error": "You already have an active leave."
-            })
+        today = localdate()
         leave_type = request.POST.get("leave_type")
         start_date = request.POST.get("start_date")
         end_date = request.POST.get("end_date")
         reason = request.POST.get("reason")
         attachment = request.FILES.get("attachment")
 
-
-        if not start_date or not end_date:
+        try:
+            start = date.fromisoformat(start_date)
+            end = date.fromisoformat(end_date)
+        except (TypeError, ValueError):
             return redirect("employee_leave")
-        
-        start = date.fromisoformat(start_date)
-        end = date.fromisoformat(end_date)
-
-        # ✅ count weekdays only
-        requested_days = 0
-        current = start
-
-        while current <= end:
-            if current.weekday() < 5:
-                requested_days += 1
-            current += timedelta(days=1)
-
-        approved_leaves = LeaveRequest.objects.filter(
-            employee=employee,
-            leave_type=leave_type,
-            status="APPROVED"
-        )
-
-        used_days = 0
 
-        for leave in approved_leaves:
-            current = leave.start_date
-            while current <= leave.end_date:
-                if current.weekday() < 5:
-                    used_days += 1
-                current += timedelta(days=1)
-
-        limit = LEAVE_LIMITS.get(leave_type, 0)
-        remaining = max(limit - used_days, 0)
-
-        if requested_days > remaining:
+        try:
+            validate_leave_request(employee, leave_type, start, end, today)
+        except ValidationError as e:
             return render(request, "accounts/employee_leave.html", {
                 "leaves": LeaveRequest.objects.filter(employee=employee).order_by("-date_filed"),
-                "today": date.today(),
-                "error": f"You only have {remaining} day(s) left for this leave type."
+                "today": today,
+                "error": e.messages[0],
             })
-        
+
         LeaveRequest.objects.create(
             employee=employee,
             leave_type=leave_type,
@@ -1540,23 +1029,78 @@ def employee_leave(request):
 @login_required
 @user_passes_test(_is_admin)
 def employee_list(request):
-    employees = Employee.objects.filter(is_archived=False).order_by("lname", "fname")
+    employees, next_cursor = directory_page(request.GET, localdate())
 
     context = {
         "employees": employees,
+        "next_cursor": next_cursor,
     }
     return render(request, "accounts/employeelist.html", context)
 
 
+@login_required
+@user_passes_test(_is_admin)
+def employee_directory_api(request):
+    """
+    JSON pages of the employee directory: ?q=&dept=&status=&archived=1&after=.
+    `next` is the cursor for the following page, null on the last one.
+    """
+    rows, next_cursor = directory_page(request.GET, localdate())
+    return JsonResponse({"results": rows, "next": next_cursor})
+
+
+@login_required
+@user_passes_test(_is_admin)
+def leave_queue_api(request):
+    """
+    JSON pages of the admin leave queue: ?status=&after=.
+    `next` is the cursor for the following page, null on the last one.
+    """
+    leaves, next_cursor = leave_queue_page(request.GET)
+    return JsonResponse({"results": [serialize_leave(leave) for leave in leaves], "next": next_cursor})
+
+
 @login_required(login_url="employeelogin")
 def employee_qr_page(request):
     return render(request, "accounts/employee_qr_scan.html")
 
+from functools import wraps
+from math import atan2, cos, radians, sin, sqrt
+
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.db import transaction
 from django.views.decorators.http import require_POST
 from django.http import JsonResponse
 from django.utils import timezone
-from datetime import date, time
-from .models import QRSession
+from django.utils.crypto import constant_time_compare
+from .qr_tokens import claim_token, current_token, token_svg, validate_token
+
+
+def distance_meters(lat1, lon1, lat2, lon2):
+    R = 6371000
+    dlat = radians(lat2 - lat1)
+    dlon = radians(lon2 - lon1)
+    a = sin(dlat/2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon/2)**2
+    return R * (2 * atan2(sqrt(a), sqrt(1 - a)))
+
+
+def _kiosk_key(request):
+    """The kiosk key supplied with the request if it matches QR_KIOSK_KEY, else None."""
+    supplied = request.GET.get("kiosk") or request.headers.get("X-Kiosk-Key", "")
+    if settings.QR_KIOSK_KEY and constant_time_compare(supplied, settings.QR_KIOSK_KEY):
+        return supplied
+    return None
+
+
+def staff_or_kiosk(view):
+    """Allow staff users and kiosks presenting QR_KIOSK_KEY; send others to the admin login."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.user.is_staff or _kiosk_key(request):
+            return view(request, *args, **kwargs)
+        return redirect_to_login(request.get_full_path(), login_url="adminlogin")
+    return wrapper
 
 
 @require_POST
@@ -1578,165 +1122,97 @@ def employee_qr_submit(request):
     except Exception:
         return JsonResponse({"error": "Invalid QR data"}, status=400)
 
-    from .models import QRSession
+    # ✅ LOCATION VALIDATION
+    office = settings.QR_OFFICE_LOCATION
+    if office is not None:
+        try:
+            distance = distance_meters(float(lat), float(lng), *office)
+        except (TypeError, ValueError):
+            return JsonResponse(
+                {"error": "Location is required. Please allow location access and try again."},
+                status=400
+            )
 
-    qr_session = QRSession.objects.filter(
-        token=token,
-        is_active=True,
-        expires_at__gt=timezone.now(),
-    ).first()
+        # Written so a "NaN" coordinate is rejected too
+        if not distance <= settings.QR_ALLOWED_RADIUS:
+            return JsonResponse(
+                {"error": "You are outside the allowed area."},
+                status=403
+            )
 
-    if not qr_session:
+    # Shared kiosk code: HMAC-checked, no DB hit
+    window = validate_token(token)
+    if window is None:
         return JsonResponse(
             {"error": "QR code expired or invalid."},
             status=400
         )
-    # ✅ LOCATION VALIDATION
-    from math import radians, sin, cos, sqrt, atan2
-
-    PAOMBONG_LAT = 14.866707
-    PAOMBONG_LNG = 120.807094
-    ALLOWED_RADIUS = 5000  # meters
-
-    def distance_meters(lat1, lon1, lat2, lon2):
-        R = 6371000
-        dlat = radians(lat2 - lat1)
-        dlon = radians(lon2 - lon1)
-        a = sin(dlat/2)**2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon/2)**2
-        return R * (2 * atan2(sqrt(a), sqrt(1 - a)))
-
-# If GPS data exists, validate location
-    if lat is not None and lng is not None:
-        distance = distance_meters(float(lat), float(lng), PAOMBONG_LAT, PAOMBONG_LNG)
-
-        if distance > ALLOWED_RADIUS:
-            return JsonResponse(
-            {"error": "You are outside the allowed area."},
-            status=403
-        )
-
-    # Optional: deactivate after use
-    qr_session.is_active = False
-    qr_session.save()
 
     # ✅ STEP 2: Continue attendance logic
     now_dt = timezone.localtime()
-    today = now_dt.date()
-    now_time = now_dt.time()
 
-    attendance, _ = AttendanceRecord.objects.get_or_create(
-        employee=employee,
-        date=today,
-    )
+    # The claim stands only if the punch is recorded, so a rejected or
+    # failed punch can be retried with the same code
+    with transaction.atomic():
+        if not claim_token(employee, window):
+            return JsonResponse(
+                {"error": "This QR code was already used. Please scan the new code."},
+                status=400
+            )
 
-    # TIME IN
-    if attendance.time_in is None:
-        attendance.time_in = now_time
-        attendance.status = (
-            AttendanceRecord.Status.LATE
-            if now_time > time(8, 15)
-            else AttendanceRecord.Status.PRESENT
-        )
-        attendance.save()
+        result = record_punch(employee, now_dt)
+        if not result.accepted:
+            transaction.set_rollback(True)
 
+    if result.action == PunchAction.TIME_IN:
         return JsonResponse({
             "success": True,
             "action": "time_in",
             "message": "Time-in recorded",
         })
 
-    # TIME OUT
-    if attendance.time_out is None:
-        from datetime import datetime
-
-        in_dt = datetime.combine(today, attendance.time_in)
-        diff = now_dt - timezone.make_aware(in_dt)
-
-        if diff.total_seconds() < 300:
-            return JsonResponse({
-                "error": "Please wait 5 minutes before checking out."
-            }, status=400)
-
-        attendance.time_out = now_time
-        attendance.hours_worked = round(
-            diff.total_seconds() / 3600, 2
-        )
-        attendance.save()
-
+    if result.action == PunchAction.TIME_OUT:
         return JsonResponse({
             "success": True,
             "action": "time_out",
             "message": "Time-out recorded",
         })
 
+    if result.action == PunchAction.TOO_SOON:
+        return JsonResponse({
+            "error": "Please wait 5 minutes before checking out."
+        }, status=400)
+
     return JsonResponse({
         "error": "Attendance already completed for today."
     }, status=400)
 
-from django.utils.timezone import localtime
-from datetime import datetime, time
-
-def auto_timeout_absentees():
-    now = localtime()
-    today = now.date()
-
-    if now.time() < time(17, 0):
-        return
-
-    records = AttendanceRecord.objects.filter(
-        date=today,
-        time_in__isnull=False,
-        time_out__isnull=True,
-    )
-
-    for att in records:
-        if not att.time_in:
-            continue
-
-        in_dt = timezone.make_aware(
-        datetime.combine(today, att.time_in)
-        )
-
-        out_dt = timezone.make_aware(
-            datetime.combine(today, time(17, 0))
-        )
-
-        delta = out_dt - in_dt
-
-        att.time_out = time(17, 0)
-        att.hours_worked = round(
-            delta.total_seconds() / 3600, 2
-        )
-        att.save()
-
-
+@staff_or_kiosk
 def admin_qr_attendance(request):
-    from django.utils import timezone
-    from .models import QRSession
+    # Same code for every kiosk and every employee until the window rolls over
+    token, expires_at = current_token()
 
-    # Deactivate old QR sessions
-    QRSession.objects.filter(is_active=True).update(is_active=False)
-
-    # Create new QR session
-    qr_session = QRSession.objects.create(
-        expires_at=timezone.now() + timedelta(minutes=5),
-        is_active=True,
-    )
-
-    payload = {
-        "token": str(qr_session.token),
+    context = {
+        "qr_svg": token_svg(token),
+        "token": token,
+        "expires_at": expires_at,
+        "radius": 100,
+        # Passed on by the page when it polls admin_qr_current
+        "kiosk_key": _kiosk_key(request),
     }
 
-    qr = qrcode.make(json.dumps(payload))
+    return render(request, "accounts/admin_qr_attendance.html", context)
 
-    buffer = BytesIO()
-    qr.save(buffer, format="PNG")
-    qr_image = base64.b64encode(buffer.getvalue()).decode()
 
-    context = {
-        "qr_image": qr_image,
-        "expires_at": qr_session.expires_at,
-        "radius": 100
-    }
+@staff_or_kiosk
+def admin_qr_current(request):
+    # Polled by the kiosk page; only the token and its (cached) image
+    token, expires_at = current_token()
 
-    return render(request, "accounts/admin_qr_attendance.html", context)
\ No newline at end of file
+    response = JsonResponse({
+        "token": token,
+        "expires_at": expires_at.isoformat(),
+        "svg": token_svg(token),
+    })
+    response["Cache-Control"] = "no-store"
+    return response
@@ -0,0 +1,108 @@
+"""
+The work calendar: which dates are working days.
+
+A workday is a Monday to Friday that is not in the Holiday table. Each
+year is a WorkCalendar: a bitmap with one byte per day of the year (1 =
+workday) and its prefix sums, so "how many workdays between A and B" is
+two array lookups however long the range is. Calendars are built on first
+use and kept per process, keyed on the version of the holiday table in
+the reference-data cache (accounts.refdata): a lookup costs one version
+check, and a holiday added in the admin rebuilds each year on its next
+use.
+
+Attendance, leave and payroll all count working days through this
+module. In SQL, workday_q() restricts a queryset's dates the same way.
+"""
+from array import array
+from datetime import date, timedelta
+from itertools import accumulate
+
+from django.db.models import Q
+
+from . import refdata
+from .refdata import holidays
+
+
+# Django's week_day lookup: 1 = Sunday ... 7 = Saturday
+WEEKDAY_LOOKUP = [2, 3, 4, 5, 6]
+
+# year -> (holidays version, WorkCalendar)
+_calendars = {}
+
+
+class WorkCalendar:
+    """Workdays of one year, from its holidays."""
+
+    def __init__(self, year, holiday_dates=()):
+        self.year = year
+        self.first = date(year, 1, 1)
+        self.holidays = tuple(sorted(day for day in holiday_dates if day.year == year))
+
+        size = (date(year + 1, 1, 1) - self.first).days
+        first_weekday = self.first.weekday()
+        bitmap = bytearray((first_weekday + n) % 7 < 5 for n in range(size))
+        for day in self.holidays:
+            bitmap[(day - self.first).days] = 0
+
+        self.bitmap = bytes(bitmap)
+        # prefix[n] = workdays before day n of the year
+        self.prefix = array("H", accumulate(self.bitmap, initial=0))
+
+    def is_workday(self, day):
+        return bool(self.bitmap[(day - self.first).days])
+
+    def _span(self, start, end):
+        """[start, end] clipped to the year, as day offsets (end exclusive)."""
+        first = max((start - self.first).days, 0)
+        last = min((end - self.first).days + 1, len(self.bitmap))
+        return first, max(last, first)
+
+    def count(self, start, end):
+        """Workdays in [start, end] (inclusive) that fall in this year."""
+        first, last = self._span(start, end)
+        return self.prefix[last] - self.prefix[first]
+
+    def dates(self, start, end):
+        """The workdays in [start, end] that fall in this year."""
+        first, last = self._span(start, end)
+        return [self.first + timedelta(days=n) for n in range(first, last) if self.bitmap[n]]
+
+
+def calendar_for(year):
+    """The WorkCalendar of `year` for the current holiday table."""
+    version = refdata.version(refdata.HOLIDAYS)
+    cached = _calendars.get(year)
+    if cached is None or cached[0] != version:
+        cached = _calendars[year] = (version, WorkCalendar(year, holidays()))
+    return cached[1]
+
+
+def is_workday(day):
+    return calendar_for(day.year).is_workday(day)
+
+
+def count_workdays(start, end):
+    """Number of workdays in [start, end] (inclusive)."""
+    if end < start:
+        return 0
+    return sum(calendar_for(year).count(start, end) for year in range(start.year, end.year + 1))
+
+
+def workdays(start, end):
+    """The workdays in [start, end] (inclusive), in order."""
+    if end < start:
+        return []
+    return [
+        day
+        for year in range(start.year, end.year + 1)
+        for day in calendar_for(year).dates(start, end)
+    ]
+
+
+def workday_q(field="date"):
+    """Q restricting `field` (a DateField lookup path) to workdays."""
+    q = Q(**{f"{field}__week_day__in": WEEKDAY_LOOKUP})
+    holiday_dates = list(holidays())
+    if holiday_dates:
+        q &= ~Q(**{f"{field}__in": holiday_dates})
+    return q
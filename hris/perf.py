@@ -0,0 +1,204 @@
+"""
+Per-request performance instrumentation.
+
+PerfMiddleware measures every request: query count and total database
+time, template render time, response size and wall time. It files
+them under the URL name of the view. The last PERF_WINDOW samples per
+view are kept in process memory, and the staff page at /admin/perf/
+shows their percentiles, slowest views first. Each worker process
+keeps its own figures.
+
+When PERF_QUERY_BUDGET is set, a request issuing more queries than that
+is logged as a warning on the "hris.perf" logger.
+
+measure() is the same instrumentation as a context manager, and
+query_budget() turns it into a test assertion:
+
+    with query_budget(8):
+        self.client.get(reverse("payslip"))
+"""
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import connections
+from django.shortcuts import render
+from django.template.backends.django import Template as BackendTemplate
+
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 95, 99)
+
+_current = ContextVar("perf_measurement", default=None)
+
+
+@dataclass
+class Measurement:
+    queries: int = 0
+    db_ms: float = 0.0
+    template_ms: float = 0.0
+    total_ms: float = 0.0
+    sql: list = None
+
+
+def _record_query(measurement):
+    def wrapper(execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            measurement.queries += 1
+            measurement.db_ms += (time.perf_counter() - start) * 1000
+            if measurement.sql is not None:
+                measurement.sql.append(sql)
+    return wrapper
+
+
+_backend_render = BackendTemplate.render
+
+
+def _timed_render(self, context=None, request=None):
+    # The backend template is what render()/render_to_string() call once
+    # per page; {% include %}s render inside it, so nothing is counted twice
+    measurement = _current.get()
+    if measurement is None:
+        return _backend_render(self, context, request)
+    start = time.perf_counter()
+    try:
+        return _backend_render(self, context, request)
+    finally:
+        measurement.template_ms += (time.perf_counter() - start) * 1000
+
+
+BackendTemplate.render = _timed_render
+
+
+@contextmanager
+def measure(keep_sql=False):
+    """
+    Measure the queries and template rendering done inside the block;
+    with keep_sql the statements are collected in measurement.sql.
+    """
+    measurement = Measurement(sql=[] if keep_sql else None)
+    token = _current.set(measurement)
+    start = time.perf_counter()
+    try:
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(_record_query(measurement)))
+            yield measurement
+    finally:
+        measurement.total_ms = (time.perf_counter() - start) * 1000
+        _current.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries):
+    """Fail the test if the block runs more than `max_queries` queries."""
+    with measure(keep_sql=True) as measurement:
+        yield measurement
+    if measurement.queries > max_queries:
+        listing = "\n".join(f"{n}. {sql}" for n, sql in enumerate(measurement.sql, start=1))
+        raise AssertionError(
+            f"{measurement.queries} queries executed, budget is {max_queries}:\n{listing}"
+        )
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered))) - 1, 0)
+    return ordered[rank]
+
+
+class ViewStats:
+    """Rolling samples per view name, shared by the threads of one process."""
+
+    METRICS = ("queries", "db_ms", "template_ms", "total_ms", "bytes")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {}
+
+    def record(self, view, measurement, size):
+        sample = (
+            measurement.queries,
+            measurement.db_ms,
+            measurement.template_ms,
+            measurement.total_ms,
+            size,
+        )
+        with self._lock:
+            window = self._samples.get(view)
+            if window is None:
+                window = self._samples[view] = deque(maxlen=settings.PERF_WINDOW)
+            window.append(sample)
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    def report(self):
+        """One row per view, slowest p95 wall time first."""
+        with self._lock:
+            snapshot = {view: list(window) for view, window in self._samples.items()}
+
+        rows = []
+        for view, samples in snapshot.items():
+            columns = dict(zip(self.METRICS, zip(*samples)))
+            row = {"view": view, "count": len(samples)}
+            for metric, values in columns.items():
+                for pct in PERCENTILES:
+                    row[f"{metric}_p{pct}"] = percentile(values, pct)
+            rows.append(row)
+        rows.sort(key=lambda row: row["total_ms_p95"], reverse=True)
+        return rows
+
+
+stats = ViewStats()
+
+
+class PerfMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with measure() as measurement:
+            response = self.get_response(request)
+
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else "<unresolved>"
+        # Streamed bodies (exports) are never held in memory to measure
+        size = 0 if response.streaming else len(response.content)
+        stats.record(view, measurement, size)
+
+        budget = settings.PERF_QUERY_BUDGET
+        if budget and measurement.queries > budget:
+            logger.warning(
+                "%s %s (%s) ran %d queries, budget is %d (%.1f ms in the database)",
+                request.method,
+                request.path,
+                view,
+                measurement.queries,
+                budget,
+                measurement.db_ms,
+            )
+        return response
+
+
+@staff_member_required
+def perf_report(request):
+    if request.method == "POST" and request.POST.get("reset"):
+        stats.clear()
+    return render(request, "perf.html", {
+        "rows": stats.report(),
+        "window": settings.PERF_WINDOW,
+        "budget": settings.PERF_QUERY_BUDGET,
+    })
@@ -49,6 +49,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so it sees the queries of every middleware below it
+    "hris.perf.PerfMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -98,9 +100,45 @@ else:
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": BASE_DIR / "db.sqlite3",
+            "OPTIONS": {
+                # Take the write lock at BEGIN so concurrent punches wait
+                # on the busy timeout instead of failing with "locked".
+                "transaction_mode": "IMMEDIATE",
+                "timeout": 20,
+            },
+            # File-backed so threaded tests get real locking semantics
+            "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
         }
     }
 
+# =========================================================
+# CACHE
+# =========================================================
+
+# Local memory is per process; point CACHE_DIR at a shared directory so
+# every gunicorn worker and the job worker see the same reference-data
+# versions and QR images.
+CACHE_DIR = os.getenv("CACHE_DIR")
+
+if CACHE_DIR:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": CACHE_DIR,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "hris",
+        }
+    }
+
+# Upper bound on how long another process may serve reference data
+# (salary grades, departments) after it changed
+REFDATA_TIMEOUT = 300
+
 # =========================================================
 # PASSWORD VALIDATION
 # =========================================================
@@ -144,6 +182,45 @@ STATICFILES_STORAGE = (
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# =========================================================
+# ATTENDANCE
+# =========================================================
+
+# How long one kiosk QR code stays valid (one extra window of grace is allowed)
+QR_TOKEN_WINDOW_SECONDS = int(os.getenv("QR_TOKEN_WINDOW_SECONDS", "30"))
+
+# A kiosk not logged in as staff opens the QR page as /qr-attendance/?kiosk=<key>;
+# empty disables kiosk access, leaving the page to staff only
+QR_KIOSK_KEY = os.getenv("QR_KIOSK_KEY", "")
+
+# Set QR_OFFICE_LOCATION ("lat,lng", e.g. "14.866707,120.807094") to require
+# punches to carry a GPS fix within QR_ALLOWED_RADIUS meters of the office;
+# unset, punches are accepted from anywhere
+QR_OFFICE_LOCATION = tuple(
+    float(part) for part in os.getenv("QR_OFFICE_LOCATION", "").split(",") if part
+) or None
+QR_ALLOWED_RADIUS = int(os.getenv("QR_ALLOWED_RADIUS", "5000"))
+
+# =========================================================
+# BACKGROUND JOBS (python manage.py run_worker)
+# =========================================================
+
+# A failed job is retried after JOB_RETRY_BASE_SECONDS, then twice that, ...
+JOB_RETRY_BASE_SECONDS = int(os.getenv("JOB_RETRY_BASE_SECONDS", "30"))
+
+# A job still "running" after this long is assumed to have lost its worker
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "1800"))
+
+# =========================================================
+# PERFORMANCE INSTRUMENTATION (hris.perf, report at /admin/perf/)
+# =========================================================
+
+# Samples kept per view for the percentiles
+PERF_WINDOW = 500
+
+# Log requests issuing more queries than this (unset = no logging)
+PERF_QUERY_BUDGET = int(os.getenv("PERF_QUERY_BUDGET", "0")) or None
+
 # =========================================================
 # DEFAULT PRIMARY KEY FIELD TYPE
 # =========================================================
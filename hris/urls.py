@@ -17,7 +17,10 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from hris.perf import perf_report
+
 urlpatterns = [
+    path('admin/perf/', perf_report, name='perf_report'),
     path('admin/', admin.site.urls),
     path('', include('accounts.urls')),
 ]